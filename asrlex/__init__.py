@@ -1,7 +1,31 @@
-from .g2p import G2P
-from .prondict import PronDict
+import importlib
 
-__all__ = ['G2P', 'PronDict']
+__all__ = ['G2P', 'Normalizer', 'PronDict']
 
-from . import _version
-__version__ = _version.get_versions()['version']
+
+# Public names are resolved on first access, so that ``import asrlex``, or of
+# any one submodule, does not import the others; in particular, importing
+# ``asrlex.prondict`` does not import the Phonetisaurus bindings. Resolving
+# the version is similarly deferred, as it may run ``git`` in a checkout.
+_LAZY_ATTRS = {
+    'G2P' : 'g2p',
+    'Normalizer' : 'normalize',
+    'PronDict' : 'prondict',
+    }
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(f'.{_LAZY_ATTRS[name]}', __name__)
+        val = getattr(module, name)
+    elif name == '__version__':
+        from . import _version
+        val = _version.get_versions()['version']
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    globals()[name] = val
+    return val
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | {'__version__'})
@@ -0,0 +1,296 @@
+"""Columnar representation of pronunciation dictionaries."""
+from array import array
+from collections import defaultdict
+import math
+
+import numpy as np
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ModuleNotFoundError:
+    HAS_PYARROW = False
+
+from . import utils
+
+__all__ = ['LexiconArrays']
+
+
+class LexiconArrays:
+    """Pronunciation dictionary in compressed sparse row (CSR) layout.
+
+    Entries are ordered as by ``PronDict.write_dict``; i.e., by word, then
+    by pronunciation. The phones of entry ``i`` are:
+
+        >>> codes = arrays.phone_codes[arrays.offsets[i]:arrays.offsets[i+1]]
+        >>> [arrays.phones[code] for code in codes]
+
+    and its head word is ``arrays.words[arrays.pron_word[i]]``. Arrays are
+    read-only, as they may be shared with the ``PronDict`` they were
+    created from or converted to.
+
+    Parameters
+    ----------
+    words : list of str
+        Head words in lexicographic order.
+
+    phones : list of str
+        Phone symbol table in lexicographic order.
+
+    pron_word : numpy.ndarray, (n_prons,)
+        Indices into ``words`` of head words of entries.
+
+    offsets : numpy.ndarray, (n_prons + 1,)
+        Offsets into ``phone_codes`` of the phones of each entry.
+
+    phone_codes : numpy.ndarray, (n_phone_tokens,)
+        Indices into ``phones`` of phones of all entries, concatenated.
+
+    scores : numpy.ndarray, (n_prons,), optional
+        Scores of entries. Missing scores are NaN. None if no entry is
+        scored.
+        (Default: None)
+
+    tags : numpy.ndarray, (n_prons,), optional
+        Indices into ``tag_names`` of tags of entries. Missing tags are -1.
+        None if no entry is tagged.
+        (Default: None)
+
+    tag_names : list of str, optional
+        Tag symbol table.
+        (Default: None)
+    """
+    def __init__(self, words, phones, pron_word, offsets, phone_codes,
+                 scores=None, tags=None, tag_names=None):
+        self.words = words
+        self.phones = phones
+        self.pron_word = _read_only(pron_word)
+        self.offsets = _read_only(offsets)
+        self.phone_codes = _read_only(phone_codes)
+        self.scores = None if scores is None else _read_only(scores)
+        self.tags = None if tags is None else _read_only(tags)
+        self.tag_names = tag_names
+        if len(self.offsets) != len(self.pron_word) + 1:
+            raise ValueError(
+                'offsets must have exactly one more element than pron_word.')
+
+    @property
+    def n_words(self):
+        """Number of head words."""
+        return len(self.words)
+
+    @property
+    def n_prons(self):
+        """Number of entries."""
+        return len(self.pron_word)
+
+    def get_pron(self, i):
+        """Return pronunciation of entry ``i`` as tuple of phones."""
+        bi, ei = self.offsets[i], self.offsets[i+1]
+        return tuple(self.phones[code] for code in self.phone_codes[bi:ei])
+
+    @staticmethod
+    def from_pron_dict(pdict):
+        """Convert pronunciation dictionary to arrays.
+
+        Prefer ``PronDict.to_arrays``, which caches the result.
+        """
+        words = pdict.words
+        word_to_prons = pdict._word_to_prons
+        has_columns = pdict.has_columns
+
+        # Single pass, assigning phone codes in order of first occurrence.
+        phone_to_code = utils.CodeTable()
+        get_code = phone_to_code.__getitem__
+        codes = array('i')
+        pron_lens = array('q')
+        word_n_prons = array('q')
+        scores = array('d')
+        tags = array('q')
+        with utils.gc_disabled():
+            for word in words:
+                prons = sorted(word_to_prons[word])
+                word_n_prons.append(len(prons))
+                for pron in prons:
+                    pron_lens.append(len(pron))
+                    codes.extend(map(get_code, pron))
+                    if has_columns:
+                        row = pdict._get_row(word, pron)
+                        if row is None:
+                            scores.append(math.nan)
+                            tags.append(-1)
+                        else:
+                            scores.append(pdict._scores[row])
+                            tags.append(pdict._tags[row])
+
+        # Renumber phones in lexicographic order.
+        phones = sorted(phone_to_code)
+        old_to_new = np.empty(len(phones), dtype=np.int32)
+        for new_code, phone in enumerate(phones):
+            old_to_new[phone_to_code[phone]] = new_code
+        phone_codes = old_to_new[np.frombuffer(codes, dtype=np.int32)]
+
+        offsets = np.zeros(len(pron_lens) + 1, dtype=np.int64)
+        np.cumsum(np.frombuffer(pron_lens, dtype=np.int64), out=offsets[1:])
+        pron_word = np.repeat(
+            np.arange(len(words), dtype=np.int64),
+            np.frombuffer(word_n_prons, dtype=np.int64))
+        arrays = LexiconArrays(words, phones, pron_word, offsets, phone_codes)
+        if has_columns:
+            scores = np.frombuffer(scores, dtype=np.float64)
+            tags = np.frombuffer(tags, dtype=np.int64)
+            if not np.isnan(scores).all():
+                arrays.scores = _read_only(scores)
+            if (tags >= 0).any():
+                arrays.tags = _read_only(tags)
+                arrays.tag_names = list(pdict._tag_names)
+        return arrays
+
+    def to_pron_dict(self, oov_pron=('OOV',)):
+        """Convert arrays to pronunciation dictionary.
+
+        Prefer ``PronDict.from_arrays``.
+        """
+        from .prondict import PronDict
+        words = self.words
+        phones = self.phones
+        phone_toks = [phones[code] for code in self.phone_codes.tolist()]
+        offsets = self.offsets.tolist()
+        word_to_prons = defaultdict(set)
+        entries = []
+        with utils.gc_disabled():
+            for i, word_index in enumerate(self.pron_word.tolist()):
+                word = words[word_index]
+                pron = tuple(phone_toks[offsets[i]:offsets[i+1]])
+                word_to_prons[word].add(pron)
+                entries.append((word, pron))
+        pdict = PronDict(oov_pron=oov_pron)
+        pdict._word_to_prons = word_to_prons
+        if self.scores is not None:
+            for i in np.flatnonzero(~np.isnan(self.scores)).tolist():
+                pdict.set_score(*entries[i], float(self.scores[i]))
+        if self.tags is not None:
+            for i in np.flatnonzero(self.tags >= 0).tolist():
+                pdict.set_tag(*entries[i], self.tag_names[self.tags[i]])
+        # Conversion back to arrays is free.
+        pdict._arrays = self
+        return pdict
+
+    def to_arrow(self):
+        """Convert arrays to an Arrow table.
+
+        The table has one row per entry, with columns:
+
+        - word  --  head word, dictionary encoded
+        - phones  --  list of phones, dictionary encoded
+        - score  --  score; only if any entry is scored
+        - tag  --  tag, dictionary encoded; only if any entry is tagged
+
+        Encoded columns share buffers with the arrays rather than copying
+        them.
+        """
+        if not HAS_PYARROW:
+            raise ModuleNotFoundError(
+                'pyarrow is required for Arrow and Parquet export. Please '
+                'install with: pip install pyarrow')
+        words = pa.DictionaryArray.from_arrays(
+            pa.array(self.pron_word), pa.array(self.words, pa.string()))
+        phones = pa.LargeListArray.from_arrays(
+            pa.array(self.offsets),
+            pa.DictionaryArray.from_arrays(
+                pa.array(self.phone_codes),
+                pa.array(self.phones, pa.string())))
+        columns = {'word' : words, 'phones' : phones}
+        if self.scores is not None:
+            columns['score'] = pa.array(self.scores, from_pandas=True)
+        if self.tags is not None:
+            columns['tag'] = pa.DictionaryArray.from_arrays(
+                pa.array(self.tags, mask=self.tags < 0),
+                pa.array(self.tag_names, pa.string()))
+        return pa.table(columns)
+
+    @staticmethod
+    def from_arrow(table):
+        """Convert Arrow table output by ``to_arrow`` to arrays."""
+        if not HAS_PYARROW:
+            raise ModuleNotFoundError(
+                'pyarrow is required for Arrow and Parquet import. Please '
+                'install with: pip install pyarrow')
+        table = table.combine_chunks()
+        words, pron_word = _decode_dictionary(table.column('word').chunk(0))
+        phones = table.column('phones').chunk(0)
+        phones, phone_codes = _decode_dictionary(phones.flatten())
+        offsets = table.column('phones').chunk(0).offsets
+        kwargs = {}
+        if 'score' in table.column_names:
+            scores = table.column('score').chunk(0)
+            kwargs['scores'] = scores.to_numpy(zero_copy_only=False)
+        if 'tag' in table.column_names:
+            tags = table.column('tag').chunk(0)
+            kwargs['tags'] = tags.indices.fill_null(-1).to_numpy().astype(
+                np.int64)
+            kwargs['tag_names'] = tags.dictionary.to_pylist()
+        offsets = offsets.to_numpy().astype(np.int64)
+        offsets -= offsets[0]
+        return LexiconArrays(
+            words, phones, pron_word.astype(np.int64), offsets,
+            phone_codes.astype(np.int32), **kwargs)
+
+    def write_parquet(self, path):
+        """Write arrays to Parquet file."""
+        table = self.to_arrow()
+        pq.write_table(table, path)
+
+    @staticmethod
+    def read_parquet(path):
+        """Read arrays from Parquet file written by ``write_parquet``."""
+        if not HAS_PYARROW:
+            raise ModuleNotFoundError(
+                'pyarrow is required for Arrow and Parquet import. Please '
+                'install with: pip install pyarrow')
+        return LexiconArrays.from_arrow(pq.read_table(path))
+
+    def __eq__(self, other):
+        def _array_eq(x, y):
+            if x is None or y is None:
+                return x is None and y is None
+            return np.array_equal(x, y, equal_nan=x.dtype.kind == 'f')
+        return (self.words == other.words and
+                self.phones == other.phones and
+                _array_eq(self.pron_word, other.pron_word) and
+                _array_eq(self.offsets, other.offsets) and
+                _array_eq(self.phone_codes, other.phone_codes) and
+                _array_eq(self.scores, other.scores) and
+                _array_eq(self.tags, other.tags) and
+                self.tag_names == other.tag_names)
+
+    def __repr__(self):
+        return (f'LexiconArrays(n_words={self.n_words}, '
+                f'n_prons={self.n_prons}, n_phones={len(self.phones)})')
+
+
+def _decode_dictionary(arr):
+    """Return lexicographically sorted symbols and codes of Arrow array.
+
+    Plain arrays are dictionary encoded first. Dictionary encoding may be
+    lost in round trips through other formats (e.g., of nested columns
+    through Parquet), and need not be sorted.
+    """
+    if not pa.types.is_dictionary(arr.type):
+        arr = arr.dictionary_encode()
+    symbols = arr.dictionary.to_pylist()
+    codes = arr.indices.to_numpy(zero_copy_only=False)
+    order = sorted(range(len(symbols)), key=symbols.__getitem__)
+    if order != list(range(len(symbols))):
+        old_to_new = np.empty(len(symbols), dtype=np.int64)
+        old_to_new[order] = np.arange(len(symbols))
+        codes = old_to_new[codes]
+        symbols = [symbols[i] for i in order]
+    return symbols, codes
+
+
+def _read_only(x):
+    """Return read-only view of array."""
+    x = np.asarray(x).view()
+    x.flags.writeable = False
+    return x
@@ -0,0 +1,207 @@
+"""Benchmarking of lexicon operations on user supplied data."""
+import os
+from pathlib import Path
+import platform
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ModuleNotFoundError:
+    HAS_RESOURCE = False
+
+from .prondict import PronDict
+
+__all__ = ['DEFAULT_G2P_CONFIGS', 'format_table', 'get_metadata', 'measure',
+           'run_battery']
+
+
+# Decoding configurations for G2P benchmarks; keyword arguments to
+# ``G2P.get_prons``.
+DEFAULT_G2P_CONFIGS = [
+    {},
+    {'n_best' : 1},
+    {'n_best' : 10},
+    {'beam' : 1000},
+    {'cum_prob' : 0.9},
+    ]
+
+
+def _reset_peak_rss():
+    """Reset peak resident set size of process, if supported.
+
+    Only supported on Linux, by writing to ``/proc/self/clear_refs``.
+    Returns True on success.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _get_peak_rss():
+    """Return peak resident set size of process in bytes.
+
+    Returns None if not supported on platform.
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return 1024*int(line.split()[1])
+    except OSError:
+        pass
+    if not HAS_RESOURCE:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, but kilobytes elsewhere.
+    return peak_rss if sys.platform == 'darwin' else 1024*peak_rss
+
+
+def measure(func, *args, **kwargs):
+    """Call function, measuring its resource usage.
+
+    Peak RSS is the high-water mark of the resident set size of the process
+    during the call. Where it cannot be reset before the call (i.e., other
+    than on Linux), it is the high-water mark since the process started.
+
+    Returns
+    -------
+    result : object
+        Return value of ``func``.
+
+    usage : dict
+        Mapping with keys:
+
+        - wall  --  wall-clock time in seconds
+        - cpu  --  CPU time of process in seconds
+        - peak_rss  --  peak resident set size in bytes; None if not
+          supported on platform
+    """
+    _reset_peak_rss()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = func(*args, **kwargs)
+    usage = {'wall' : time.perf_counter() - wall_start,
+             'cpu' : time.process_time() - cpu_start,
+             'peak_rss' : _get_peak_rss()}
+    return result, usage
+
+
+def run_battery(dict_paths, model_path=None, words=None, n_g2p_words=1000,
+                g2p_configs=DEFAULT_G2P_CONFIGS):
+    """Run standard battery of benchmarks.
+
+    The battery consists of:
+
+    - load  --  loading each dictionary
+    - union  --  union of dictionaries
+    - write  --  writing union to a temporary file
+    - lookup  --  ``lookup_many`` of each word in word list
+    - g2p  --  decoding word list with ``G2P.get_prons_batch`` under each
+      configuration in ``g2p_configs``; only run if ``model_path`` is
+      specified
+
+    Parameters
+    ----------
+    dict_paths : iterable of Path
+        Paths to pronunciation dictionaries.
+
+    model_path : Path, optional
+        Path to Phonetisaurus G2P model.
+        (Default: None)
+
+    words : list of str, optional
+        Words to look up and decode. If None, all head words of the
+        dictionaries are looked up, and the first ``n_g2p_words`` decoded.
+        (Default: None)
+
+    n_g2p_words : int, optional
+        Maximum number of words decoded per G2P configuration.
+        (Default: 1000)
+
+    g2p_configs : list of dict, optional
+        Keyword arguments to ``G2P.get_prons`` for each G2P benchmark.
+        (Default: DEFAULT_G2P_CONFIGS)
+
+    Yields
+    ------
+    result : dict
+        Resource usage of benchmark (see ``measure``), with additional keys:
+
+        - name  --  name of benchmark
+        - n_items  --  number of items (e.g., words) processed
+        - items_per_sec  --  throughput
+    """
+    def _result(name, n_items, usage):
+        wall = usage['wall']
+        return {'name' : name, 'n_items' : n_items,
+                'items_per_sec' : n_items / wall if wall > 0 else None,
+                **usage}
+
+    # Load.
+    pdicts = []
+    for dict_path in dict_paths:
+        pdict, usage = measure(PronDict.load_dict, dict_path)
+        pdicts.append(pdict)
+        yield _result(f'load {Path(dict_path).name}', len(pdict), usage)
+
+    # Union.
+    pdict, usage = measure(PronDict.union, *pdicts)
+    del pdicts
+    yield _result('union', len(pdict), usage)
+
+    # Write.
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _, usage = measure(pdict.write_dict, Path(tmp_dir, 'bench.dict'))
+    yield _result('write', len(pdict), usage)
+
+    # Lookup.
+    lookup_words = pdict.words if words is None else words
+    _, usage = measure(pdict.lookup_many, lookup_words)
+    yield _result('lookup', len(lookup_words), usage)
+
+    # G2P.
+    if model_path is None:
+        return
+    from .g2p import G2P
+    model = G2P(model_path)
+    g2p_words = lookup_words[:n_g2p_words]
+    for config in g2p_configs:
+        name = ','.join(f'{k}={v}' for k, v in config.items()) or 'default'
+        _, usage = measure(model.get_prons_batch, g2p_words, **config)
+        yield _result(f'g2p {name}', len(g2p_words), usage)
+
+
+def get_metadata():
+    """Return description of environment in which benchmarks were run."""
+    import asrlex
+    return {
+        'asrlex' : asrlex.__version__,
+        'python' : platform.python_version(),
+        'platform' : platform.platform(),
+        'processor' : platform.processor(),
+        'cpu_count' : os.cpu_count(),
+        'time' : time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+
+
+def format_table(results):
+    """Return benchmark results as a plain text table."""
+    width = max([len(result['name']) for result in results] + [9])
+    lines = [f'{"benchmark":<{width}}  {"items":>9}  {"wall(s)":>9}  '
+             f'{"cpu(s)":>9}  {"items/s":>11}  {"peak RSS(MiB)":>13}']
+    for result in results:
+        rate = result['items_per_sec']
+        rate = '-' if rate is None else f'{rate:.1f}'
+        peak_rss = result['peak_rss']
+        peak_rss = '-' if peak_rss is None else f'{peak_rss/2**20:.1f}'
+        lines.append(
+            f'{result["name"]:<{width}}  {result["n_items"]:>9d}  '
+            f'{result["wall"]:>9.3f}  {result["cpu"]:>9.3f}  {rate:>11}  '
+            f'{peak_rss:>13}')
+    return '\n'.join(lines)
@@ -0,0 +1,361 @@
+"""Persistent cache of G2P results."""
+from collections import OrderedDict
+import hashlib
+import json
+import os
+from pathlib import Path
+import sqlite3
+import threading
+
+from . import trace
+from . import utils
+
+__all__ = ['CacheStats', 'G2PCache']
+
+
+# Format version, stored as the ``user_version`` of the database.
+_VERSION = 1
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS models (
+           path TEXT PRIMARY KEY,
+           size INTEGER NOT NULL,
+           mtime_ns INTEGER NOT NULL,
+           digest TEXT NOT NULL)""",
+    """CREATE TABLE IF NOT EXISTS prons (
+           model TEXT NOT NULL,
+           params TEXT NOT NULL,
+           word TEXT NOT NULL,
+           prons TEXT NOT NULL,
+           PRIMARY KEY (model, params, word)) WITHOUT ROWID""",
+    ]
+
+# Maximum number of words per query; SQLite limits the number of bound
+# parameters, to as few as 999 in older versions.
+_QUERY_SIZE = 500
+
+
+def _hash_file(path, block_size=2**20):
+    """Return hex digest of contents of file."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                return h.hexdigest()
+            h.update(block)
+
+
+def _encode_prons(prons):
+    return json.dumps([[list(pron), score] for pron, score in prons.items()],
+                      ensure_ascii=False, separators=(',', ':'))
+
+
+def _decode_prons(s):
+    return {tuple(pron) : score for pron, score in json.loads(s)}
+
+
+class CacheStats:
+    """Hit and miss counts of a ``G2PCache``.
+
+    Attributes
+    ----------
+    memory_hits : int
+        Number of lookups answered by the in-memory LRU.
+
+    disk_hits : int
+        Number of lookups answered by the database.
+
+    misses : int
+        Number of lookups of words not in the cache.
+
+    writes : int
+        Number of entries written to the database.
+    """
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @property
+    def hits(self):
+        """Total number of hits."""
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def lookups(self):
+        """Total number of lookups."""
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups that were hits."""
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def to_dict(self):
+        """Return JSON serializable summary of statistics."""
+        return {
+            'lookups' : self.lookups,
+            'memory_hits' : self.memory_hits,
+            'disk_hits' : self.disk_hits,
+            'misses' : self.misses,
+            'writes' : self.writes,
+            'hit_rate' : self.hit_rate,
+            }
+
+    def __repr__(self):
+        return (f'CacheStats(lookups={self.lookups}, '
+                f'memory_hits={self.memory_hits}, '
+                f'disk_hits={self.disk_hits}, misses={self.misses}, '
+                f'hit_rate={self.hit_rate:.4f})')
+
+
+class G2PCache:
+    """Persistent cache of pronunciations generated by G2P models.
+
+    Entries are stored in a SQLite database keyed by the digest of the
+    model file, the decoding parameters, and the word, and are fronted by a
+    bounded in-memory LRU. As the key includes the digest, results for a
+    model are never returned for another, so entries are invalidated
+    automatically when the model file changes; ``prune`` reclaims the space
+    they occupy.
+
+    The database may be shared by many processes, both concurrently and
+    across runs. It is opened in write-ahead logging mode, so readers do not
+    block writers or each other, and writers wait up to ``timeout`` seconds
+    for each other. Instances are also safe to use from several threads and
+    across ``fork``, after which the child opens its own connection.
+
+    Caches are normally used through ``G2P``:
+
+        >>> model = G2P('g2p.fst', cache='g2p_cache.db')
+        >>> prons = model.get_prons('the')
+        >>> model.cache.stats.hit_rate
+
+    Parameters
+    ----------
+    cache_path : Path
+        Path to database. Created if it does not exist.
+
+    max_memory : int, optional
+        Maximum number of entries held in memory. If 0, entries are only held
+        on disk.
+        (Default: 65536)
+
+    timeout : float, optional
+        Time in seconds to wait for locks held by other processes.
+        (Default: 30.0)
+
+    Attributes
+    ----------
+    stats : CacheStats
+        Hit and miss counts for lookups by this instance.
+    """
+    def __init__(self, cache_path, max_memory=2**16, timeout=30.0):
+        utils.validate_integer_arg(max_memory, 'max_memory', min_val=0)
+        utils.validate_ranged_arg(timeout, 'timeout', min_val=0)
+        self.cache_path = Path(cache_path)
+        self.max_memory = max_memory
+        self.timeout = timeout
+        self.stats = CacheStats()
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._connect()
+
+    def _connect(self):
+        """Return connection to database for current process."""
+        if self._pid == os.getpid():
+            return self._conn
+        # Connections must not be shared with forked children.
+        conn = sqlite3.connect(
+            self.cache_path, timeout=self.timeout, isolation_level=None,
+            check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, _VERSION):
+            conn.close()
+            raise ValueError(
+                f'Cache "{self.cache_path}" has unsupported format version '
+                f'{version}.')
+        if version == 0:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                conn.execute(f'PRAGMA user_version={_VERSION}')
+        self._conn = conn
+        self._pid = os.getpid()
+        return conn
+
+    def model_digest(self, model_path):
+        """Return digest of contents of model file.
+
+        Digests are stored in the database keyed by the path, size, and
+        modification time of the file, so that the file is only read if it
+        has changed since it was last seen.
+        """
+        model_path = Path(model_path).resolve()
+        stat = os.stat(model_path)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                'SELECT size, mtime_ns, digest FROM models WHERE path=?',
+                (str(model_path),)).fetchone()
+        if row is not None and row[:2] == (stat.st_size, stat.st_mtime_ns):
+            return row[2]
+        with trace.span('G2PCache.hash_model', size=stat.st_size):
+            digest = _hash_file(model_path)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO models VALUES (?, ?, ?, ?)',
+                (str(model_path), stat.st_size, stat.st_mtime_ns, digest))
+        return digest
+
+    def get_many(self, model, params, words):
+        """Return cached pronunciations of words.
+
+        Parameters
+        ----------
+        model : str
+            Model digest, as returned by ``model_digest``.
+
+        params : str
+            Key identifying decoding parameters.
+
+        words : iterable of str
+            Distinct words to look up.
+
+        Returns
+        -------
+        word_to_prons : dict
+            Mapping from words found in the cache to mappings from their
+            pronunciations to probabilities. Words whose pronunciations were
+            cached as empty map to empty dicts. Must not be modified.
+        """
+        word_to_prons = {}
+        missing = []
+        lru = self._lru
+        with self._lock:
+            for word in words:
+                key = (model, params, word)
+                prons = lru.get(key)
+                if prons is None:
+                    missing.append(word)
+                else:
+                    lru.move_to_end(key)
+                    word_to_prons[word] = prons
+            n_memory_hits = len(word_to_prons)
+            if missing:
+                conn = self._connect()
+                for bi in range(0, len(missing), _QUERY_SIZE):
+                    query = missing[bi:bi+_QUERY_SIZE]
+                    placeholders = ','.join('?'*len(query))
+                    rows = conn.execute(
+                        f'SELECT word, prons FROM prons WHERE model=? AND '
+                        f'params=? AND word IN ({placeholders})',
+                        [model, params, *query])
+                    for word, prons in rows:
+                        prons = _decode_prons(prons)
+                        word_to_prons[word] = prons
+                        self._remember((model, params, word), prons)
+            stats = self.stats
+            n_disk_hits = len(word_to_prons) - n_memory_hits
+            n_misses = len(missing) - n_disk_hits
+            stats.memory_hits += n_memory_hits
+            stats.disk_hits += n_disk_hits
+            stats.misses += n_misses
+        trace.incr('G2PCache.memory_hits', n_memory_hits)
+        trace.incr('G2PCache.disk_hits', n_disk_hits)
+        trace.incr('G2PCache.misses', n_misses)
+        return word_to_prons
+
+    def put_many(self, model, params, word_to_prons):
+        """Add pronunciations of words to cache.
+
+        Parameters
+        ----------
+        model : str
+            Model digest, as returned by ``model_digest``.
+
+        params : str
+            Key identifying decoding parameters.
+
+        word_to_prons : dict
+            Mapping from words to mappings from their pronunciations to
+            probabilities. Must not be modified after being added.
+        """
+        if not word_to_prons:
+            return
+        rows = [(model, params, word, _encode_prons(prons))
+                for word, prons in word_to_prons.items()]
+        with self._lock:
+            for word, prons in word_to_prons.items():
+                self._remember((model, params, word), prons)
+            conn = self._connect()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany(
+                    'INSERT OR REPLACE INTO prons VALUES (?, ?, ?, ?)', rows)
+            self.stats.writes += len(rows)
+
+    def _remember(self, key, prons):
+        """Add entry to in-memory LRU, evicting the oldest if full."""
+        if not self.max_memory:
+            return
+        lru = self._lru
+        lru[key] = prons
+        lru.move_to_end(key)
+        if len(lru) > self.max_memory:
+            lru.popitem(last=False)
+
+    def prune(self, keep_models):
+        """Remove entries for all models except those in ``keep_models``.
+
+        Returns the number of entries removed.
+        """
+        keep_models = list(keep_models)
+        placeholders = ','.join('?'*len(keep_models))
+        with self._lock:
+            self._lru.clear()
+            conn = self._connect()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                cursor = conn.execute(
+                    f'DELETE FROM prons WHERE model NOT IN ({placeholders})',
+                    keep_models)
+                conn.execute(
+                    f'DELETE FROM models WHERE digest NOT IN '
+                    f'({placeholders})', keep_models)
+        return cursor.rowcount
+
+    def clear(self):
+        """Remove all entries."""
+        self.prune([])
+
+    def close(self):
+        """Close connection to database."""
+        with self._lock:
+            if self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._pid = None
+
+    def __len__(self):
+        with self._lock:
+            conn = self._connect()
+            return conn.execute('SELECT COUNT(*) FROM prons').fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return (f'G2PCache({str(self.cache_path)!r}, '
+                f'max_memory={self.max_memory})')
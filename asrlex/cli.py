@@ -1,12 +1,23 @@
 #!/usr/bin/env python
 """TODO"""
 from argparse import ArgumentParser
+from collections import Counter
+import cProfile
+import heapq
+import json
+import math
 from pathlib import Path
+import sys
+import time
 
-from asrlex.g2p import G2P
-from asrlex.prondict import PronDict
+# Modules of asrlex are imported within the commands using them, so that
+# startup only pays for what a command needs.
 
 
+# Maximum number of words decoded per call to ``G2P.get_prons_batch`` by
+# ``predict``, and so per task dispatched to worker processes.
+G2P_BATCH_SIZE = 256
+
 
 def train_g2p(args):
     """Train G2P model.
@@ -14,6 +25,8 @@ def train_g2p(args):
     Wrapper around ``G2P.train``, which itself wraps ``phonetisaurus-train``.
     """
     # TODO: Eliminate boilerplate via jsonargparse or similar.
+    from asrlex.g2p import G2P
+    from asrlex.prondict import PronDict
     pdicts = [PronDict.load_dict(pth) for pth in args.pdict]
     pdict = PronDict.union(*pdicts)
     G2P.train_g2p(args.model, pdict, ngram_order=args.ngram_order,
@@ -22,11 +35,106 @@ def train_g2p(args):
                   grow=args.grow)
 
 
+class _Progress:
+    """Progress meter written to STDERR.
+
+    Parameters
+    ----------
+    total : int
+        Total number of items.
+
+    interval : float, optional
+        Minimum interval in seconds between updates.
+        (Default: 0.5)
+    """
+    def __init__(self, total, interval=0.5, file=sys.stderr):
+        self.total = total
+        self.interval = interval
+        self.file = file
+        self.n = 0
+        self.start = time.perf_counter()
+        self._last = -math.inf
+
+    def update(self, n=1):
+        """Advance meter by ``n`` items."""
+        self.n += n
+        now = time.perf_counter()
+        if now - self._last >= self.interval or self.n == self.total:
+            self._last = now
+            self._write(now - self.start)
+
+    def _write(self, elapsed):
+        rate = self.n / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.n) / rate if rate > 0 else math.inf
+        eta = '?' if math.isinf(eta) else f'{eta:.0f}s'
+        self.file.write(
+            f'\r{self.n}/{self.total} words | {rate:.1f} words/s | '
+            f'ETA {eta}  ')
+        self.file.flush()
+
+    def close(self):
+        self.file.write('\n')
+        self.file.flush()
+
+
+def _percentile(sorted_vals, p):
+    """Return ``p``-th percentile of sorted values by nearest rank."""
+    if not sorted_vals:
+        return 0.0
+    rank = max(math.ceil(p/100*len(sorted_vals)), 1)
+    return sorted_vals[rank - 1]
+
+
+def _latency_summary(latencies, n_empty, elapsed, n_slowest=10):
+    """Return JSON serializable summary of per-word G2P latencies.
+
+    Latencies are reported in milliseconds.
+    """
+    vals = sorted(latencies.values())
+    n_words = len(vals)
+    slowest = heapq.nlargest(
+        n_slowest, latencies.items(), key=lambda x: x[1])
+    return {
+        'n_words' : n_words,
+        'n_empty' : n_empty,
+        'elapsed' : elapsed,
+        'words_per_sec' : n_words / elapsed if elapsed > 0 else 0.0,
+        'latency_ms' : {
+            'mean' : 1000*sum(vals) / n_words if n_words else 0.0,
+            'p50' : 1000*_percentile(vals, 50),
+            'p95' : 1000*_percentile(vals, 95),
+            'p99' : 1000*_percentile(vals, 99),
+            'max' : 1000*vals[-1] if vals else 0.0,
+            },
+        'slowest' : [[word, 1000*latency] for word, latency in slowest],
+        }
+
+
 def predict_g2p(args):
     """Generate pronunciations using G2P model.
 
-    Pronunciations will be written to STDOUT.
+    Pronunciations will be written to STDOUT. If ``--summary`` is specified,
+    throughput and per-word latency statistics, and cache statistics if
+    ``--cache`` is specified, will be written as JSON.
     """
+    if args.profile is not None:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            _predict_g2p(args)
+        finally:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        return
+    _predict_g2p(args)
+
+
+def _predict_g2p(args):
+    from asrlex.g2p import G2P
+    from asrlex.normalize import Normalizer
+    from asrlex.prondict import PronDict
+    from asrlex.resolve import HybridResolver, LEXICON_TAG
+
     # Determine words to generate pronunciations for.
     words = []
     if args.words is not None:
@@ -39,19 +147,187 @@ def predict_g2p(args):
                     continue
                 words.append(line.strip())
 
-    # Generate pronunciations sequentially using supplied G2P model.
-    model = G2P(args.model)
-    pdict = PronDict()
-    for word in sorted(words):
-        prons = model.get_prons(
-            word, n_best=args.n_best, cum_prob=args.cum_prob,
-            thresh=args.thresh, beam=args.beam, accumulate=args.accumulate)
-        pdict.add_pron(word, *prons)
-    pdict.print_dict(sep=args.sep)
+    # Resolve words found in the lexicon, if any, and generate
+    # pronunciations for the rest in batches using supplied G2P model,
+    # possibly in parallel. Results arrive in arbitrary order, but are output
+    # sorted.
+    lexicon = PronDict()
+    if args.lexicon is not None:
+        normalizer = Normalizer() if args.normalize else None
+        lexicon = PronDict.load_dict(args.lexicon, normalizer=normalizer)
+    model = G2P(args.model, cache=args.cache)
+    resolver = HybridResolver(lexicon, model, normalize=args.normalize)
+    words = sorted(set(words))
+    latencies = {}
+    progress = _Progress(len(words)) if args.progress else None
+    def record(word, source, latency):
+        if source != LEXICON_TAG:
+            latencies[word] = latency
+        if progress is not None:
+            progress.update()
+    start = time.perf_counter()
+    pdict, report = resolver.resolve(
+        words, n_jobs=args.jobs, chunk_size=G2P_BATCH_SIZE, callback=record,
+        n_best=args.n_best, cum_prob=args.cum_prob, thresh=args.thresh,
+        beam=args.beam, accumulate=args.accumulate)
+    elapsed = time.perf_counter() - start
+    if progress is not None:
+        progress.close()
+    pdict.print_dict(
+        sep=args.sep, lexiconp=args.lexiconp, tags=args.tag_source)
+    if args.lexicon is not None:
+        print(f'Resolved {report.n_words} words: {report.n_lexicon} from '
+              f'lexicon ({report.n_normalized} normalized), {report.n_g2p} '
+              f'by G2P, {report.n_unresolved} unresolved.', file=sys.stderr)
+
+    # Summarize throughput and latency.
+    if args.summary is not None:
+        summary = _latency_summary(latencies, report.n_unresolved, elapsed)
+        summary['sources'] = report.to_dict()
+        if model.cache is not None:
+            summary['cache'] = model.cache.stats.to_dict()
+        summary = json.dumps(summary, indent=2, ensure_ascii=False)
+        if args.summary == '-':
+            print(summary, file=sys.stderr)
+        else:
+            with open(args.summary, 'w', encoding='utf-8') as f:
+                f.write(summary + '\n')
+
+
+def lookup(args):
+    """Map transcript to phone sequences using pronunciation dictionary.
+
+    Phone sequences will be written to STDOUT, one utterance per line.
+    """
+    from asrlex.corpus import lookup_transcript
+    from asrlex.normalize import Normalizer
+    from asrlex.prondict import PronDict
+    normalizer = Normalizer() if args.normalize else None
+    pdicts = [PronDict.load_dict(pth, oov_pron=args.oov_pron.split(),
+                                 normalizer=normalizer)
+              for pth in args.pdict]
+    pdict = PronDict.union(*pdicts)
+    oov_counts = Counter()
+    with open(args.transcript, 'r', encoding='utf-8') as f:
+        results = lookup_transcript(
+            f, pdict, has_utt_ids=not args.no_utt_ids,
+            normalize=args.normalize, n_jobs=args.jobs)
+        for utt_id, phones, oovs in results:
+            line = ' '.join(phones)
+            if utt_id is not None:
+                line = f'{utt_id}{args.sep}{line}'
+            print(line)
+            oov_counts.update(oovs)
+    if args.oov_report is not None:
+        with open(args.oov_report, 'w', encoding='utf-8') as f:
+            for word, count in sorted(
+                    oov_counts.items(), key=lambda x: (-x[1], x[0])):
+                f.write(f'{word}\t{count}\n')
+
+
+def oov(args):
+    """Find out-of-vocabulary words in text corpus.
+
+    OOV words and their counts will be written to STDOUT, most frequent
+    first. Summary statistics will be written to STDERR.
+    """
+    from asrlex.corpus import count_oovs
+    from asrlex.normalize import Normalizer
+    from asrlex.prondict import PronDict
+    normalizer = Normalizer() if args.normalize else None
+    pdict = PronDict.load_dict(args.pdict, normalizer=normalizer)
+    report = count_oovs(
+        args.text, pdict, has_utt_ids=args.utt_ids,
+        normalize=args.normalize, n_jobs=args.jobs)
+    for word, count in report.most_common():
+        if count < args.min_count:
+            break
+        print(f'{word}{args.sep}{count}')
+    print(f'tokens: {report.n_tokens}', file=sys.stderr)
+    print(f'OOV tokens: {report.n_oov_tokens} '
+          f'({100*report.token_oov_rate:.2f}%)', file=sys.stderr)
+    print(f'types: {report.n_types}', file=sys.stderr)
+    print(f'OOV types: {report.n_oov_types} '
+          f'({100*report.type_oov_rate:.2f}%)', file=sys.stderr)
+
+
+def stats(args):
+    """Compute pronunciation dictionary statistics.
+
+    Statistics will be written to STDOUT as JSON. If ``--memory`` is
+    specified, memory usage of the loaded dictionary in bytes, by component,
+    is included under the "memory" key.
+    """
+    from asrlex.parsing import DictParser
+    from asrlex.prondict import PronDict
+    from asrlex.stats import lexicon_stats
+
+    # All files are parsed into a single mapping, which merges entries of
+    # words occurring in several files as they are parsed, rather than
+    # loading each into a dictionary and copying them into their union.
+    parser = DictParser()
+    for pth in args.pdict:
+        parser.parse_file(pth)
+    stats = lexicon_stats(parser.word_to_prons.items())
+    if args.memory:
+        pdict = PronDict()
+        pdict._word_to_prons = parser.word_to_prons
+        stats['memory'] = pdict.memory_usage(sample=args.memory_sample)
+    print(json.dumps(stats, indent=args.indent, ensure_ascii=False))
+
+
+def prune(args):
+    """Prune pronunciation dictionary to most frequent words.
+
+    Pruned dictionary will be written to STDOUT.
+    """
+    from asrlex.prondict import PronDict
+    counts = Counter()
+    with open(args.counts, 'r', encoding='utf-8') as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) != 2:
+                continue
+            counts[fields[0]] += int(fields[1])
+    pdict = PronDict.load_dict(args.pdict, lexiconp=args.lexiconp)
+    pdict.prune_by_counts(
+        counts, max_words=args.max_words,
+        max_prons_per_word=args.max_prons, min_count=args.min_count)
+    pdict.print_dict(sep=args.sep, lexiconp=args.lexiconp)
+
+
+def bench(args):
+    """Benchmark lexicon operations and G2P on user supplied data.
+
+    Results will be written to STDOUT as a table and, if ``--json`` is
+    specified, as JSON.
+    """
+    from asrlex.bench import format_table, get_metadata, run_battery
+    words = None
+    if args.words_file is not None:
+        with open(args.words_file, 'r', encoding='utf-8') as f:
+            words = [line.strip() for line in f if line.strip()]
+    results = []
+    for result in run_battery(args.pdict, model_path=args.model, words=words,
+                              n_g2p_words=args.n_g2p_words):
+        results.append(result)
+        print(format_table([result]).splitlines()[-1], file=sys.stderr)
+    print(format_table(results))
+    if args.json is not None:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'metadata' : get_metadata(), 'results' : results}, f,
+                      indent=2)
+            f.write('\n')
 
 
 def main():
     parser = ArgumentParser()
+    parser.add_argument(
+        '--trace', metavar='TRACE', default=None, type=Path,
+        help='write timing spans and counters to TRACE as JSON lines')
+    parser.add_argument(
+        '--trace-summary', default=False, action='store_true',
+        help='write summary of timing spans and counters to STDERR')
     subcommands = parser.add_subparsers()
 
     # Training.
@@ -120,10 +396,185 @@ def main():
     predict_parser.add_argument(
         '--sep', metavar='SEP', default='\t',
         help='separatator between head word and pronunciation in output')
+    predict_parser.add_argument(
+        '--lexiconp', default=False, action='store_true',
+        help='output pronunciation probabilities in Kaldi lexiconp.txt '
+             'format')
+    predict_parser.add_argument(
+        '--progress', default=False, action='store_true',
+        help='report progress, throughput, and ETA on STDERR')
+    predict_parser.add_argument(
+        '--summary', metavar='FILE', default=None,
+        help='write JSON summary of throughput and per-word latency to FILE; '
+             'if FILE is "-", write to STDERR')
+    predict_parser.add_argument(
+        '--profile', metavar='FILE', default=None, type=Path,
+        help='write cProfile statistics for run to FILE')
+    predict_parser.add_argument(
+        '--jobs', '-j', metavar='JOBS', default=1, type=int,
+        help='number of worker processes (Default: %(default)s)')
+    predict_parser.add_argument(
+        '--cache', metavar='FILE', default=None, type=Path,
+        help='cache generated pronunciations in SQLite database FILE, which '
+             'may be shared by concurrent runs; entries are keyed by the '
+             'contents of the model and the decoding options')
+    predict_parser.add_argument(
+        '--lexicon', metavar='FILE', default=None, type=Path,
+        help='take pronunciations of words found in lexicon FILE from it, '
+             'and generate pronunciations only for the rest')
+    predict_parser.add_argument(
+        '--normalize', default=False, action='store_true',
+        help='also take pronunciations from the lexicon for words matching '
+             'a head word after case folding, Unicode normalization, and '
+             'punctuation stripping')
+    predict_parser.add_argument(
+        '--tag-source', default=False, action='store_true',
+        help='append source of each pronunciation ("lexicon" or "g2p") to '
+             'output as final field')
     predict_parser.set_defaults(func=predict_g2p)
 
+    # Lookup.
+    lookup_parser = subcommands.add_parser(
+        'lookup',
+        description='map transcript to phone sequences using pronunciation '
+                    'dictionary')
+    lookup_parser.add_argument(
+        'transcript', type=Path,
+        help='path to transcript; one utterance per line')
+    lookup_parser.add_argument(
+        'pdict', type=Path, nargs='+', help='path to pronunciation dictionary')
+    lookup_parser.add_argument(
+        '--oov-report', metavar='FILE', type=Path, default=None,
+        help='write out-of-vocabulary tokens and their counts to FILE')
+    lookup_parser.add_argument(
+        '--oov-pron', metavar='PRON', default='OOV',
+        help='pronunciation to output for out-of-vocabulary tokens '
+             '(Default: %(default)s)')
+    lookup_parser.add_argument(
+        '--normalize', default=False, action='store_true',
+        help='resolve tokens that are not head words by case folding, '
+             'Unicode normalization, and punctuation stripping')
+    lookup_parser.add_argument(
+        '--no-utt-ids', default=False, action='store_true',
+        help='transcript lines do not begin with an utterance ID')
+    lookup_parser.add_argument(
+        '--jobs', '-j', metavar='JOBS', default=1, type=int,
+        help='number of worker processes (Default: %(default)s)')
+    lookup_parser.add_argument(
+        '--sep', metavar='SEP', default=' ',
+        help='separator between utterance ID and phones in output')
+    lookup_parser.set_defaults(func=lookup)
+
+    # OOV discovery.
+    oov_parser = subcommands.add_parser(
+        'oov', description='find out-of-vocabulary words in text corpus')
+    oov_parser.add_argument(
+        'pdict', type=Path, help='path to pronunciation dictionary')
+    oov_parser.add_argument(
+        'text', type=Path, nargs='+',
+        help='path to text file; one sentence or utterance per line')
+    oov_parser.add_argument(
+        '--min-count', metavar='COUNT', default=1, type=int,
+        help='only output OOV words occurring at least COUNT times '
+             '(Default: %(default)s)')
+    oov_parser.add_argument(
+        '--normalize', default=False, action='store_true',
+        help='treat tokens matching a head word after case folding, Unicode '
+             'normalization, and punctuation stripping as in-vocabulary')
+    oov_parser.add_argument(
+        '--utt-ids', default=False, action='store_true',
+        help='text lines begin with an utterance ID')
+    oov_parser.add_argument(
+        '--jobs', '-j', metavar='JOBS', default=1, type=int,
+        help='number of worker processes (Default: %(default)s)')
+    oov_parser.add_argument(
+        '--sep', metavar='SEP', default='\t',
+        help='separator between word and count in output')
+    oov_parser.set_defaults(func=oov)
+
+    # Statistics.
+    stats_parser = subcommands.add_parser(
+        'stats', description='compute pronunciation dictionary statistics')
+    stats_parser.add_argument(
+        'pdict', type=Path, nargs='+', help='path to pronunciation dictionary')
+    stats_parser.add_argument(
+        '--indent', metavar='INDENT', default=2, type=int,
+        help='JSON indentation level (Default: %(default)s)')
+    stats_parser.add_argument(
+        '--memory', default=False, action='store_true',
+        help='report memory usage of dictionary')
+    stats_parser.add_argument(
+        '--memory-sample', metavar='N', default=None, type=int,
+        help='estimate memory usage from a sample of N words')
+    stats_parser.set_defaults(func=stats)
+
+    # Pruning.
+    prune_parser = subcommands.add_parser(
+        'prune',
+        description='prune pronunciation dictionary to most frequent words')
+    prune_parser.add_argument(
+        'pdict', type=Path, help='path to pronunciation dictionary')
+    prune_parser.add_argument(
+        'counts', type=Path,
+        help='path to word counts; one word and its count per line, '
+             'separated by whitespace')
+    prune_parser.add_argument(
+        '--max-words', metavar='N', default=None, type=int,
+        help='retain the N most frequent words')
+    prune_parser.add_argument(
+        '--max-prons', metavar='K', default=None, type=int,
+        help='retain at most K pronunciations per word, preferring those '
+             'with the highest scores')
+    prune_parser.add_argument(
+        '--min-count', metavar='COUNT', default=None, type=int,
+        help='remove words occurring fewer than COUNT times')
+    prune_parser.add_argument(
+        '--lexiconp', default=False, action='store_true',
+        help='read and write dictionaries in Kaldi lexiconp.txt format')
+    prune_parser.add_argument(
+        '--sep', metavar='SEP', default='\t',
+        help='separatator between head word and pronunciation in output')
+    prune_parser.set_defaults(func=prune)
+
+    # Benchmarking.
+    bench_parser = subcommands.add_parser(
+        'bench',
+        description='benchmark lexicon operations and G2P on your own data')
+    bench_parser.add_argument(
+        'pdict', type=Path, nargs='+', help='path to pronunciation dictionary')
+    bench_parser.add_argument(
+        '--model', metavar='MODEL', default=None, type=Path,
+        help='path to Phonetisaurus G2P model; if omitted, G2P benchmarks '
+             'are skipped')
+    bench_parser.add_argument(
+        '--words-file', metavar='FILE', default=None, type=Path,
+        help='path to file of words to look up and decode, one per line '
+             '(Default: head words of dictionaries)')
+    bench_parser.add_argument(
+        '--n-g2p-words', metavar='N', default=1000, type=int,
+        help='maximum number of words to decode per G2P configuration '
+             '(Default: %(default)s)')
+    bench_parser.add_argument(
+        '--json', metavar='FILE', default=None, type=Path,
+        help='write results and environment metadata to FILE as JSON')
+    bench_parser.set_defaults(func=bench)
+
     args = parser.parse_args()
-    args.func(args)
+    if args.trace is None and not args.trace_summary:
+        args.func(args)
+        return
+    from asrlex import trace
+    sinks = []
+    if args.trace is not None:
+        sinks.append(trace.JSONLinesSink(args.trace))
+    if args.trace_summary:
+        summary = trace.SummarySink()
+        sinks.append(summary)
+    with trace.sink_installed(trace.MultiSink(*sinks)):
+        with trace.span(f'cli.{args.func.__name__}'):
+            args.func(args)
+    if args.trace_summary:
+        print(summary.format_table(), file=sys.stderr)
 
 
 if __name__ == '__main__':
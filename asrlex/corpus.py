@@ -0,0 +1,338 @@
+"""Processing of transcripts and text corpora against a lexicon."""
+from collections import Counter
+from itertools import islice
+from multiprocessing import Pool
+import os
+from pathlib import Path
+
+from . import trace
+from . import utils
+
+__all__ = ['OOVReport', 'count_oovs', 'lookup_transcript']
+
+
+# Pronunciation dictionary used by worker processes. Set once per worker by
+# the pool initializer so that it is not re-sent with every chunk.
+_WORKER_PDICT = None
+
+
+def _init_worker(pdict):
+    global _WORKER_PDICT
+    # Sinks inherited from the parent must not be written from workers.
+    trace.set_sink(None)
+    _WORKER_PDICT = pdict
+
+
+def _make_pool(n_jobs, pdict):
+    """Return pool of workers sharing read-only dictionary ``pdict``.
+
+    When processes are forked, as is the default on Linux, the workers
+    inherit ``pdict`` from the parent copy-on-write rather than receiving
+    pickled copies.
+    """
+    return Pool(n_jobs, initializer=_init_worker, initargs=(pdict,))
+
+
+def _chunks(iterable, chunk_size):
+    """Split ``iterable`` into lists of at most ``chunk_size`` elements."""
+    iterable = iter(iterable)
+    while True:
+        chunk = list(islice(iterable, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _lookup_lines(lines, pdict, has_utt_ids, normalize):
+    """Map lines of a transcript to phone sequences.
+
+    Returns a list of ``(utt_id, phones, oovs)`` triples.
+    """
+    # Tokenize all lines in the chunk, then look up every token in one call.
+    utt_ids = []
+    lengths = []
+    tokens = []
+    for line in lines:
+        fields = line.split()
+        utt_id = None
+        if has_utt_ids and fields:
+            utt_id = fields[0]
+            fields = fields[1:]
+        utt_ids.append(utt_id)
+        lengths.append(len(fields))
+        tokens.extend(fields)
+    pron_ids, offsets, oov_mask = pdict.lookup_many(
+        tokens, normalize=normalize)
+
+    # Select first pronunciation for each in-vocabulary token.
+    first_ids = iter(pron_ids[offsets[:-1][~oov_mask]].tolist())
+    oov_mask = oov_mask.tolist()
+    prons = pdict.prons
+    results = []
+    bi = 0
+    for utt_id, n_tokens in zip(utt_ids, lengths):
+        ei = bi + n_tokens
+        phones = []
+        oovs = []
+        for token, is_oov in zip(tokens[bi:ei], oov_mask[bi:ei]):
+            if is_oov:
+                phones.extend(pdict.oov_pron)
+                oovs.append(token)
+            else:
+                phones.extend(prons[next(first_ids)])
+        results.append((utt_id, tuple(phones), oovs))
+        bi = ei
+    return results
+
+
+def _lookup_lines_worker(args):
+    lines, has_utt_ids, normalize = args
+    return _lookup_lines(lines, _WORKER_PDICT, has_utt_ids, normalize)
+
+
+def lookup_transcript(lines, pdict, has_utt_ids=True, normalize=True,
+                      n_jobs=1, chunk_size=1000):
+    """Map each utterance of a transcript to a phone sequence.
+
+    Each token is mapped to its first pronunciation in lexicographic order;
+    out-of-vocabulary tokens are mapped to ``pdict.oov_pron``. Lines are
+    consumed lazily, so arbitrarily large transcripts may be processed in
+    constant memory.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        Lines of transcript, one utterance per line. Tokens are delimited by
+        whitespace.
+
+    pdict : PronDict
+        Pronunciation dictionary.
+
+    has_utt_ids : bool, optional
+        If True, the first field of each line is an utterance ID, as in
+        Kaldi ``text`` files.
+        (Default: True)
+
+    normalize : bool, optional
+        If True, resolve tokens that are not head words through the
+        normalized-key index of ``pdict``.
+        (Default: True)
+
+    n_jobs : int, optional
+        Number of worker processes.
+        (Default: 1)
+
+    chunk_size : int, optional
+        Number of lines dispatched to a worker at a time.
+        (Default: 1000)
+
+    Yields
+    ------
+    utt_id : str
+        Utterance ID. None if ``has_utt_ids=False``.
+
+    phones : tuple of str
+        Phone sequence for utterance.
+
+    oovs : list of str
+        Out-of-vocabulary tokens in utterance.
+    """
+    utils.validate_integer_arg(n_jobs, 'n_jobs', min_val=1)
+    utils.validate_integer_arg(chunk_size, 'chunk_size', min_val=1)
+    chunks = _chunks(lines, chunk_size)
+    if n_jobs == 1:
+        for chunk in chunks:
+            yield from _lookup_lines(chunk, pdict, has_utt_ids, normalize)
+        return
+    pdict.prons # Build pronunciation table once, before it is shipped.
+    with _make_pool(n_jobs, pdict) as pool:
+        tasks = ((chunk, has_utt_ids, normalize) for chunk in chunks)
+        for results in pool.imap(_lookup_lines_worker, tasks):
+            yield from results
+
+
+class OOVReport:
+    """Out-of-vocabulary statistics for a text corpus.
+
+    Reports are mergeable, so may be computed independently over shards of
+    a corpus and then combined:
+
+        >>> report = report1 + report2
+
+    Parameters
+    ----------
+    iv_counts : Counter, optional
+        Counts of in-vocabulary tokens.
+
+    oov_counts : Counter, optional
+        Counts of out-of-vocabulary tokens.
+    """
+    def __init__(self, iv_counts=None, oov_counts=None):
+        self.iv_counts = Counter() if iv_counts is None else iv_counts
+        self.oov_counts = Counter() if oov_counts is None else oov_counts
+
+    def update(self, other):
+        """Add counts from another report."""
+        self.iv_counts.update(other.iv_counts)
+        self.oov_counts.update(other.oov_counts)
+
+    @property
+    def n_tokens(self):
+        """Number of tokens."""
+        return self.n_iv_tokens + self.n_oov_tokens
+
+    @property
+    def n_iv_tokens(self):
+        """Number of in-vocabulary tokens."""
+        return sum(self.iv_counts.values())
+
+    @property
+    def n_oov_tokens(self):
+        """Number of out-of-vocabulary tokens."""
+        return sum(self.oov_counts.values())
+
+    @property
+    def n_types(self):
+        """Number of distinct tokens."""
+        return len(self.iv_counts) + len(self.oov_counts)
+
+    @property
+    def n_oov_types(self):
+        """Number of distinct out-of-vocabulary tokens."""
+        return len(self.oov_counts)
+
+    @property
+    def token_oov_rate(self):
+        """Proportion of tokens that are out-of-vocabulary."""
+        n_tokens = self.n_tokens
+        return self.n_oov_tokens / n_tokens if n_tokens else 0.0
+
+    @property
+    def type_oov_rate(self):
+        """Proportion of distinct tokens that are out-of-vocabulary."""
+        n_types = self.n_types
+        return self.n_oov_types / n_types if n_types else 0.0
+
+    def most_common(self, n=None):
+        """Return out-of-vocabulary tokens and counts, most frequent first.
+
+        Ties are broken by lexicographic order of the tokens.
+        """
+        oovs = sorted(self.oov_counts.items(), key=lambda x: (-x[1], x[0]))
+        return oovs if n is None else oovs[:n]
+
+    def __add__(self, other):
+        report = OOVReport(self.iv_counts.copy(), self.oov_counts.copy())
+        report.update(other)
+        return report
+
+    def __repr__(self):
+        return (f'OOVReport(n_tokens={self.n_tokens}, '
+                f'n_oov_tokens={self.n_oov_tokens}, n_types={self.n_types}, '
+                f'n_oov_types={self.n_oov_types})')
+
+
+def _plan_shards(paths, shard_size):
+    """Split files into byte ranges of at most ``shard_size`` bytes."""
+    shards = []
+    for path in paths:
+        size = os.path.getsize(path)
+        for start in range(0, max(size, 1), shard_size):
+            shards.append((path, start, min(start + shard_size, size)))
+    return shards
+
+
+def _count_shard(path, start, end, pdict, has_utt_ids, normalize):
+    """Compute ``OOVReport`` for lines beginning in byte range of file."""
+    counts = Counter()
+    with open(path, 'rb') as f:
+        if start > 0:
+            # Skip partial line; it belongs to the previous shard.
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            tokens = line.split()
+            if has_utt_ids:
+                tokens = tokens[1:]
+            counts.update(tokens)
+
+    # Check each distinct token against the lexicon exactly once.
+    report = OOVReport()
+    for token, count in counts.items():
+        token = token.decode('utf-8')
+        if normalize:
+            is_oov = not pdict.find_words(token)
+        else:
+            is_oov = token not in pdict
+        if is_oov:
+            report.oov_counts[token] = count
+        else:
+            report.iv_counts[token] = count
+    return report
+
+
+def _count_shard_worker(args):
+    path, start, end, has_utt_ids, normalize = args
+    return _count_shard(
+        path, start, end, _WORKER_PDICT, has_utt_ids, normalize)
+
+
+def count_oovs(paths, pdict, has_utt_ids=False, normalize=True, n_jobs=1,
+               shard_size=2**26):
+    """Count out-of-vocabulary tokens in text files.
+
+    Files are split into shards of approximately ``shard_size`` bytes, which
+    are tokenized on whitespace and counted independently, possibly in
+    parallel, before their counts are merged.
+
+    Parameters
+    ----------
+    paths : iterable of Path
+        Paths to text files, one sentence or utterance per line.
+
+    pdict : PronDict
+        Pronunciation dictionary.
+
+    has_utt_ids : bool, optional
+        If True, the first field of each line is an utterance ID, which is
+        excluded from counts.
+        (Default: False)
+
+    normalize : bool, optional
+        If True, tokens that are not head words, but which are resolved
+        through the normalized-key index of ``pdict``, are in-vocabulary.
+        (Default: True)
+
+    n_jobs : int, optional
+        Number of worker processes.
+        (Default: 1)
+
+    shard_size : int, optional
+        Shard size in bytes.
+        (Default: 2**26)
+
+    Returns
+    -------
+    report : OOVReport
+        Token counts and OOV rates.
+    """
+    utils.validate_integer_arg(n_jobs, 'n_jobs', min_val=1)
+    utils.validate_integer_arg(shard_size, 'shard_size', min_val=1)
+    shards = _plan_shards([Path(path) for path in paths], shard_size)
+    tasks = [(path, start, end, has_utt_ids, normalize)
+             for path, start, end in shards]
+    report = OOVReport()
+    if n_jobs == 1:
+        for path, start, end, _, _ in tasks:
+            report.update(_count_shard(
+                path, start, end, pdict, has_utt_ids, normalize))
+        return report
+    with _make_pool(n_jobs, pdict) as pool:
+        for shard_report in pool.imap_unordered(_count_shard_worker, tasks):
+            report.update(shard_report)
+    return report
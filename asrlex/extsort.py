@@ -0,0 +1,295 @@
+"""External-memory sorted writing of pronunciation dictionaries."""
+import heapq
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+
+from . import utils
+from .prondict import _get_score_merge_func, format_entry
+
+__all__ = ['SortedDictWriter', 'sort_dict_file']
+
+
+# Approximate per-entry overhead in bytes of the in-memory run (hash table
+# slot, key tuple, and score), beyond the word and pronunciation themselves.
+_ENTRY_OVERHEAD = 200
+
+# Approximate size in bytes of a phone string.
+_PHONE_SIZE = sys.getsizeof('aa')
+
+
+class SortedDictWriter:
+    """Writer of sorted dictionary files larger than memory.
+
+    Entries are added in any order. They are accumulated in memory until
+    ``memory_budget`` is reached, at which point they are sorted and spilled
+    to a temporary file (a "run"). On ``close``, the runs are merged into a
+    single file, sorted and deduplicated as by ``PronDict.write_dict``:
+
+        >>> with SortedDictWriter('web.dict', memory_budget=2**30) as writer:
+        ...     for word, pron in entries:
+        ...         writer.add(word, pron)
+
+    If an exception is raised within the ``with`` block, no output is
+    written.
+
+    Parameters
+    ----------
+    dict_path : Path
+        Path to output pronunciation dictionary.
+
+    memory_budget : int, optional
+        Approximate maximum memory in bytes used to buffer entries.
+        (Default: 2**28)
+
+    align_lexicon : bool, optional
+        If True, output dictionary in Kaldi alignment lexicon format.
+        (Default: False)
+
+    sep : str, optional
+        Field separator.
+        (Default: '\\t')
+
+    lexiconp : bool, optional
+        If True, output dictionary in Kaldi ``lexiconp.txt`` format.
+        Unscored pronunciations are output with probability 1.
+        (Default: False)
+
+    score_merge : str, optional
+        Rule for merging scores of duplicate entries. See
+        ``PronDict.update``.
+        (Default: 'max')
+
+    tmp_dir : Path, optional
+        Directory for runs. If None, the system default is used.
+        (Default: None)
+
+    max_fan_in : int, optional
+        Maximum number of runs merged at once. If there are more runs, they
+        are first merged in groups into longer runs.
+        (Default: 64)
+
+    Attributes
+    ----------
+    n_runs : int
+        Number of runs currently on disk.
+    """
+    def __init__(self, dict_path, memory_budget=2**28, align_lexicon=False,
+                 sep='\t', lexiconp=False, score_merge='max', tmp_dir=None,
+                 max_fan_in=64):
+        utils.validate_integer_arg(memory_budget, 'memory_budget', min_val=1)
+        utils.validate_integer_arg(max_fan_in, 'max_fan_in', min_val=2)
+        self.dict_path = Path(dict_path)
+        self.memory_budget = memory_budget
+        self.align_lexicon = align_lexicon
+        self.sep = sep
+        self.lexiconp = lexiconp
+        self.max_fan_in = max_fan_in
+        self._merge_func = _get_score_merge_func(score_merge)
+        self._tmp_dir = Path(tempfile.mkdtemp(dir=tmp_dir))
+        self._run_paths = []
+        self._n_run_files = 0
+        self._entries = {}
+        self._n_bytes = 0
+        self._closed = False
+
+    @property
+    def n_runs(self):
+        return len(self._run_paths)
+
+    def add(self, word, pron, score=None):
+        """Add entry.
+
+        Parameters
+        ----------
+        word : str
+            Head word.
+
+        pron : iterable of str
+            Pronunciation.
+
+        score : float, optional
+            Score (e.g., probability) of pronunciation.
+            (Default: None)
+        """
+        if self._closed:
+            raise ValueError('Writer is closed.')
+        pron = tuple(pron)
+        key = (word, pron)
+        entries = self._entries
+        if key in entries:
+            entries[key] = _merge_scores(entries[key], score, self._merge_func)
+            return
+        entries[key] = score
+        self._n_bytes += (_ENTRY_OVERHEAD + sys.getsizeof(word) +
+                          sys.getsizeof(pron) + _PHONE_SIZE*len(pron))
+        if self._n_bytes >= self.memory_budget:
+            self._spill()
+
+    def add_entries(self, entries):
+        """Add entries.
+
+        Parameters
+        ----------
+        entries : iterable of tuple
+            Entries as ``(word, pron)`` or ``(word, pron, score)`` tuples.
+        """
+        for entry in entries:
+            self.add(*entry)
+
+    def _new_run_path(self):
+        run_path = Path(self._tmp_dir, f'run-{self._n_run_files:06d}')
+        self._n_run_files += 1
+        return run_path
+
+    def _spill(self):
+        """Sort buffered entries and write them to a new run."""
+        if not self._entries:
+            return
+        run_path = self._new_run_path()
+        _write_run(run_path, sorted(self._entries.items()))
+        self._run_paths.append(run_path)
+        self._entries = {}
+        self._n_bytes = 0
+
+    def _merge_runs(self, run_paths):
+        """Return iterator over merged, deduplicated entries of runs.
+
+        Runs are closed once the iterator is exhausted.
+        """
+        runs = [_iter_run(run_path) for run_path in run_paths]
+        merged = heapq.merge(*runs, key=lambda x: x[0])
+        prev_key, prev_score = None, None
+        for key, score in merged:
+            if key == prev_key:
+                prev_score = _merge_scores(prev_score, score, self._merge_func)
+                continue
+            if prev_key is not None:
+                yield prev_key, prev_score
+            prev_key, prev_score = key, score
+        if prev_key is not None:
+            yield prev_key, prev_score
+
+    def close(self):
+        """Merge runs and write output file."""
+        if self._closed:
+            return
+        try:
+            # Avoid a round trip through disk if everything fit in memory.
+            if not self._run_paths:
+                entries = sorted(self._entries.items())
+            else:
+                self._spill()
+                # Reduce number of runs to at most max_fan_in.
+                while len(self._run_paths) > self.max_fan_in:
+                    run_paths = self._run_paths
+                    self._run_paths = []
+                    for bi in range(0, len(run_paths), self.max_fan_in):
+                        group = run_paths[bi:bi+self.max_fan_in]
+                        run_path = self._new_run_path()
+                        _write_run(run_path, self._merge_runs(group))
+                        self._run_paths.append(run_path)
+                        for path in group:
+                            path.unlink()
+                entries = self._merge_runs(self._run_paths)
+            with open(self.dict_path, 'w', encoding='utf-8') as f:
+                for (word, pron), score in entries:
+                    f.write(format_entry(
+                        word, pron, score, self.align_lexicon, self.sep,
+                        self.lexiconp))
+                    f.write('\n')
+        finally:
+            self._cleanup()
+
+    def _cleanup(self):
+        self._closed = True
+        self._entries = {}
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._cleanup()
+        return False
+
+
+def _merge_scores(score1, score2, merge_func):
+    """Merge scores of duplicate entries; None denotes a missing score."""
+    if score1 is None:
+        return score2
+    if score2 is None:
+        return score1
+    return merge_func(score1, score2)
+
+
+def _write_run(run_path, entries):
+    """Write sorted ``((word, pron), score)`` pairs to run.
+
+    Each line holds the word, the score (empty if missing), and the phones,
+    separated by tabs. Scores are written with full precision.
+    """
+    with open(run_path, 'w', encoding='utf-8') as f:
+        for (word, pron), score in entries:
+            score = '' if score is None else repr(score)
+            f.write(f'{word}\t{score}\t{" ".join(pron)}\n')
+
+
+def _iter_run(run_path):
+    """Iterate over ``((word, pron), score)`` pairs of run."""
+    with open(run_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            word, score, phones = line.rstrip('\n').split('\t')
+            score = float(score) if score else None
+            yield (word, tuple(phones.split())), score
+
+
+def sort_dict_file(src_path, dict_path, memory_budget=2**28,
+                   align_lexicon=False, lexiconp=False, **kwargs):
+    """Sort and deduplicate dictionary file using bounded memory.
+
+    Output is identical to that of loading ``src_path`` with
+    ``PronDict.load_dict`` and writing it with ``PronDict.write_dict``, but
+    at most approximately ``memory_budget`` bytes of entries are held in
+    memory at once. Additional keyword arguments are passed to
+    ``SortedDictWriter``; as for ``load_dict``, the last score of duplicate
+    entries is retained unless ``score_merge`` is specified.
+
+    Parameters
+    ----------
+    src_path : Path
+        Path to unsorted pronunciation dictionary.
+
+    dict_path : Path
+        Path to output pronunciation dictionary.
+
+    memory_budget : int, optional
+        Approximate maximum memory in bytes used to buffer entries.
+        (Default: 2**28)
+
+    align_lexicon : bool, optional
+        If True, treat dictionaries as being in Kaldi alignment lexicon
+        format.
+        (Default: False)
+
+    lexiconp : bool, optional
+        If True, treat dictionaries as being in Kaldi ``lexiconp.txt``
+        format.
+        (Default: False)
+    """
+    kwargs.setdefault('score_merge', 'last')
+    word_field = 1 if align_lexicon else 0
+    pron_field = word_field + (2 if lexiconp else 1)
+    with SortedDictWriter(dict_path, memory_budget, align_lexicon,
+                          lexiconp=lexiconp, **kwargs) as writer:
+        with open(src_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) <= pron_field or line.startswith(';;;'):
+                    continue
+                score = float(fields[pron_field-1]) if lexiconp else None
+                writer.add(fields[word_field], fields[pron_field:], score)
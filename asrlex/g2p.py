@@ -1,21 +1,41 @@
 """G2P using PHonetisaurus."""
+from contextlib import nullcontext
+from functools import lru_cache
+from itertools import islice
+import math
+from multiprocessing import Pool
 from pathlib import Path
 import shutil
 import subprocess
 import tempfile
+import time
 
-from wurlitzer import pipes
-
-try:
-    from Phonetisaurus import PhonetisaurusScript as Phonetisaurus
-    HAS_PHONETISAURUS_PY = True
-except ModuleNotFoundError:
-    HAS_PHONETISAURUS_PY = False
+from . import trace
 from . import utils
 
 __all__ = ['G2P']
 
 
+# The Phonetisaurus bindings and command line tools are located on first use,
+# rather than on import, and the results cached. The availability flags
+# ``HAS_PHONETISAURUS_PY``, ``HAS_PHONETISAURUS_BIN``, and ``HAS_MITLM_BIN``
+# are computed on first access through the module ``__getattr__``.
+@lru_cache(maxsize=None)
+def _load_phonetisaurus():
+    """Return Phonetisaurus Python interface, or None if not installed."""
+    try:
+        from Phonetisaurus import PhonetisaurusScript
+    except ModuleNotFoundError:
+        return None
+    return PhonetisaurusScript
+
+
+def _check_for_phonetisaurus_py():
+    """Check for presence of Phonetisaurus Python interface."""
+    return _load_phonetisaurus() is not None
+
+
+@lru_cache(maxsize=None)
 def _check_for_phonetisaurus_bin():
     """Check for presence of Phonetisaurus command line tools required for
     training.
@@ -26,15 +46,29 @@ def _check_for_phonetisaurus_bin():
             return False
     return True
 
-HAS_PHONETISAURUS_BIN = _check_for_phonetisaurus_bin()
 
+@lru_cache(maxsize=None)
 def _check_for_mitlm_bin():
     """Check for presence of mitlm command line tools required for training."""
     if not utils.which('estimate-ngram'):
         return False
     return True
 
-HAS_MITLM_BIN = _check_for_mitlm_bin()
+
+_LAZY_FLAGS = {
+    'HAS_PHONETISAURUS_PY' : _check_for_phonetisaurus_py,
+    'HAS_PHONETISAURUS_BIN' : _check_for_phonetisaurus_bin,
+    'HAS_MITLM_BIN' : _check_for_mitlm_bin,
+    }
+
+
+def __getattr__(name):
+    try:
+        check = _LAZY_FLAGS[name]
+    except KeyError:
+        raise AttributeError(
+            f'module {__name__!r} has no attribute {name!r}') from None
+    return check()
 
 
 RESERVED_MAP = {
@@ -43,6 +77,7 @@ RESERVED_MAP = {
     '_' : '\u2695',
     }
 RESERVED_IMAP = {v : k for k, v in RESERVED_MAP.items()}
+_RESERVED_TABLE = str.maketrans(RESERVED_MAP)
 
 def remap_reserved_symbols(s):
     """Remap all occurrences of the Phonetisaurus reserved symbols in a string
@@ -51,10 +86,7 @@ def remap_reserved_symbols(s):
     This mapping is invertible and may be undone by calling
     ``restored_reserved_symbols``.
     """
-    # Following is only marginally slower that a translate call.
-    for isym, osym in RESERVED_MAP.items():
-        s = s.replace(isym, osym)
-    return s
+    return s.translate(_RESERVED_TABLE)
 
 
 def restore_reserved_symbols(s):
@@ -68,6 +100,69 @@ def restore_reserved_symbols(s):
     return s
 
 
+def _validate_decoding_args(cum_prob, beam):
+    """Validate decoding arguments, returning ``cum_prob`` as expected by
+    Phonetisaurus.
+    """
+    if cum_prob is not None:
+        utils.validate_ranged_arg(cum_prob, 'cum_prob', 0.0, 1.0)
+    utils.validate_integer_arg(beam, 'beam', min_val=1)
+    return cum_prob if cum_prob else 0.0
+
+
+def _params_key(n_best, cum_prob, thresh, beam, accumulate):
+    """Return key identifying validated decoding arguments in caches."""
+    return (f'n_best={n_best},cum_prob={float(cum_prob)!r},'
+            f'thresh={float(thresh)!r},beam={beam},'
+            f'accumulate={int(bool(accumulate))}')
+
+
+def _copy_prons(prons, with_scores):
+    """Return copy of scored pronunciations as returned by ``get_prons``."""
+    return dict(prons) if with_scores else set(prons)
+
+
+# G2P model of worker process, loaded once by ``_init_worker``.
+_WORKER_MODEL = None
+
+
+def _init_worker(model_path):
+    global _WORKER_MODEL
+    # Sinks inherited from the parent must not be written from workers.
+    trace.set_sink(None)
+    _WORKER_MODEL = G2P(model_path)
+
+
+def _decode_chunk(model, words, decode_kwargs):
+    """Return list of ``(word, prons, latency)`` tuples for chunk of
+    distinct words.
+    """
+    results = []
+    def record(word, prons, latency):
+        results.append((word, prons, latency))
+    model.get_prons_batch(words, callback=record, **decode_kwargs)
+    return results
+
+
+def _decode_chunk_worker(args):
+    words, decode_kwargs = args
+    return _decode_chunk(_WORKER_MODEL, words, decode_kwargs)
+
+
+def _plan_chunks(words, n_jobs, chunk_size):
+    """Split distinct words into chunks for dispatch to ``n_jobs`` workers.
+
+    Decoding time grows with word length, so words are scheduled longest
+    first, leaving the cheapest chunks for last, and chunks are shrunk so
+    that each worker receives at least 4; otherwise, a worker handed the
+    final chunk may still be decoding long after the others have finished.
+    """
+    words = sorted(words, key=lambda word: (-len(word), word))
+    chunk_size = min(chunk_size, max(1, math.ceil(len(words) / (4*n_jobs))))
+    return [words[bi:bi+chunk_size]
+            for bi in range(0, len(words), chunk_size)]
+
+
 class G2P:
     """Generates pronunciations for words from Phonetisaurus G2P model.
 
@@ -76,15 +171,31 @@ class G2P:
     model_path : Path
         Path to Phonetisaurus FST model.
 
+    cache : G2PCache or Path, optional
+        If not None, persistent cache of generated pronunciations, or path to
+        one, consulted before decoding. See ``asrlex.cache.G2PCache``.
+        (Default: None)
+
     Attributes
     ----------
+    cache : G2PCache
+        Cache of generated pronunciations. None if not caching.
+
     _model : PhonetisaurusScript.Phonetisaurus
             Phonetisaurus G2P model.
     """
-    def __init__(self, model_path):
+    def __init__(self, model_path, cache=None):
         model_path = Path(model_path)
         self.model_path = model_path
-        if HAS_PHONETISAURUS_PY:
+        self.cache = None
+        if cache is not None:
+            from .cache import G2PCache
+            if not isinstance(cache, G2PCache):
+                cache = G2PCache(cache)
+            self.cache = cache
+            self._model_digest = cache.model_digest(model_path)
+        Phonetisaurus = _load_phonetisaurus()
+        if Phonetisaurus is not None:
             self._model = Phonetisaurus(str(model_path))
         else:
             raise ModuleNotFoundError(
@@ -92,8 +203,9 @@ class G2P:
                 'Please follow the installation instructions at: '
                 'https://github.com/nryant/asrlex')
 
+    @trace.traced('G2P.get_prons')
     def get_prons(self, word, n_best=3, cum_prob=None, thresh=5,
-                  beam=10000, accumulate=False):
+                  beam=10000, accumulate=False, with_scores=False):
         """Generate pronunciations for word.
 
         Parameters
@@ -127,26 +239,260 @@ class G2P:
         accumulate : bool, optional
             If True, accumulate probabilities across unique pronunciations.
             (Default: False)
+
+        with_scores : bool, optional
+            If True, return mapping from pronunciations to their
+            probabilities under the G2P model instead of a set.
+            (Default: False)
         """
-        if cum_prob is not None:
-            utils.validate_ranged_arg(cum_prob, 'cum_prob', 0.0, 1.0)
-        cum_prob = cum_prob if cum_prob else 0.0
-        utils.validate_integer_arg(beam, 'beam', min_val=1)
+        if self.cache is not None:
+            return self.get_prons_batch(
+                [word], n_best, cum_prob, thresh, beam, accumulate,
+                with_scores)[word]
+        cum_prob = _validate_decoding_args(cum_prob, beam)
+        from wurlitzer import pipes
         word = remap_reserved_symbols(word)
-        prons = set()
         with pipes() as (stdout, stderr):
             # Phonetisaurus writes annoying warnings to STDERR whenever it
             # encounters an unknown symbol, so need this hack to prevent
             # console from being polluted.
-            for result in self._model.Phoneticize(
-                    word, n_best, beam, thresh, False, accumulate, cum_prob):
-                phones = tuple(self._model.FindOsym(p) for p in result.Uniques)
-                if not phones:
-                    continue
-                prons.add(phones)
+            prons = self._decode(
+                word, n_best, cum_prob, thresh, beam, accumulate)
+        trace.incr('G2P.get_prons.words')
+        if not prons:
+            trace.incr('G2P.get_prons.empty')
+        if not with_scores:
+            prons = set(prons)
+        return prons
+
+    @trace.traced('G2P.get_prons_batch')
+    def get_prons_batch(self, words, n_best=3, cum_prob=None, thresh=5,
+                        beam=10000, accumulate=False, with_scores=False,
+                        callback=None):
+        """Generate pronunciations for several words.
+
+        Equivalent to calling ``get_prons`` for each word, but the fixed
+        per-call costs (validation of arguments, capture of output from
+        Phonetisaurus, and queries of the cache) are paid once for the whole
+        batch rather than once per word, which dominate decoding time for
+        short words.
+
+        Parameters
+        ----------
+        words : iterable of str
+            Words to generate pronunciations for. Duplicates are decoded
+            once.
+
+        n_best : int, optional
+            See ``get_prons``.
+            (Default: 3)
+
+        cum_prob : float, optional
+            See ``get_prons``.
+            (Default: None)
+
+        thresh : float, optional
+            See ``get_prons``.
+            (Default: 5)
+
+        beam : int, optional
+            See ``get_prons``.
+            (Default: 10000)
+
+        accumulate : bool, optional
+            See ``get_prons``.
+            (Default: False)
+
+        with_scores : bool, optional
+            See ``get_prons``.
+            (Default: False)
+
+        callback : callable, optional
+            If not None, called as ``callback(word, prons, latency)`` as each
+            word is decoded, where ``latency`` is the time in seconds spent
+            looking up or decoding it, excluding the fixed per-batch costs. As
+            it is called while output is captured, anything it writes to
+            STDOUT or STDERR is discarded.
+            (Default: None)
+
+        Returns
+        -------
+        word_to_prons : dict
+            Mapping from words, in order of first occurrence, to their
+            pronunciations as returned by ``get_prons``.
+        """
+        cum_prob = _validate_decoding_args(cum_prob, beam)
+        from wurlitzer import pipes
+        words = list(dict.fromkeys(words))
+        cache = self.cache
+        cached = {}
+        if cache is not None:
+            params = _params_key(n_best, cum_prob, thresh, beam, accumulate)
+            cached = cache.get_many(self._model_digest, params, words)
+        word_to_prons = {}
+        decoded = {}
+        n_empty = 0
+        decode = self._decode
+        capture = pipes() if len(cached) < len(words) else nullcontext()
+        perf_counter = time.perf_counter
+        with capture:
+            for word in words:
+                start = perf_counter()
+                prons = cached.get(word)
+                if prons is None:
+                    prons = decode(
+                        word.translate(_RESERVED_TABLE), n_best, cum_prob,
+                        thresh, beam, accumulate)
+                    decoded[word] = prons
+                    n_empty += not prons
+                if not with_scores:
+                    prons = set(prons)
+                elif cache is not None:
+                    # Cached mappings are shared, so must not be returned.
+                    prons = dict(prons)
+                word_to_prons[word] = prons
+                if callback is not None:
+                    callback(word, prons, perf_counter() - start)
+        if cache is not None:
+            cache.put_many(self._model_digest, params, decoded)
+        trace.incr('G2P.get_prons.words', len(decoded))
+        trace.incr('G2P.get_prons.empty', n_empty)
+        return word_to_prons
+
+    def iter_prons(self, words, n_best=3, cum_prob=None, thresh=5,
+                   beam=10000, accumulate=False, with_scores=False,
+                   n_jobs=1, chunk_size=256):
+        """Generate pronunciations for several words, possibly in parallel.
+
+        Words are decoded in chunks using ``get_prons_batch``. If
+        ``n_jobs > 1``, chunks are dispatched to a pool of worker processes,
+        each of which loads the model from ``model_path`` once, and longest
+        words are scheduled first. Results are yielded as each chunk
+        completes, so their order depends on ``n_jobs`` and timing, but the
+        pronunciations are identical to those of the serial path.
+
+        Parameters
+        ----------
+        words : iterable of str
+            Words to generate pronunciations for. Duplicates are decoded
+            once.
+
+        n_best : int, optional
+            See ``get_prons``.
+            (Default: 3)
+
+        cum_prob : float, optional
+            See ``get_prons``.
+            (Default: None)
+
+        thresh : float, optional
+            See ``get_prons``.
+            (Default: 5)
+
+        beam : int, optional
+            See ``get_prons``.
+            (Default: 10000)
+
+        accumulate : bool, optional
+            See ``get_prons``.
+            (Default: False)
+
+        with_scores : bool, optional
+            See ``get_prons``.
+            (Default: False)
+
+        n_jobs : int, optional
+            Number of worker processes.
+            (Default: 1)
+
+        chunk_size : int, optional
+            Maximum number of words decoded per call to
+            ``get_prons_batch``. When ``n_jobs > 1``, chunks may be smaller
+            so that work is spread evenly across workers.
+            (Default: 256)
+
+        Yields
+        ------
+        word : str
+            Word.
+
+        prons : set of tuple or dict
+            Pronunciations of word as returned by ``get_prons``.
+
+        latency : float
+            Time in seconds spent decoding word. Effectively 0 for words
+            found in the cache.
+        """
+        cum_prob_key = _validate_decoding_args(cum_prob, beam)
+        utils.validate_integer_arg(n_jobs, 'n_jobs', min_val=1)
+        utils.validate_integer_arg(chunk_size, 'chunk_size', min_val=1)
+        decode_kwargs = {
+            'n_best' : n_best, 'cum_prob' : cum_prob, 'thresh' : thresh,
+            'beam' : beam, 'accumulate' : accumulate,
+            'with_scores' : with_scores}
+        words = iter(dict.fromkeys(words))
+        if n_jobs == 1:
+            while True:
+                chunk = list(islice(words, chunk_size))
+                if not chunk:
+                    return
+                yield from _decode_chunk(self, chunk, decode_kwargs)
+
+        # Workers do not share the cache, so it is consulted up front and
+        # updated as results arrive, for which scores are needed.
+        cache = self.cache
+        if cache is not None:
+            words = list(words)
+            params = _params_key(
+                n_best, cum_prob_key, thresh, beam, accumulate)
+            cached = cache.get_many(self._model_digest, params, words)
+            for word, prons in cached.items():
+                yield word, _copy_prons(prons, with_scores), 0.0
+            words = [word for word in words if word not in cached]
+            decode_kwargs['with_scores'] = True
+        chunks = _plan_chunks(words, n_jobs, chunk_size)
+        if not chunks:
+            return
+        n_jobs = min(n_jobs, len(chunks))
+        with trace.span('G2P.iter_prons', n_jobs=n_jobs,
+                        n_chunks=len(chunks)):
+            with Pool(n_jobs, initializer=_init_worker,
+                      initargs=(self.model_path,)) as pool:
+                tasks = ((chunk, decode_kwargs) for chunk in chunks)
+                for results in pool.imap_unordered(
+                        _decode_chunk_worker, tasks):
+                    # Counters of workers are not visible to the parent.
+                    trace.incr('G2P.get_prons.words', len(results))
+                    trace.incr('G2P.get_prons.empty',
+                               sum(not prons for _, prons, _ in results))
+                    if cache is not None:
+                        cache.put_many(
+                            self._model_digest, params,
+                            {word : prons for word, prons, _ in results})
+                        results = [
+                            (word, _copy_prons(prons, with_scores), latency)
+                            for word, prons, latency in results]
+                    yield from results
+
+    def _decode(self, word, n_best, cum_prob, thresh, beam, accumulate):
+        """Return mapping from pronunciations of word with reserved symbols
+        remapped to their probabilities.
+
+        Arguments are assumed to be valid, and output to be captured.
+        """
+        prons = {}
+        for result in self._model.Phoneticize(
+                word, n_best, beam, thresh, False, accumulate, cum_prob):
+            phones = tuple(self._model.FindOsym(p) for p in result.Uniques)
+            if not phones:
+                continue
+            # PathWeight is the negative log probability of the path.
+            score = math.exp(-result.PathWeight)
+            prons[phones] = max(score, prons.get(phones, 0.0))
         return prons
 
     @staticmethod
+    @trace.traced('G2P.train_g2p')
     def train_g2p(model_path, pron_dict, ngram_order=7, seq1_del=True,
                   seq1_max=2, seq2_del=True, seq2_max=2, grow=False):
         """Train G2P model using Phonetisaurus.
@@ -189,13 +535,13 @@ class G2P:
         model : PhonetisaurusScript.Phonetisaurus
             Phonetisaurus G2P model.
         """
-        if not HAS_PHONETISAURUS_BIN:
+        if not _check_for_phonetisaurus_bin():
             raise OSError(
                 'Phonetisaurus command-line tools not found. These tools are '
                 'required for G2P training. Please check that your PATH is '
                 'correctly set or install by following the instructions at: '
                 'https://github.com/nryant/asrlex.')
-        if not HAS_MITLM_BIN:
+        if not _check_for_mitlm_bin():
             raise OSError(
                 'MITLM command-line tools not found. These tools are '
                 'required for G2P training. Please check that your PATH is '
@@ -230,8 +576,9 @@ class G2P:
                 cmd.append('--seq2_del')
             if grow:
                 cmd.append('--grow')
-            subprocess.run(
-                cmd, capture_output=True, check=True)
+            with trace.span('phonetisaurus-train', ngram_order=ngram_order):
+                subprocess.run(
+                    cmd, capture_output=True, check=True)
 
             # Migrate G2P FST from Phonetisaurus working directory.
             src_model_path = Path(train_dir, 'model.fst')
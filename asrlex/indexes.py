@@ -0,0 +1,250 @@
+"""Auxiliary indexes maintained incrementally as dictionaries change."""
+from collections import Counter, namedtuple
+import sys
+
+__all__ = ['DerivedIndex', 'NormalizedKeyIndex', 'PhoneCountIndex',
+           'ReverseIndex', 'WordChange']
+
+
+class WordChange(namedtuple('WordChange', ['word', 'old_prons', 'new_prons'])):
+    """Change to the pronunciations of a head word.
+
+    Parameters
+    ----------
+    word : str
+        Head word.
+
+    old_prons : frozenset of tuple
+        Pronunciations of word before the change. None if the word was not
+        in the dictionary.
+
+    new_prons : set of tuple
+        Pronunciations of word after the change. None if the word was
+        removed from the dictionary. This is the set held by the dictionary,
+        so must not be modified, and is only valid until the dictionary is
+        next modified.
+    """
+    __slots__ = ()
+
+    @property
+    def added_prons(self):
+        """Pronunciations added by the change."""
+        return (self.new_prons or set()) - (self.old_prons or frozenset())
+
+    @property
+    def removed_prons(self):
+        """Pronunciations removed by the change."""
+        return (self.old_prons or frozenset()) - (self.new_prons or set())
+
+
+class DerivedIndex:
+    """Base class for indexes derived from a pronunciation dictionary.
+
+    Indexes are attached to a dictionary with ``PronDict.register_index``,
+    which calls ``build`` once, and are then kept current by calls to
+    ``update`` with the changes of each modification, or batch of
+    modifications, of the dictionary. Subclasses must implement ``build``,
+    and should implement ``update`` so that its cost is proportional to the
+    number of changes rather than the size of the dictionary; by default,
+    it rebuilds the index.
+    """
+    def build(self, pdict):
+        """Build index from scratch.
+
+        Parameters
+        ----------
+        pdict : PronDict
+            Dictionary index is derived from.
+        """
+        raise NotImplementedError
+
+    def update(self, pdict, changes):
+        """Update index after dictionary was modified.
+
+        Parameters
+        ----------
+        pdict : PronDict
+            Dictionary index is derived from, with changes already applied.
+
+        changes : list of WordChange
+            Changes, with at most one per head word.
+        """
+        self.build(pdict)
+
+    def memory_usage(self, deep=True):
+        """Return memory used by index in bytes.
+
+        Head words and pronunciations shared with the dictionary are
+        accounted for by ``PronDict.memory_usage``, so are not included. By
+        default, this is the size of the objects held in attributes of the
+        index, which subclasses holding nested containers should override.
+
+        Parameters
+        ----------
+        deep : bool, optional
+            If True, include memory used by strings owned by the index.
+            (Default: True)
+        """
+        return sum(map(sys.getsizeof, vars(self).values()))
+
+
+class NormalizedKeyIndex(DerivedIndex):
+    """Index from normalized keys to head words sharing them.
+
+    This is the index underlying ``PronDict.lookup`` and
+    ``PronDict.find_words``, registered by setting ``PronDict.normalizer``.
+    Once the index has been copied (see ``copy``), sets of head words are
+    replaced rather than modified in place on update, so that the copies may
+    share them.
+
+    Parameters
+    ----------
+    normalizer : callable
+        Function mapping words to normalized keys.
+
+    Attributes
+    ----------
+    key_to_words : dict
+        Mapping from normalized keys to sets of head words.
+    """
+    def __init__(self, normalizer):
+        self.normalizer = normalizer
+        self.key_to_words = {}
+        self._shared = False
+
+    def build(self, pdict):
+        normalizer = self.normalizer
+        key_to_words = {}
+        for word in pdict._word_to_prons:
+            key_to_words.setdefault(normalizer(word), set()).add(word)
+        self.key_to_words = key_to_words
+        self._shared = False
+
+    def update(self, pdict, changes):
+        normalizer = self.normalizer
+        key_to_words = self.key_to_words
+        shared = self._shared
+        for change in changes:
+            was_present = change.old_prons is not None
+            is_present = change.new_prons is not None
+            if was_present == is_present:
+                continue
+            key = normalizer(change.word)
+            words = key_to_words.get(key)
+            if words is None:
+                words = set()
+            elif shared:
+                words = set(words)
+            if is_present:
+                words.add(change.word)
+            else:
+                words.discard(change.word)
+            if words:
+                key_to_words[key] = words
+            else:
+                key_to_words.pop(key, None)
+
+    def memory_usage(self, deep=True):
+        getsizeof = sys.getsizeof
+        size = getsizeof(self.key_to_words)
+        for key, words in self.key_to_words.items():
+            size += getsizeof(words)
+            if deep:
+                size += getsizeof(key)
+        return size
+
+    def find_words(self, token):
+        """Return head words sharing normalized key of token in
+        lexicographic order.
+        """
+        return tuple(sorted(self.key_to_words.get(self.normalizer(token), ())))
+
+    def copy(self):
+        """Return copy of index sharing sets of head words."""
+        index = NormalizedKeyIndex(self.normalizer)
+        index.key_to_words = dict(self.key_to_words)
+        index._shared = self._shared = True
+        return index
+
+
+class ReverseIndex(DerivedIndex):
+    """Index from pronunciations to head words having them; e.g., for
+    finding homophones.
+
+    Attributes
+    ----------
+    pron_to_words : dict
+        Mapping from pronunciations to sets of head words.
+    """
+    def __init__(self):
+        self.pron_to_words = {}
+
+    def build(self, pdict):
+        pron_to_words = {}
+        for word, prons in pdict._word_to_prons.items():
+            for pron in prons:
+                pron_to_words.setdefault(pron, set()).add(word)
+        self.pron_to_words = pron_to_words
+
+    def update(self, pdict, changes):
+        pron_to_words = self.pron_to_words
+        for change in changes:
+            word = change.word
+            for pron in change.removed_prons:
+                words = pron_to_words.get(pron)
+                if words is None:
+                    continue
+                words.discard(word)
+                if not words:
+                    del pron_to_words[pron]
+            for pron in change.added_prons:
+                pron_to_words.setdefault(pron, set()).add(word)
+
+    def memory_usage(self, deep=True):
+        getsizeof = sys.getsizeof
+        return getsizeof(self.pron_to_words) + sum(
+            map(getsizeof, self.pron_to_words.values()))
+
+    def get_words(self, pron):
+        """Return head words having pronunciation in lexicographic order."""
+        return tuple(sorted(self.pron_to_words.get(tuple(pron), ())))
+
+
+class PhoneCountIndex(DerivedIndex):
+    """Index of the number of occurrences of each phone in all
+    pronunciations.
+
+    Attributes
+    ----------
+    counts : collections.Counter
+        Mapping from phones to counts. Phones with count 0 are removed.
+    """
+    def __init__(self):
+        self.counts = Counter()
+
+    def build(self, pdict):
+        counts = Counter()
+        for prons in pdict._word_to_prons.values():
+            for pron in prons:
+                counts.update(pron)
+        self.counts = counts
+
+    def update(self, pdict, changes):
+        counts = self.counts
+        for change in changes:
+            for pron in change.removed_prons:
+                counts.subtract(pron)
+            for pron in change.added_prons:
+                counts.update(pron)
+        for phone in [phone for phone, count in counts.items() if count <= 0]:
+            del counts[phone]
+
+    def memory_usage(self, deep=True):
+        getsizeof = sys.getsizeof
+        return getsizeof(self.counts) + sum(
+            map(getsizeof, self.counts.values()))
+
+    @property
+    def phones(self):
+        """Phones occurring in pronunciations in lexicographic order."""
+        return sorted(self.counts)
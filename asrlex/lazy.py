@@ -0,0 +1,379 @@
+"""Pronunciation dictionary loaded lazily from a text file."""
+from array import array
+import mmap
+import os
+from pathlib import Path
+import struct
+import sys
+
+from .parsing import DictParser, _split_fields
+from .prondict import PronDict
+
+__all__ = ['LazyPronDict']
+
+
+# Sidecar index layout:
+#
+#     <HEADER> <KEY-OFFSETS> <LINE-OFFSETS> <KEYS>
+#
+# where:
+#
+# - HEADER  --  magic number, format version, byte order, size and mtime of
+#   the indexed file, format flags, and number of entries
+# - KEY-OFFSETS  --  n_entries + 1 unsigned 64-bit offsets into KEYS
+# - LINE-OFFSETS  --  n_entries unsigned 64-bit byte offsets of lines
+# - KEYS  --  concatenated UTF-8 encoded head words
+#
+# There is one entry per line. Entries are sorted by head word, then line
+# offset, so lookup is by binary search over KEYS.
+_MAGIC = b'ASRLXIDX'
+_VERSION = 1
+_HEADER = struct.Struct('=8sIIQqQQ')
+_BYTEORDER = {'little' : 0, 'big' : 1}[sys.byteorder]
+_FLAG_ALIGN_LEXICON = 1
+_FLAG_LEXICONP = 2
+
+
+def _get_flags(align_lexicon, lexiconp):
+    flags = 0
+    if align_lexicon:
+        flags |= _FLAG_ALIGN_LEXICON
+    if lexiconp:
+        flags |= _FLAG_LEXICONP
+    return flags
+
+
+def _build_index(dict_path, align_lexicon, lexiconp):
+    """Return serialized index of head words of dictionary file."""
+    stat = os.stat(dict_path)
+    min_fields = 2 + int(align_lexicon) + int(lexiconp)
+    word_field = int(align_lexicon)
+    entries = []
+    with open(dict_path, 'rb') as f:
+        offset = 0
+        for line in f:
+            line_offset = offset
+            offset += len(line)
+            if line.startswith(b';;;'):
+                continue
+            fields = _split_fields(line)
+            if len(fields) < min_fields:
+                continue
+            entries.append((fields[word_field], line_offset))
+    entries.sort()
+
+    key_offsets = array('Q', [0])
+    line_offsets = array('Q')
+    for key, line_offset in entries:
+        key_offsets.append(key_offsets[-1] + len(key))
+        line_offsets.append(line_offset)
+    header = _HEADER.pack(
+        _MAGIC, _VERSION, _BYTEORDER, stat.st_size, stat.st_mtime_ns,
+        _get_flags(align_lexicon, lexiconp), len(entries))
+    keys = b''.join(key for key, _ in entries)
+    return b''.join(
+        [header, key_offsets.tobytes(), line_offsets.tobytes(), keys])
+
+
+class _OffsetIndex:
+    """Read-only view of serialized index of head words.
+
+    Parameters
+    ----------
+    buf : bytes or mmap.mmap
+        Serialized index.
+
+    Raises
+    ------
+    ValueError
+        If the length of ``buf`` is inconsistent with its header; e.g., if
+        it was truncated.
+    """
+    def __init__(self, buf):
+        if len(buf) < _HEADER.size:
+            raise ValueError('Index is shorter than its header.')
+        self._buf = buf
+        (self.magic, self.version, self.byteorder, self.size, self.mtime_ns,
+         self.flags, self.n_entries) = _HEADER.unpack_from(buf, 0)
+        bi = _HEADER.size
+        ei = bi + 8*(self.n_entries + 1)
+        self._keys_start = ei + 8*self.n_entries
+        if len(buf) < self._keys_start:
+            raise ValueError('Index is shorter than its offset tables.')
+        self._key_offsets = memoryview(buf)[bi:ei].cast('Q')
+        bi, ei = ei, self._keys_start
+        self._line_offsets = memoryview(buf)[bi:ei].cast('Q')
+        if len(buf) != self._keys_start + self._key_offsets[-1]:
+            self.release()
+            raise ValueError('Index length does not match its key offsets.')
+
+    def is_valid(self, dict_path, align_lexicon, lexiconp):
+        """Return True if index is current for dictionary file."""
+        stat = os.stat(dict_path)
+        return (self.magic == _MAGIC and self.version == _VERSION and
+                self.byteorder == _BYTEORDER and
+                self.size == stat.st_size and
+                self.mtime_ns == stat.st_mtime_ns and
+                self.flags == _get_flags(align_lexicon, lexiconp))
+
+    def _key(self, i):
+        bi = self._keys_start + self._key_offsets[i]
+        ei = self._keys_start + self._key_offsets[i+1]
+        return self._buf[bi:ei]
+
+    def get_offsets(self, key):
+        """Return byte offsets of lines for head word ``key``."""
+        lo, hi = 0, self.n_entries
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        offsets = []
+        while lo < self.n_entries and self._key(lo) == key:
+            offsets.append(self._line_offsets[lo])
+            lo += 1
+        return offsets
+
+    def release(self):
+        """Release views of underlying buffer."""
+        self._key_offsets.release()
+        self._line_offsets.release()
+
+
+def _load_index(dict_path, index_path, align_lexicon, lexiconp):
+    """Load index of dictionary file, building and caching if necessary.
+
+    If ``index_path`` is None, the index is built in memory.
+    """
+    if index_path is not None and index_path.exists():
+        with open(index_path, 'rb') as f:
+            try:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty index file, which cannot be mapped.
+                buf = None
+        if buf is not None:
+            index = None
+            try:
+                index = _OffsetIndex(buf)
+                if index.is_valid(dict_path, align_lexicon, lexiconp):
+                    buf = None
+                    return index
+            except ValueError:
+                # Truncated or otherwise corrupt index file.
+                pass
+            finally:
+                if buf is not None:
+                    if index is not None:
+                        index.release()
+                    buf.close()
+    buf = _build_index(dict_path, align_lexicon, lexiconp)
+    if index_path is not None:
+        # Write to temporary file, then rename, so that concurrent readers
+        # never see a partial index.
+        tmp_path = Path(f'{index_path}.{os.getpid()}.tmp')
+        try:
+            tmp_path.write_bytes(buf)
+            os.replace(tmp_path, index_path)
+        except OSError:
+            # Cache location not writable. Fall back to in-memory index.
+            tmp_path.unlink(missing_ok=True)
+    return _OffsetIndex(buf)
+
+
+class LazyPronDict(PronDict):
+    """Pronunciation dictionary loaded lazily from a text file.
+
+    On construction, only an index mapping head words to the byte offsets of
+    their lines is loaded. Pronunciations are parsed from the file the first
+    time a word is accessed:
+
+        >>> pdict = LazyPronDict('cmu.dict')
+        >>> pdict['the']
+
+    The index is cached in a sidecar file, which is memory mapped, so
+    subsequent loads are nearly instant. The sidecar is rebuilt whenever the
+    size or modification time of the dictionary file changes.
+
+    Operations involving the entire vocabulary (e.g., ``words``, ``len``,
+    iteration, set operations, and setting a normalizer) load the full
+    dictionary.
+
+    Parameters
+    ----------
+    dict_path : Path
+        Path to pronunciation dictionary. See ``PronDict.load_dict`` for
+        format.
+
+    oov_pron : iterable of str
+        Pronunciation to assign to out-of-vocabulary words.
+        (Default: ('OOV',))
+
+    align_lexicon : bool, optional
+        If True, treat dictionary as being in Kaldi alignment lexicon format.
+        (Default: False)
+
+    lexiconp : bool, optional
+        If True, treat dictionary as being in Kaldi ``lexiconp.txt`` format.
+        (Default: False)
+
+    index_path : Path, optional
+        Path to sidecar index. If None, defaults to ``dict_path`` with the
+        suffix ".idx" appended.
+        (Default: None)
+
+    cache_index : bool, optional
+        If False, do not read or write a sidecar index; the index is built in
+        memory.
+        (Default: True)
+    """
+    def __init__(self, dict_path, oov_pron=('OOV',), align_lexicon=False,
+                 lexiconp=False, index_path=None, cache_index=True):
+        super().__init__(oov_pron=oov_pron)
+        self.dict_path = Path(dict_path)
+        self.align_lexicon = align_lexicon
+        self.lexiconp = lexiconp
+        if index_path is None:
+            index_path = Path(f'{self.dict_path}.idx')
+        self.index_path = Path(index_path) if cache_index else None
+        self._index = _load_index(
+            self.dict_path, self.index_path, align_lexicon, lexiconp)
+        self._resolved = set()
+        self._all_loaded = False
+
+    def _materialize(self, word):
+        """Parse pronunciations of word from file if not already done."""
+        if self._all_loaded or word in self._resolved:
+            return
+        self._resolved.add(word)
+        offsets = self._index.get_offsets(word.encode('utf-8'))
+        if not offsets:
+            return
+        parser = DictParser(
+            align_lexicon=self.align_lexicon, lexiconp=self.lexiconp)
+        with open(self.dict_path, 'rb') as f:
+            lines = []
+            for offset in offsets:
+                f.seek(offset)
+                lines.append(f.readline())
+        parser.parse_lines(lines)
+        super().add_pron(word, *parser.word_to_prons[word])
+        for (_, pron), score in parser.scores.items():
+            self.set_score(word, pron, score)
+
+    def _load_all(self):
+        """Load all pronunciations not yet parsed from file."""
+        if self._all_loaded:
+            return
+        pdict = PronDict.load_dict(
+            self.dict_path, self.oov_pron, self.align_lexicon,
+            lexiconp=self.lexiconp)
+        resolved = self._resolved
+        self._all_loaded = True
+        self._resolved = set()
+        for word in pdict._word_to_prons:
+            if word in resolved:
+                # Already parsed, or modified since.
+                continue
+            super().add_pron(word, *pdict[word])
+            for pron, score in pdict.get_scores(word).items():
+                self.set_score(word, pron, score)
+
+    def find_words(self, token):
+        self._materialize(token)
+        return super().find_words(token)
+
+    def get_scores(self, word):
+        self._materialize(word)
+        return super().get_scores(word)
+
+    def prune_by_counts(self, *args, **kwargs):
+        self._load_all()
+        super().prune_by_counts(*args, **kwargs)
+
+    def stats(self):
+        self._load_all()
+        return super().stats()
+
+    def subscribe(self, callback):
+        # Parsing from file must not be notified as changes.
+        self._load_all()
+        super().subscribe(callback)
+
+    def register_index(self, name, index, build=True):
+        self._load_all()
+        super().register_index(name, index, build)
+
+    def _index_memory_usage(self, deep):
+        usage = super()._index_memory_usage(deep)
+        size = sys.getsizeof(self._resolved)
+        if isinstance(self._index._buf, bytes):
+            # Memory mapped indices are backed by the page cache instead.
+            size += sys.getsizeof(self._index._buf)
+        usage['offset_index'] = size
+        return usage
+
+    def _get_row(self, word, pron, create=False):
+        self._materialize(word)
+        return super()._get_row(word, pron, create)
+
+    def _get_pron_table(self):
+        self._load_all()
+        return super()._get_pron_table()
+
+    @PronDict.normalizer.setter
+    def normalizer(self, normalizer):
+        self._load_all()
+        PronDict.normalizer.fset(self, normalizer)
+
+    @property
+    def words(self):
+        self._load_all()
+        return super().words
+
+    @property
+    def n(self):
+        self._load_all()
+        return super().n
+
+    def __getitem__(self, word):
+        self._materialize(word)
+        return super().__getitem__(word)
+
+    def __setitem__(self, word, prons):
+        # Pronunciations on disk are overridden, so need not be parsed.
+        if not self._all_loaded:
+            self._resolved.add(word)
+        super().__setitem__(word, prons)
+
+    def __delitem__(self, word):
+        self._materialize(word)
+        super().__delitem__(word)
+
+    def __contains__(self, word):
+        self._materialize(word)
+        return super().__contains__(word)
+
+    def __eq__(self, other_pdict):
+        self._load_all()
+        if isinstance(other_pdict, LazyPronDict):
+            other_pdict._load_all()
+        return super().__eq__(other_pdict)
+
+    def __repr__(self):
+        return (f'LazyPronDict({str(self.dict_path)!r}, '
+                f'oov_pron={self.oov_pron})')
+
+    def __getstate__(self):
+        # Memory mapped indices cannot be pickled, so reload on unpickling.
+        state = super().__getstate__()
+        del state['_index']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._index = _load_index(
+            self.dict_path, self.index_path, self.align_lexicon,
+            self.lexiconp)
@@ -0,0 +1,85 @@
+"""Normalization of head words for lookup."""
+import unicodedata
+
+__all__ = ['Normalizer']
+
+# Maximum number of memoized keys before the memo is flushed.
+_MAX_CACHE_SIZE = 2**20
+
+
+def _is_punct(char):
+    """Return True if ``char`` belongs to a Unicode punctuation category."""
+    return unicodedata.category(char).startswith('P')
+
+
+class Normalizer:
+    """Callable mapping words to normalized lookup keys.
+
+    Instances are picklable, so may be attached to a ``PronDict`` that is
+    shipped to worker processes.
+
+        >>> normalizer = Normalizer()
+        >>> normalizer('Don’t')
+        'dont'
+
+    Parameters
+    ----------
+    case_fold : bool, optional
+        If True, apply Unicode case folding.
+        (Default: True)
+
+    form : str, optional
+        Unicode normalization form to apply. One of "NFC", "NFD", "NFKC",
+        and "NFKD". If None, no Unicode normalization is performed.
+        (Default: 'NFKC')
+
+    strip_punct : bool, optional
+        If True, remove all characters belonging to a Unicode punctuation
+        category.
+        (Default: True)
+    """
+    def __init__(self, case_fold=True, form='NFKC', strip_punct=True):
+        if form not in {None, 'NFC', 'NFD', 'NFKC', 'NFKD'}:
+            raise ValueError(
+                f'Unrecognized Unicode normalization form: "{form}".')
+        self.case_fold = case_fold
+        self.form = form
+        self.strip_punct = strip_punct
+        self._cache = {}
+
+    def __call__(self, word):
+        # Transcripts are highly repetitive, so memoize.
+        try:
+            return self._cache[word]
+        except KeyError:
+            pass
+        key = word
+        if self.form is not None:
+            key = unicodedata.normalize(self.form, key)
+        if self.case_fold:
+            key = key.casefold()
+        if self.strip_punct:
+            key = ''.join(char for char in key if not _is_punct(char))
+        if len(self._cache) >= _MAX_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[word] = key
+        return key
+
+    def __getstate__(self):
+        # Do not ship the memo to worker processes.
+        state = self.__dict__.copy()
+        state['_cache'] = {}
+        return state
+
+    def __eq__(self, other):
+        if not isinstance(other, Normalizer):
+            return NotImplemented
+        return ((self.case_fold, self.form, self.strip_punct) ==
+                (other.case_fold, other.form, other.strip_punct))
+
+    def __hash__(self):
+        return hash((self.case_fold, self.form, self.strip_punct))
+
+    def __repr__(self):
+        return (f'Normalizer(case_fold={self.case_fold}, form={self.form!r}, '
+                f'strip_punct={self.strip_punct})')
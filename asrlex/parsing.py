@@ -0,0 +1,214 @@
+"""Fast parsing of pronunciation dictionary files."""
+from collections import defaultdict
+import re
+
+from . import utils
+
+__all__ = ['DictParser', 'iter_line_blocks']
+
+
+# Default size in bytes of blocks read from dictionary files.
+BLOCK_SIZE = 2**24
+
+
+def iter_line_blocks(f, block_size=BLOCK_SIZE):
+    """Iterate over blocks of complete lines of binary file.
+
+    Parameters
+    ----------
+    f : file object
+        File opened in binary mode.
+
+    block_size : int, optional
+        Approximate size in bytes of each block.
+        (Default: BLOCK_SIZE)
+
+    Yields
+    ------
+    lines : list of bytes
+        Lines of block, without trailing newlines.
+    """
+    remainder = b''
+    while True:
+        block = f.read(block_size)
+        if not block:
+            break
+        block = remainder + block
+        end = block.rfind(b'\n')
+        if end < 0:
+            remainder = block
+            continue
+        remainder = block[end+1:]
+        yield block[:end].split(b'\n')
+    if remainder:
+        yield [remainder]
+
+
+# UTF-8 encoded non-ASCII whitespace, on which ``str.split`` splits but
+# ``bytes.split`` does not.
+_UNICODE_SPACE = re.compile(
+    rb'\xc2[\x85\xa0]|\xe1\x9a\x80|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|'
+    rb'\xe2\x81\x9f|\xe3\x80\x80')
+
+
+def _split_fields(line, has_unicode_space=_UNICODE_SPACE.search):
+    """Split encoded line into fields on whitespace as ``str.split`` would.
+
+    Lines are split as bytes unless they contain non-ASCII whitespace; e.g.,
+    no-break spaces.
+    """
+    if line.isascii() or has_unicode_space(line) is None:
+        return line.split()
+    return [field.encode('utf-8') for field in line.decode('utf-8').split()]
+
+
+class _PhoneTable(dict):
+    """Mapping from encoded to decoded phones.
+
+    Phones are decoded on first occurrence only, after which all occurrences
+    share a single string.
+    """
+    def __missing__(self, key):
+        phone = self[key] = key.decode('utf-8')
+        return phone
+
+
+class DictParser:
+    """Parser for pronunciation dictionary files.
+
+    Lines are processed as bytes, only head words of retained entries are
+    decoded, and phones are decoded once and then shared between all
+    pronunciations in which they occur. See ``PronDict.load_dict`` for a
+    description of the file format and filters.
+
+        >>> parser = DictParser()
+        >>> with open('cmu.dict', 'rb') as f:
+        ...     for lines in iter_line_blocks(f):
+        ...         parser.parse_lines(lines)
+        >>> parser.word_to_prons['the']
+
+    Parameters
+    ----------
+    align_lexicon : bool, optional
+        If True, treat lines as being in Kaldi alignment lexicon format.
+        (Default: False)
+
+    lexiconp : bool, optional
+        If True, treat lines as being in Kaldi ``lexiconp.txt`` format.
+        (Default: False)
+
+    keep : iterable of str, optional
+        If not None, only retain entries whose head words are in ``keep``.
+        (Default: None)
+
+    remove : iterable of str, optional
+        If not None, drop entries whose head words are in ``remove``.
+        (Default: None)
+
+    phones : iterable of str, optional
+        If not None, only retain pronunciations consisting entirely of phones
+        in ``phones``.
+        (Default: None)
+
+    predicate : callable, optional
+        If not None, only retain entries for which ``predicate(word,
+        phones)`` is True, where ``phones`` is a list of the phones of the
+        pronunciation.
+        (Default: None)
+
+    Attributes
+    ----------
+    word_to_prons : defaultdict
+        Mapping from head words to sets of pronunciations parsed so far.
+
+    scores : dict
+        Mapping from ``(word, pron)`` entries to scores parsed so far. Only
+        populated if ``lexiconp=True``.
+    """
+    def __init__(self, align_lexicon=False, lexiconp=False, keep=None,
+                 remove=None, phones=None, predicate=None):
+        self.align_lexicon = align_lexicon
+        self.lexiconp = lexiconp
+        self.keep = _encode_words(keep)
+        self.remove = _encode_words(remove)
+        self.phones = _encode_words(phones)
+        self.predicate = predicate
+        self.word_to_prons = defaultdict(set)
+        self.scores = {}
+        self._phone_table = _PhoneTable()
+
+    def parse_lines(self, lines):
+        """Parse lines of dictionary.
+
+        Parameters
+        ----------
+        lines : iterable of bytes
+            Lines to parse.
+        """
+        # Bind everything used in the inner loop to locals.
+        word_field = 1 if self.align_lexicon else 0
+        pron_field = word_field + (2 if self.lexiconp else 1)
+        keep = self.keep
+        remove = self.remove
+        phones = self.phones
+        predicate = self.predicate
+        lexiconp = self.lexiconp
+        word_to_prons = self.word_to_prons
+        scores = self.scores
+        get_phone = self._phone_table.__getitem__
+        has_unicode_space = _UNICODE_SPACE.search
+
+        # Fast path for the common case of no filters or scores.
+        if (keep is None and remove is None and phones is None and
+                predicate is None and not lexiconp):
+            for line in lines:
+                # Fields are separated by whitespace as for ``str.split``.
+                if line.isascii() or has_unicode_space(line) is None:
+                    fields = line.split()
+                else:
+                    fields = _split_fields(line)
+                # Lines beginning with ";;;" are comments in cmudict.
+                if len(fields) <= pron_field or line.startswith(b';;;'):
+                    continue
+                word_to_prons[fields[word_field].decode('utf-8')].add(
+                    tuple(map(get_phone, fields[pron_field:])))
+            return
+
+        for line in lines:
+            if line.isascii() or has_unicode_space(line) is None:
+                fields = line.split()
+            else:
+                fields = _split_fields(line)
+            if len(fields) <= pron_field or line.startswith(b';;;'):
+                continue
+            word = fields[word_field]
+            if keep is not None and word not in keep:
+                continue
+            if remove is not None and word in remove:
+                continue
+            if phones is not None and not phones.issuperset(
+                    fields[pron_field:]):
+                continue
+            word = word.decode('utf-8')
+            pron = tuple(map(get_phone, fields[pron_field:]))
+            if predicate is not None and not predicate(word, list(pron)):
+                continue
+            word_to_prons[word].add(pron)
+            if lexiconp:
+                scores[(word, pron)] = float(fields[pron_field-1])
+
+    def parse_file(self, dict_path):
+        """Parse dictionary file."""
+        # Parsing allocates millions of long-lived containers, which would
+        # otherwise trigger repeated, futile garbage collection passes.
+        with utils.gc_disabled():
+            with open(dict_path, 'rb') as f:
+                for lines in iter_line_blocks(f):
+                    self.parse_lines(lines)
+
+
+def _encode_words(words):
+    """Convert iterable of strings to set of UTF-8 encoded bytes."""
+    if words is None:
+        return None
+    return {word.encode('utf-8') for word in words}
@@ -1,13 +1,48 @@
 """Pronunciation dictionary."""
+from array import array
 from collections import defaultdict
+from contextlib import contextmanager
+import functools
+import heapq
+import math
+import operator
 from pathlib import Path
+import random
 import sys
 
+from . import trace
 from . import utils
+from .indexes import NormalizedKeyIndex, WordChange
+from .parsing import DictParser
 
 __all__ = ['PronDict']
 
 
+# Rules for combining the scores of a pronunciation present in several
+# dictionaries.
+SCORE_MERGE_FUNCS = {
+    'first' : lambda score1, score2: score1,
+    'last' : lambda score1, score2: score2,
+    'max' : max,
+    'min' : min,
+    'sum' : operator.add,
+    }
+
+
+def _batched(method):
+    """Decorate mutating method so that its changes are notified together.
+
+    Has no effect unless the dictionary has subscribers or indexes.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._batch_depth or not self._observed:
+            return method(self, *args, **kwargs)
+        with self.batch():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class PronDict:
     """Pronunciation dictionary handling mappings from words to phone
     sequences.
@@ -17,6 +52,13 @@ class PronDict:
         >>> pdict = PronDict.load_dict('cmu.dict')
         >>> pdict['the']
 
+    Modifications through ``add_pron``, ``update``, ``prune``,
+    ``prune_by_counts``, ``apply``, item assignment, and item deletion are
+    notified to subscribers (see ``subscribe``) and derived indexes (see
+    ``register_index``) as lists of ``asrlex.indexes.WordChange``, so that
+    auxiliary structures may be updated incrementally. Each of these
+    methods, and each ``batch`` block, produces a single notification.
+
     Parameters
     ----------
     other : PronDict or Mapping
@@ -27,36 +69,277 @@ class PronDict:
         Pronunciation to assign to out-of-vocabulary words.
         (Default: ('OOV',))
 
+    normalizer : callable, optional
+        Function mapping words to normalized keys; e.g., an instance of
+        ``asrlex.normalize.Normalizer``. If set, ``lookup`` will resolve
+        tokens that are not head words through their normalized key.
+        (Default: None)
+
     Attributes
     ----------
     _word_to_prons : dict
         Mapping from words to sets of pronunciations, each pronunciation a
         list of phones.
+
+    _indexes : dict
+        Mapping from names to registered derived indexes. The normalized-key
+        index, if any, is registered as "normalized".
+
+    _subscribers : list of callable
+        Functions called with changes to dictionary.
+
+    _pending : dict
+        Mapping from head words modified in the current batch to their
+        pronunciations prior to the batch.
+
+    _batch_depth : int
+        Nesting depth of current batch.
+
+    _observed : bool
+        True if the dictionary has subscribers or indexes. Checked before
+        recording changes, so that unobserved dictionaries pay nothing for
+        notification.
+
+    _pron_table : tuple
+        Pair of distinct pronunciations in lexicographic order and mapping
+        from pronunciations to their indices. Computed on demand and
+        discarded whenever the dictionary is modified.
+
+    _arrays : LexiconArrays
+        Columnar representation of dictionary. Computed on demand and
+        discarded whenever the dictionary, or its scores or tags, are
+        modified.
+
+    _entry_rows : dict
+        Mapping from ``(word, pron)`` entries to rows of the score and tag
+        columns. None until a score or tag is first set.
+
+    _scores : array.array
+        Per-pronunciation scores. Missing scores are NaN.
+
+    _tags : array.array
+        Per-pronunciation tag codes, indexing ``_tag_names``. Missing tags are
+        -1.
+
+    _free_rows : list of int
+        Rows of the score and tag columns freed by removed entries, available
+        for reuse.
     """
-    def __init__(self, other=None, oov_pron=('OOV',)):
+    def __init__(self, other=None, oov_pron=('OOV',), normalizer=None):
         self.oov_pron = tuple(oov_pron)
         self._word_to_prons = defaultdict(set)
+        self._normalizer = None
+        self._indexes = {}
+        self._subscribers = []
+        self._pending = {}
+        self._batch_depth = 0
+        self._observed = False
+        self._pron_table = None
+        self._arrays = None
+        self._entry_rows = None
         if other:
             self.update(other)
+        if normalizer is not None:
+            # Indexing in bulk after updating is cheaper than incrementally.
+            self.normalizer = normalizer
+
+    def add_pron(self, word, *prons, score=None, tag=None):
+        """Add pronunciation.
 
-    def add_pron(self, word, *prons):
-        """Add pronunciation."""
+        If ``score`` or ``tag`` is set, it is assigned to all of ``prons``.
+        """
+        prons = [tuple(pron) for pron in prons]
+        if self._observed:
+            if not self._batch_depth:
+                with self.batch():
+                    return self.add_pron(word, *prons, score=score, tag=tag)
+            old_prons = self._word_to_prons.get(word)
+            if old_prons is None or not old_prons.issuperset(prons):
+                self._record(word)
         if not word in self:
             self[word] = {}
-        self[word].update(tuple(pron) for pron in prons)
+        self[word].update(prons)
+        self._pron_table = None
+        self._arrays = None
+        for pron in prons:
+            if score is not None:
+                self.set_score(word, pron, score)
+            if tag is not None:
+                self.set_tag(word, pron, tag)
 
-    def update(self, other):
+    @trace.traced('PronDict.update')
+    @_batched
+    def update(self, other, score_merge='max'):
         """Add all pronunciations from another dictionary.
 
+        Scores and tags of pronunciations are also copied from ``other``. If
+        a pronunciation is already scored, the two scores are combined
+        according to ``score_merge``. Existing tags are retained.
+
         Parameters
         ----------
         other : PronDict or Mapping
             Pronunciation dictionary or compatible ``Mapping`` instance to
             update from.
+
+        score_merge : str, optional
+            Rule for combining scores. One of "first" (keep existing
+            score), "last" (replace existing score), "max", "min", and "sum".
+            (Default: 'max')
         """
+        merge_func = _get_score_merge_func(score_merge)
         for word in other:
-            self.add_pron(word, *other[word])
+            prons = other[word]
+            self.add_pron(word, *prons)
+            if getattr(other, '_entry_rows', None) is None:
+                continue
+            for pron in prons:
+                self._merge_columns(
+                    word, pron, other.get_score(word, pron),
+                    other.get_tag(word, pron), merge_func)
+
+    def get_score(self, word, pron, default=None):
+        """Return score of pronunciation of word.
+
+        If the pronunciation is not scored, returns ``default``.
+        """
+        row = self._get_row(word, pron)
+        if row is None:
+            return default
+        score = self._scores[row]
+        return default if math.isnan(score) else score
+
+    def set_score(self, word, pron, score):
+        """Set score of pronunciation of word.
+
+        Scores are arbitrary floats for which higher is better; e.g.,
+        pronunciation probabilities or G2P posteriors.
+
+        Raises
+        ------
+        KeyError
+            If ``pron`` is not a pronunciation of ``word``.
+        """
+        row = self._get_row(word, pron, create=True)
+        self._scores[row] = score
+        self._arrays = None
+
+    def get_scores(self, word):
+        """Return mapping from pronunciations of word to their scores.
+
+        Unscored pronunciations are omitted.
+        """
+        scores = {}
+        if self._entry_rows is None:
+            return scores
+        for pron in self._word_to_prons.get(word, ()):
+            score = self.get_score(word, pron)
+            if score is not None:
+                scores[pron] = score
+        return scores
+
+    def get_tag(self, word, pron, default=None):
+        """Return tag of pronunciation of word.
+
+        If the pronunciation is not tagged, returns ``default``.
+        """
+        row = self._get_row(word, pron)
+        if row is None or self._tags[row] < 0:
+            return default
+        return self._tag_names[self._tags[row]]
+
+    def set_tag(self, word, pron, tag):
+        """Set tag of pronunciation of word.
+
+        Tags are arbitrary strings; e.g., the source of the pronunciation.
 
+        Raises
+        ------
+        KeyError
+            If ``pron`` is not a pronunciation of ``word``.
+        """
+        row = self._get_row(word, pron, create=True)
+        try:
+            code = self._tag_codes[tag]
+        except KeyError:
+            code = len(self._tag_names)
+            self._tag_names.append(tag)
+            self._tag_codes[tag] = code
+        self._tags[row] = code
+        self._arrays = None
+
+    @property
+    def has_columns(self):
+        """True if any pronunciation has been assigned a score or tag."""
+        return self._entry_rows is not None
+
+    def _get_row(self, word, pron, create=False):
+        """Return row of score and tag columns for pronunciation of word.
+
+        If the entry has no row, returns None, unless ``create=True``, in
+        which case a new row is allocated.
+        """
+        pron = tuple(pron)
+        if self._entry_rows is not None:
+            row = self._entry_rows.get((word, pron))
+            if row is not None or not create:
+                return row
+        elif not create:
+            return None
+        if pron not in self._word_to_prons.get(word, ()):
+            raise KeyError(f'{pron} is not a pronunciation of "{word}".')
+        if self._entry_rows is None:
+            self._entry_rows = {}
+            self._scores = array('d')
+            self._tags = array('l')
+            self._tag_names = []
+            self._tag_codes = {}
+            self._free_rows = []
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._scores[row] = math.nan
+            self._tags[row] = -1
+        else:
+            row = len(self._scores)
+            self._scores.append(math.nan)
+            self._tags.append(-1)
+        self._entry_rows[(word, pron)] = row
+        return row
+
+    def _drop_rows(self, word, prons):
+        """Free rows of score and tag columns for pronunciations of word."""
+        for pron in prons:
+            row = self._entry_rows.pop((word, pron), None)
+            if row is not None:
+                self._free_rows.append(row)
+
+    def _merge_columns(self, word, pron, score, tag, merge_func):
+        """Merge score and tag into those of pronunciation of word."""
+        if score is not None:
+            old_score = self.get_score(word, pron)
+            if old_score is not None:
+                score = merge_func(old_score, score)
+            self.set_score(word, pron, score)
+        if tag is not None and self.get_tag(word, pron) is None:
+            self.set_tag(word, pron, tag)
+
+    @_batched
+    def _remove_words(self, words):
+        """Remove words, all of which must be in dictionary, in bulk."""
+        word_to_prons = self._word_to_prons
+        has_rows = self._entry_rows is not None
+        observed = self._observed
+        for word in words:
+            if observed:
+                self._record(word)
+            prons = word_to_prons.pop(word)
+            if has_rows:
+                self._drop_rows(word, prons)
+        self._pron_table = None
+        self._arrays = None
+
+    @trace.traced('PronDict.prune')
+    @_batched
     def prune(self, keep=None, remove=None):
         """Prune dictionary.
 
@@ -75,19 +358,115 @@ class PronDict:
             except KeyError:
                 pass
 
-    def union(self, *others):
-        """Return union of pronunciation dictionaries."""
+    @trace.traced('PronDict.prune_by_counts')
+    @_batched
+    def prune_by_counts(self, counts, max_words=None, max_prons_per_word=None,
+                        min_count=None):
+        """Prune dictionary to most frequent words and their best
+        pronunciations.
+
+        Words are selected in a single pass over the dictionary using a heap,
+        and pruned in place.
+
+        Parameters
+        ----------
+        counts : mapping
+            Mapping from words to their counts (e.g., in a corpus). Words not
+            in ``counts`` have count 0.
+
+        max_words : int, optional
+            If not None, retain only the ``max_words`` words with the highest
+            counts. Ties are broken by lexicographic order of the words.
+            (Default: None)
+
+        max_prons_per_word : int, optional
+            If not None, retain at most ``max_prons_per_word`` pronunciations
+            per word. Pronunciations are ranked by score, unscored
+            pronunciations ranking below scored ones; ties are broken by
+            lexicographic order of the pronunciations.
+            (Default: None)
+
+        min_count : int, optional
+            If not None, remove words with counts less than ``min_count``.
+            (Default: None)
+        """
+        if max_words is not None:
+            utils.validate_integer_arg(max_words, 'max_words', min_val=0)
+        if max_prons_per_word is not None:
+            utils.validate_integer_arg(
+                max_prons_per_word, 'max_prons_per_word', min_val=1)
+
+        # Select words.
+        get_count = counts.get
+        words = self._word_to_prons.keys()
+        if min_count is not None:
+            words = [word for word in words if get_count(word, 0) >= min_count]
+        if max_words is not None and max_words < len(words):
+            # Find count of the last word retained by selecting over the
+            # counts alone, then break ties at that count lexicographically.
+            # A heap only beats sorting when retaining a small fraction.
+            word_counts = [get_count(word, 0) for word in words]
+            if not max_words:
+                min_kept = math.inf
+            elif max_words < len(word_counts) // 16:
+                min_kept = heapq.nlargest(max_words, word_counts)[-1]
+            else:
+                min_kept = sorted(word_counts)[-max_words]
+            ties = []
+            kept_words = []
+            for word, count in zip(words, word_counts):
+                if count > min_kept:
+                    kept_words.append(word)
+                elif count == min_kept:
+                    ties.append(word)
+            ties.sort()
+            words = kept_words + ties[:max_words - len(kept_words)]
+        if len(words) < len(self._word_to_prons):
+            keep = set(words)
+            self._remove_words(
+                [word for word in self._word_to_prons if word not in keep])
+
+        # Select pronunciations.
+        if max_prons_per_word is None:
+            return
+        for word, prons in list(self._word_to_prons.items()):
+            if len(prons) <= max_prons_per_word:
+                continue
+            if self.has_columns:
+                def key(pron):
+                    score = self.get_score(word, pron)
+                    return (math.inf if score is None else -score, pron)
+            else:
+                key = None
+            self[word] = heapq.nsmallest(max_prons_per_word, prons, key=key)
+
+    @trace.traced('PronDict.union')
+    def union(self, *others, score_merge='max'):
+        """Return union of pronunciation dictionaries.
+
+        Scores of pronunciations present in several dictionaries are
+        combined according to ``score_merge`` (see ``update``). Tags are
+        taken from the first dictionary in which the pronunciation is
+        tagged.
+        """
         oov_prons = {self.oov_pron}
         oov_prons.update([other.oov_pron for other in others])
         if len(oov_prons) > 1:
             raise ValueError('OOV pronunciations must match.')
-        new_pdict = PronDict(self)
+        new_pdict = self.copy()
         for other in others:
-            new_pdict.update(other)
+            new_pdict.update(other, score_merge=score_merge)
         return new_pdict
 
-    def intersection(self, *others):
-        """Return intersection of pronunciation dictionaries."""
+    @trace.traced('PronDict.intersection')
+    def intersection(self, *others, score_merge='min'):
+        """Return intersection of pronunciation dictionaries.
+
+        Scores of pronunciations are combined across dictionaries according
+        to ``score_merge`` (see ``update``). Tags are taken from the first
+        dictionary in which the pronunciation is tagged.
+        """
+        merge_func = _get_score_merge_func(score_merge)
         pdicts = [self]
         pdicts.extend(others)
         oov_prons = {pdict.oov_pron for pdict in pdicts}
@@ -99,32 +478,279 @@ class PronDict:
         for word in common_words:
             prons = set.intersection(*[pdict[word] for pdict in pdicts])
             new_pdict[word] = prons
+            for pdict in pdicts:
+                if not pdict.has_columns:
+                    continue
+                for pron in prons:
+                    new_pdict._merge_columns(
+                        word, pron, pdict.get_score(word, pron),
+                        pdict.get_tag(word, pron), merge_func)
+        new_pdict.normalizer = self.normalizer
         return new_pdict
 
+    @trace.traced('PronDict.difference')
     def difference(self, *others):
         """Return difference of two or more pronunciation dictionaries.
 
         That is, all pronunciations that are in this dictionary but not the
-        others.
+        others. Scores and tags are those of this dictionary.
         """
         oov_prons = {self.oov_pron}
         oov_prons.update([other.oov_pron for other in others])
         if len(oov_prons) > 1:
             raise ValueError('OOV pronunciations must match.')
-        new_pdict = PronDict(self)
+        new_pdict = self.copy()
         others_union = PronDict.union(*others)
-        for word in others_union:
-            if word not in new_pdict:
-                continue
-            new_pdict[word] = new_pdict[word] - others_union[word]
-            if not new_pdict[word]:
-                del new_pdict[word]
+        with new_pdict.batch():
+            for word in others_union:
+                if word not in new_pdict:
+                    continue
+                new_pdict[word] = new_pdict[word] - others_union[word]
+                if not new_pdict[word]:
+                    del new_pdict[word]
         return new_pdict
 
     def copy(self):
         """Return deep copy of dictionary."""
-        return PronDict(self, self.oov_pron)
+        return PronDict(self, self.oov_pron, self.normalizer)
+
+    def find_words(self, token):
+        """Return head words matching a token.
+
+        If ``token`` is a head word, it is the only match. Otherwise, if a
+        normalizer is set, all head words sharing the normalized key of
+        ``token`` are returned in lexicographic order.
+
+        Parameters
+        ----------
+        token : str
+            Token to resolve.
+
+        Returns
+        -------
+        words : tuple of str
+            Matching head words. Empty if ``token`` is out-of-vocabulary.
+        """
+        if token in self._word_to_prons:
+            return (token,)
+        if self._normalizer is None:
+            return ()
+        return self._indexes['normalized'].find_words(token)
+
+    def lookup(self, token):
+        """Return pronunciations for a token.
 
+        Unlike ``__getitem__``, tokens that are not head words are resolved
+        through the normalized-key index (see ``find_words``). If several
+        head words match, the union of their pronunciations is returned.
+
+        Parameters
+        ----------
+        token : str
+            Token to look up.
+
+        Returns
+        -------
+        prons : set of tuple
+            Pronunciations of ``token``. If ``token`` is out-of-vocabulary,
+            this is ``{self.oov_pron}``.
+        """
+        words = self.find_words(token)
+        if not words:
+            return {self.oov_pron}
+        if len(words) == 1:
+            return self._word_to_prons[words[0]]
+        return set().union(*[self._word_to_prons[word] for word in words])
+
+    def lookup_many(self, tokens, normalize=True):
+        """Look up pronunciations for a sequence of tokens.
+
+        Each distinct token is resolved only once, and the results are
+        gathered for all tokens as flat arrays in compressed sparse row (CSR)
+        layout, so this is considerably faster than repeated calls to
+        ``lookup`` for running text. The pronunciation IDs of token ``i``
+        are:
+
+            >>> pron_ids[offsets[i]:offsets[i+1]]
+
+        Parameters
+        ----------
+        tokens : iterable of str
+            Tokens to look up.
+
+        normalize : bool, optional
+            If True, resolve tokens that are not head words through the
+            normalized-key index (see ``find_words``).
+            (Default: True)
+
+        Returns
+        -------
+        pron_ids : numpy.ndarray, (n_ids,)
+            Sorted IDs of the pronunciations of each token in turn; that is,
+            their indices in ``prons``. Out-of-vocabulary tokens have none.
+
+        offsets : numpy.ndarray, (n_tokens + 1,)
+            Offsets into ``pron_ids`` of the pronunciation IDs of each
+            token.
+
+        oov_mask : numpy.ndarray, (n_tokens,)
+            For each token, True if it is out-of-vocabulary.
+        """
+        # Imported here so that NumPy is only loaded when needed.
+        import numpy as np
+        _, pron_to_id = self._get_pron_table()
+        word_to_prons = self._word_to_prons
+
+        # Resolve distinct tokens, mapping each token to its distinct index.
+        tokens = list(tokens)
+        token_to_index = dict.fromkeys(tokens)
+        distinct_ids = array('q')
+        distinct_lens = array('q')
+        for index, token in enumerate(token_to_index):
+            token_to_index[token] = index
+            if normalize:
+                words = self.find_words(token)
+            else:
+                words = (token,) if token in word_to_prons else ()
+            ids = sorted({pron_to_id[pron]
+                          for word in words for pron in word_to_prons[word]})
+            distinct_ids.extend(ids)
+            distinct_lens.append(len(ids))
+
+        # Gather results of distinct tokens for all tokens.
+        distinct_ids = np.frombuffer(distinct_ids, dtype=np.int64)
+        distinct_lens = np.frombuffer(distinct_lens, dtype=np.int64)
+        distinct_offsets = np.zeros(len(distinct_lens) + 1, dtype=np.int64)
+        np.cumsum(distinct_lens, out=distinct_offsets[1:])
+        token_indices = np.array(
+            list(map(token_to_index.__getitem__, tokens)), dtype=np.int64)
+        lens = distinct_lens[token_indices]
+        offsets = np.zeros(len(lens) + 1, dtype=np.int64)
+        np.cumsum(lens, out=offsets[1:])
+        shifts = np.repeat(
+            distinct_offsets[token_indices] - offsets[:-1], lens)
+        pron_ids = distinct_ids[np.arange(offsets[-1]) + shifts]
+        return pron_ids, offsets, lens == 0
+
+    def _get_pron_table(self):
+        """Return distinct pronunciations and mapping to their IDs."""
+        if self._pron_table is None:
+            prons = set()
+            for word_prons in self._word_to_prons.values():
+                prons.update(word_prons)
+            prons = tuple(sorted(prons))
+            pron_to_id = {pron : pron_id for pron_id, pron in enumerate(prons)}
+            self._pron_table = (prons, pron_to_id)
+        return self._pron_table
+
+    def subscribe(self, callback):
+        """Subscribe to changes to dictionary.
+
+        Parameters
+        ----------
+        callback : callable
+            Function called as ``callback(pdict, changes)`` after each
+            modification, or batch of modifications, of the dictionary, where
+            ``changes`` is a list of ``asrlex.indexes.WordChange``.
+        """
+        self._subscribers.append(callback)
+        self._observed = True
+
+    def unsubscribe(self, callback):
+        """Unsubscribe from changes to dictionary."""
+        self._subscribers.remove(callback)
+        self._observed = bool(self._subscribers or self._indexes)
+
+    def register_index(self, name, index, build=True):
+        """Register index derived from dictionary.
+
+        The index is updated with changes to the dictionary until it is
+        unregistered. Registered indexes are not copied by ``copy``.
+
+        Parameters
+        ----------
+        name : str
+            Name of index.
+
+        index : asrlex.indexes.DerivedIndex
+            Index.
+
+        build : bool, optional
+            If True, build the index. If False, the index must already be
+            current.
+            (Default: True)
+
+        Raises
+        ------
+        ValueError
+            If an index is already registered under ``name``.
+        """
+        if name in self._indexes:
+            raise ValueError(f'Index "{name}" is already registered.')
+        if build:
+            index.build(self)
+        self._indexes[name] = index
+        self._observed = True
+
+    def unregister_index(self, name):
+        """Unregister index and return it."""
+        index = self._indexes.pop(name)
+        self._observed = bool(self._subscribers or self._indexes)
+        return index
+
+    def get_index(self, name):
+        """Return registered index."""
+        return self._indexes[name]
+
+    @contextmanager
+    def batch(self):
+        """Context manager batching modifications of dictionary.
+
+        Subscribers and indexes are notified of all changes made within the
+        outermost ``batch`` block once, on exit, with at most one change per
+        head word. Until then, indexes do not reflect the changes.
+
+            >>> with pdict.batch():
+            ...     for word, pron in entries:
+            ...         pdict.add_pron(word, pron)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._flush()
+
+    def _record(self, word):
+        """Record pronunciations of word prior to its modification in the
+        current batch.
+        """
+        if word not in self._pending:
+            prons = self._word_to_prons.get(word)
+            self._pending[word] = None if prons is None else frozenset(prons)
+
+    def _flush(self):
+        """Notify subscribers and indexes of changes of current batch."""
+        pending = self._pending
+        if not pending:
+            return
+        self._pending = {}
+        get_prons = self._word_to_prons.get
+        with utils.gc_disabled():
+            changes = []
+            for word, old_prons in pending.items():
+                new_prons = get_prons(word)
+                if new_prons != old_prons:
+                    changes.append(WordChange(word, old_prons, new_prons))
+        if not changes:
+            return
+        for index in list(self._indexes.values()):
+            index.update(self, changes)
+        for callback in list(self._subscribers):
+            callback(self, changes)
+
+    @trace.traced('PronDict.apply')
     def apply(self, func, inplace=False):
         """Apply a function to every pronunciation in dictionary.
 
@@ -145,14 +771,31 @@ class PronDict:
         """
         if not inplace:
             self = self.copy()
-        for word in self:
-            prons = [func(pron) for pron in self[word]]
-            prons = [tuple(pron) for pron in prons]
-            self[word] = prons
+        merge_func = SCORE_MERGE_FUNCS['max']
+        with self.batch():
+            for word in self:
+                old_prons = self[word]
+                prons = [func(pron) for pron in old_prons]
+                prons = [tuple(pron) for pron in prons]
+                if not self.has_columns:
+                    self[word] = prons
+                    continue
+
+                # Carry scores and tags over to transformed pronunciations.
+                columns = [
+                    (self.get_score(word, pron), self.get_tag(word, pron))
+                    for pron in old_prons]
+                self[word] = prons
+                self._drop_rows(word, prons)
+                for pron, (score, tag) in zip(prons, columns):
+                    self._merge_columns(word, pron, score, tag, merge_func)
         return self
 
     @staticmethod
-    def load_dict(dict_path, oov_pron=('OOV',), align_lexicon=False):
+    @trace.traced('PronDict.load_dict')
+    def load_dict(dict_path, oov_pron=('OOV',), align_lexicon=False,
+                  normalizer=None, lexiconp=False, lazy=False, keep=None,
+                  remove=None, phones=None, predicate=None):
         """Load pronunciation dictionary from text file.
 
         Expected format of the text file is one pronunciation per line, each
@@ -169,6 +812,13 @@ class PronDict:
 
             <WORD> <WORD> <PHONE>( <PHONE>)*
 
+        If ``lexiconp=True``, the expected format is that of a Kaldi
+        ``lexiconp.txt`` file:
+
+            <WORD> <PROB> <PHONE>( <PHONE>)*
+
+        where PROB is stored as the score of the pronunciation.
+
         Parameters
         ----------
         dict_path : Path
@@ -182,27 +832,79 @@ class PronDict:
             If True, treat dictionary as being in Kaldi alignment lexicon
             format; that is, the head word is repeated.
             (Default: False)
+
+        normalizer : callable, optional
+            Function mapping words to normalized keys for ``lookup``.
+            (Default: None)
+
+        lexiconp : bool, optional
+            If True, treat dictionary as being in Kaldi ``lexiconp.txt``
+            format; that is, the head word is followed by a pronunciation
+            probability.
+            (Default: False)
+
+        lazy : bool, optional
+            If True, return a ``LazyPronDict``, which parses pronunciations
+            only as words are accessed. See ``asrlex.lazy.LazyPronDict``.
+            Incompatible with ``keep``, ``remove``, ``phones``, and
+            ``predicate``.
+            (Default: False)
+
+        keep : iterable of str, optional
+            If not None, only load entries whose head words are in ``keep``.
+            (Default: None)
+
+        remove : iterable of str, optional
+            If not None, do not load entries whose head words are in
+            ``remove``.
+            (Default: None)
+
+        phones : iterable of str, optional
+            If not None, only load pronunciations consisting entirely of
+            phones in ``phones``.
+            (Default: None)
+
+        predicate : callable, optional
+            If not None, only load entries for which ``predicate(word,
+            phones)`` is True, where ``phones`` is a list of the phones of
+            the pronunciation.
+            (Default: None)
+
+        Notes
+        -----
+        Filters are applied to each line as it is parsed, so that memory
+        usage and load time are proportional to the number of entries kept.
+        This is considerably more efficient than loading the entire
+        dictionary, then calling ``prune``.
         """
         dict_path = Path(dict_path)
+        filters = [keep, remove, phones, predicate]
+        if lazy and any(filt is not None for filt in filters):
+            raise ValueError(
+                'Filters are not supported for lazily loaded dictionaries.')
+        if lazy:
+            from .lazy import LazyPronDict
+            pdict = LazyPronDict(
+                dict_path, oov_pron=oov_pron, align_lexicon=align_lexicon,
+                lexiconp=lexiconp)
+            if normalizer is not None:
+                pdict.normalizer = normalizer
+            return pdict
+        parser = DictParser(
+            align_lexicon=align_lexicon, lexiconp=lexiconp, keep=keep,
+            remove=remove, phones=phones, predicate=predicate)
+        parser.parse_file(dict_path)
+        trace.incr('PronDict.load_dict.words', len(parser.word_to_prons),
+                   path=str(dict_path))
         pdict = PronDict(oov_pron=oov_pron)
-        with open(dict_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.startswith(';;;'):
-                    # Used to indicate comments in cmudict.
-                    continue
-                fields = line.strip().split()
-                if align_lexicon:
-                    # For some reason, Kaldi alignment lexicons repeat the
-                    # head word.
-                    fields = fields[1:]
-                if len(fields) < 2:
-                    continue
-                word = fields[0]
-                pron = tuple(fields[1:])
-                pdict.add_pron(word, pron)
+        pdict._word_to_prons = parser.word_to_prons
+        pdict.normalizer = normalizer
+        for (word, pron), score in parser.scores.items():
+            pdict.set_score(word, pron, score)
         return pdict
 
-    def print_dict(self, align_lexicon=False, sep='\t', file=sys.stdout):
+    def print_dict(self, align_lexicon=False, sep='\t', file=sys.stdout,
+                   lexiconp=False, tags=False):
         """Print mapping to STDOUT
 
         See ``load_dict`` for output file format.
@@ -214,6 +916,11 @@ class PronDict:
             format.
             (Default: False)
 
+        lexiconp : bool, optional
+            If True, output dictionary as being in Kaldi ``lexiconp.txt``
+            format. Unscored pronunciations are output with probability 1.
+            (Default: False)
+
         sep : str, optional
             Field separator.
             (Default: '\t')
@@ -221,16 +928,23 @@ class PronDict:
         file : filelike, optional
             Object with ``write`` method.
             (Default: sys.stdout)
+
+        tags : bool, optional
+            If True, append tag of each pronunciation as final field, or "-"
+            if untagged. Such output cannot be read by ``load_dict``.
+            (Default: False)
         """
         for word in self:
             for pron in sorted(self[word]):
-                pron = [str(phn) for phn in pron]
-                line = f'{word}{sep}{" ".join(pron)}'
-                if align_lexicon:
-                    line = f'{word}{sep}{line}'
+                score = self.get_score(word, pron, 1.0) if lexiconp else None
+                tag = self.get_tag(word, pron, '-') if tags else None
+                line = format_entry(
+                    word, pron, score, align_lexicon, sep, lexiconp, tag)
                 print(line, end='\n', file=file)
 
-    def write_dict(self, dict_path, align_lexicon=False, sep='\t'):
+    @trace.traced('PronDict.write_dict')
+    def write_dict(self, dict_path, align_lexicon=False, sep='\t',
+                   lexiconp=False):
         """Write mapping to file.
 
         See ``load_dict`` for output file format.
@@ -245,13 +959,173 @@ class PronDict:
             format.
             (Default: False)
 
+        lexiconp : bool, optional
+            If True, output dictionary as being in Kaldi ``lexiconp.txt``
+            format. Unscored pronunciations are output with probability 1.
+            (Default: False)
+
         sep : str, optional
             Field separator.
             (Default: '\t')
         """
         dict_path = Path(dict_path)
         with open(dict_path, 'w', encoding='utf-8') as f:
-            self.print_dict(align_lexicon=align_lexicon, sep=sep, file=f)
+            self.print_dict(
+                align_lexicon=align_lexicon, sep=sep, file=f,
+                lexiconp=lexiconp)
+
+    def to_arrays(self):
+        """Return dictionary in compressed sparse row (CSR) layout.
+
+        The result is cached until the dictionary is next modified, so
+        repeated calls, and calls on dictionaries created by ``from_arrays``,
+        return the same read-only arrays without copying. See
+        ``asrlex.arrays.LexiconArrays`` for details of the layout.
+
+        Returns
+        -------
+        arrays : LexiconArrays
+            Word and phone symbol tables, and arrays of head word indices,
+            phone offsets, phone codes, and, if present, scores and tags of
+            each pronunciation.
+        """
+        if self._arrays is None:
+            # Imported here so that NumPy is only loaded when needed.
+            from .arrays import LexiconArrays
+            self._arrays = LexiconArrays.from_pron_dict(self)
+        return self._arrays
+
+    @staticmethod
+    def from_arrays(arrays, oov_pron=('OOV',)):
+        """Create pronunciation dictionary from arrays output by
+        ``to_arrays``.
+
+        Parameters
+        ----------
+        arrays : LexiconArrays
+            Dictionary in compressed sparse row layout.
+
+        oov_pron : iterable of str, optional
+            Pronunciation to assign to out-of-vocabulary words.
+            (Default: ('OOV',))
+        """
+        return arrays.to_pron_dict(oov_pron)
+
+    def stats(self):
+        """Return statistics of dictionary.
+
+        See ``asrlex.stats.lexicon_stats`` for details.
+        """
+        # Imported here so that NumPy is only loaded when needed.
+        from .stats import lexicon_stats
+        return lexicon_stats(self._word_to_prons.items())
+
+    def memory_usage(self, deep=True, sample=None, seed=0):
+        """Return memory used by dictionary, broken down by component.
+
+        Parameters
+        ----------
+        deep : bool, optional
+            If True, include memory used by the head word and phone strings,
+            not just the containers holding them.
+            (Default: True)
+
+        sample : int, optional
+            If not None, estimate memory used by words and pronunciations
+            from a random sample of ``sample`` words. Useful for very large
+            dictionaries, for which exact accounting is slow.
+            (Default: None)
+
+        seed : int, optional
+            Seed for random sampling of words.
+            (Default: 0)
+
+        Returns
+        -------
+        usage : dict
+            Mapping from components to bytes used:
+
+            - words  --  head word strings; 0 unless ``deep=True``
+            - phones  --  phone strings; 0 unless ``deep=True``
+            - prons  --  pronunciation tuples
+            - sets  --  per-word sets of pronunciations
+            - dict  --  hash table mapping words to sets of pronunciations
+            - pron_table  --  pronunciation ID table
+            - columns  --  per-pronunciation score and tag columns
+            - <name>_index  --  index registered as ``name`` (see
+              ``register_index`` and ``DerivedIndex.memory_usage``); e.g.,
+              normalized_index for the normalized-key index. Only present
+              for registered indexes
+            - total  --  total of all components
+
+            Objects shared between components (e.g., phones shared between
+            pronunciations) are counted once.
+        """
+        getsizeof = sys.getsizeof
+        word_to_prons = self._word_to_prons
+        words = word_to_prons.keys()
+        scale = 1.0
+        if sample is not None and sample < len(words):
+            utils.validate_integer_arg(sample, 'sample', min_val=1)
+            scale = len(words) / sample
+            words = random.Random(seed).sample(list(words), sample)
+        usage = dict.fromkeys(['words', 'phones', 'prons', 'sets'], 0)
+        seen = set()
+        for word in words:
+            prons = word_to_prons[word]
+            usage['sets'] += getsizeof(prons)
+            if deep:
+                usage['words'] += getsizeof(word)
+            for pron in prons:
+                if id(pron) in seen:
+                    continue
+                seen.add(id(pron))
+                usage['prons'] += getsizeof(pron)
+                if not deep:
+                    continue
+                for phone in pron:
+                    if id(phone) not in seen:
+                        seen.add(id(phone))
+                        usage['phones'] += getsizeof(phone)
+        for component in ['words', 'prons', 'sets']:
+            # Phones are a small, shared inventory, so are not scaled.
+            usage[component] = int(scale*usage[component])
+        usage['dict'] = getsizeof(word_to_prons)
+        usage.update(self._index_memory_usage(deep))
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def _index_memory_usage(self, deep):
+        """Return memory used by auxiliary indexes, by index."""
+        getsizeof = sys.getsizeof
+        usage = {}
+
+        # Registered indexes, including the normalized-key index. Head words
+        # and pronunciations are accounted for elsewhere.
+        for name, index in self._indexes.items():
+            usage[f'{name}_index'] = index.memory_usage(deep)
+
+        # Pronunciation ID table. Pronunciations are accounted for elsewhere.
+        size = 0
+        if self._pron_table is not None:
+            prons, pron_to_id = self._pron_table
+            size += getsizeof(prons) + getsizeof(pron_to_id)
+            if deep:
+                size += sum(map(getsizeof, range(len(prons))))
+        usage['pron_table'] = size
+
+        # Score and tag columns.
+        size = 0
+        if self._entry_rows is not None:
+            size += getsizeof(self._entry_rows) + getsizeof(self._scores)
+            size += getsizeof(self._tags) + getsizeof(self._free_rows)
+            size += getsizeof(self._tag_names) + getsizeof(self._tag_codes)
+            size += len(self._entry_rows)*getsizeof(('', ()))
+            if deep:
+                size += sum(map(getsizeof, self._tag_names))
+        usage['columns'] = size
+
+        return usage
 
     @property
     def words(self):
@@ -270,6 +1144,33 @@ class PronDict:
                 phones.update(pron)
         return sorted(phones)
 
+    @property
+    def normalizer(self):
+        """Function mapping words to normalized keys for ``lookup``.
+
+        Setting the normalizer rebuilds the normalized-key index, which is
+        registered as "normalized" (see ``register_index``).
+        """
+        return self._normalizer
+
+    @normalizer.setter
+    def normalizer(self, normalizer):
+        self._normalizer = normalizer
+        if 'normalized' in self._indexes:
+            self.unregister_index('normalized')
+        if normalizer is not None:
+            self.register_index('normalized', NormalizedKeyIndex(normalizer))
+
+    @property
+    def prons(self):
+        """Distinct pronunciations used in dictionary.
+
+        Pronunciations are sorted in lexicographic order. The index of a
+        pronunciation is its pronunciation ID (see ``lookup_many``).
+        """
+        prons, _ = self._get_pron_table()
+        return prons
+
     @property
     def n(self):
         """Number of words in vocabulary."""
@@ -282,11 +1183,31 @@ class PronDict:
         return self._word_to_prons.get(word, {self.oov_pron})
 
     def __setitem__(self, word, prons):
+        if self._observed:
+            if not self._batch_depth:
+                with self.batch():
+                    self[word] = prons
+                    return
+            self._record(word)
         prons = set(tuple(pron) for pron in prons)
+        if self._entry_rows is not None and word in self._word_to_prons:
+            self._drop_rows(word, self._word_to_prons[word] - prons)
         self._word_to_prons[word] = prons
+        self._pron_table = None
+        self._arrays = None
 
     def __delitem__(self, word):
-        del self._word_to_prons[word]
+        if self._observed:
+            if not self._batch_depth:
+                with self.batch():
+                    del self[word]
+                    return
+            self._record(word)
+        prons = self._word_to_prons.pop(word)
+        self._pron_table = None
+        self._arrays = None
+        if self._entry_rows is not None:
+            self._drop_rows(word, prons)
 
     def __contains__(self, word):
         return word in self._word_to_prons
@@ -295,6 +1216,13 @@ class PronDict:
         for word in self.words:
             yield word
 
+    def __getstate__(self):
+        # Subscribers are callbacks of this process, so are not pickled.
+        state = self.__dict__.copy()
+        state['_subscribers'] = []
+        state['_observed'] = bool(self._indexes)
+        return state
+
     def __eq__(self, other_pdict):
         if self.oov_pron != other_pdict.oov_pron:
             return False
@@ -317,3 +1245,42 @@ class PronDict:
     def __repr__(self):
         pdict = dict(self._word_to_prons)
         return f'PronDict({pdict}, oov_pron={self.oov_pron})'
+
+
+def format_entry(word, pron, score=None, align_lexicon=False, sep='\t',
+                 lexiconp=False, tag=None):
+    """Return line of dictionary file for entry, without trailing newline.
+
+    See ``PronDict.load_dict`` for format. If ``lexiconp=True`` and ``score``
+    is None, the probability is output as 1. Scores are output with as many
+    digits as needed to be read back exactly. If ``tag`` is not None, it is
+    appended as a final field.
+    """
+    phones = " ".join([str(phn) for phn in pron])
+    line = f'{word}{sep}{phones}'
+    if lexiconp:
+        score = 1.0 if score is None else score
+        line = f'{word}{sep}{_format_score(score)}{sep}{phones}'
+    if align_lexicon:
+        line = f'{word}{sep}{line}'
+    if tag is not None:
+        line = f'{line}{sep}{tag}'
+    return line
+
+
+def _format_score(score):
+    """Return shortest representation of score that round trips exactly,
+    omitting the fractional part of integral scores; e.g., "1", "0.25".
+    """
+    text = repr(float(score))
+    return text[:-2] if text.endswith('.0') else text
+
+
+def _get_score_merge_func(score_merge):
+    """Return function implementing score merge rule."""
+    try:
+        return SCORE_MERGE_FUNCS[score_merge]
+    except KeyError:
+        raise ValueError(
+            f'Unrecognized score merge rule: "{score_merge}". Must be one of '
+            f'{sorted(SCORE_MERGE_FUNCS)}.')
@@ -0,0 +1,188 @@
+"""Resolution of pronunciations from a lexicon, falling back to G2P."""
+from . import trace
+from .prondict import PronDict
+
+__all__ = ['HybridResolver', 'ResolveReport']
+
+
+# Tags assigned to pronunciations by ``HybridResolver.resolve``.
+LEXICON_TAG = 'lexicon'
+G2P_TAG = 'g2p'
+
+
+class ResolveReport:
+    """Counts of words resolved by each source.
+
+    Attributes
+    ----------
+    n_lexicon : int
+        Number of distinct words resolved from the lexicon, including those
+        resolved through normalized keys.
+
+    n_normalized : int
+        Number of distinct words resolved from the lexicon through
+        normalized keys.
+
+    n_g2p : int
+        Number of distinct words resolved by G2P.
+
+    n_unresolved : int
+        Number of distinct words not resolved; i.e., out-of-vocabulary words
+        for which G2P produced no pronunciations, or which were not decoded
+        as there is no G2P model.
+    """
+    def __init__(self):
+        self.n_lexicon = 0
+        self.n_normalized = 0
+        self.n_g2p = 0
+        self.n_unresolved = 0
+
+    @property
+    def n_words(self):
+        """Number of distinct words."""
+        return self.n_lexicon + self.n_g2p + self.n_unresolved
+
+    def to_dict(self):
+        """Return JSON serializable summary of counts."""
+        return {
+            'n_words' : self.n_words,
+            'n_lexicon' : self.n_lexicon,
+            'n_normalized' : self.n_normalized,
+            'n_g2p' : self.n_g2p,
+            'n_unresolved' : self.n_unresolved,
+            }
+
+    def __repr__(self):
+        return (f'ResolveReport(n_words={self.n_words}, '
+                f'n_lexicon={self.n_lexicon}, '
+                f'n_normalized={self.n_normalized}, n_g2p={self.n_g2p}, '
+                f'n_unresolved={self.n_unresolved})')
+
+
+class HybridResolver:
+    """Resolves pronunciations from a lexicon, falling back to G2P for
+    out-of-vocabulary words.
+
+        >>> lexicon = PronDict.load_dict('cmu.dict', normalizer=Normalizer())
+        >>> resolver = HybridResolver(lexicon, G2P('g2p.fst'))
+        >>> pdict, report = resolver.resolve(words, n_jobs=8)
+
+    Each distinct word is looked up in the lexicon, and only the distinct
+    words not found are decoded by the G2P model, so that no word is decoded
+    twice and no known word is decoded at all.
+
+    Parameters
+    ----------
+    lexicon : PronDict
+        Reference lexicon.
+
+    model : G2P, optional
+        G2P model for out-of-vocabulary words. If None, they are left
+        unresolved.
+        (Default: None)
+
+    normalize : bool, optional
+        If True, resolve words that are not head words of ``lexicon`` through
+        its normalized-key index (see ``PronDict.find_words``). Has no effect
+        unless ``lexicon.normalizer`` is set.
+        (Default: True)
+    """
+    def __init__(self, lexicon, model=None, normalize=True):
+        self.lexicon = lexicon
+        self.model = model
+        self.normalize = normalize
+
+    def _find_words(self, word):
+        """Return head words of lexicon matching word."""
+        if self.normalize:
+            return self.lexicon.find_words(word)
+        return (word,) if word in self.lexicon else ()
+
+    @trace.traced('HybridResolver.resolve')
+    def resolve(self, words, n_jobs=1, chunk_size=256, callback=None,
+                **decode_kwargs):
+        """Resolve pronunciations of words.
+
+        Pronunciations are tagged with their source, ``'lexicon'`` or
+        ``'g2p'`` (see ``PronDict.get_tag``). Scores of lexicon
+        pronunciations are copied from the lexicon, taking the maximum over
+        head words if several match; those of G2P pronunciations are their
+        probabilities under the model.
+
+        Parameters
+        ----------
+        words : iterable of str
+            Words to resolve.
+
+        n_jobs : int, optional
+            Number of worker processes for G2P. See ``G2P.iter_prons``.
+            (Default: 1)
+
+        chunk_size : int, optional
+            Maximum number of words per G2P task. See ``G2P.iter_prons``.
+            (Default: 256)
+
+        callback : callable, optional
+            If not None, called as ``callback(word, source, latency)`` as each
+            word is resolved, where ``source`` is the tag of its
+            pronunciations, or None if it was not resolved, and ``latency`` is
+            the time in seconds spent decoding it; 0 for words resolved from
+            the lexicon.
+            (Default: None)
+
+        decode_kwargs
+            Keyword arguments for ``G2P.iter_prons``; e.g., ``n_best``.
+
+        Returns
+        -------
+        pdict : PronDict
+            Dictionary mapping resolved words to their pronunciations. Its
+            OOV pronunciation is that of the lexicon.
+
+        report : ResolveReport
+            Counts of words resolved by each source.
+        """
+        lexicon = self.lexicon
+        pdict = PronDict(oov_pron=lexicon.oov_pron)
+        report = ResolveReport()
+        oovs = []
+        has_scores = lexicon.has_columns
+        for word in dict.fromkeys(words):
+            matches = self._find_words(word)
+            if not matches:
+                oovs.append(word)
+                continue
+            report.n_lexicon += 1
+            report.n_normalized += matches != (word,)
+            for match in matches:
+                pdict.add_pron(word, *lexicon[match], tag=LEXICON_TAG)
+                if not has_scores:
+                    continue
+                for pron, score in lexicon.get_scores(match).items():
+                    old_score = pdict.get_score(word, pron)
+                    if old_score is None or score > old_score:
+                        pdict.set_score(word, pron, score)
+            if callback is not None:
+                callback(word, LEXICON_TAG, 0.0)
+        if self.model is None:
+            report.n_unresolved += len(oovs)
+            if callback is not None:
+                for word in oovs:
+                    callback(word, None, 0.0)
+            return pdict, report
+
+        decode_kwargs['with_scores'] = True
+        results = self.model.iter_prons(
+            oovs, n_jobs=n_jobs, chunk_size=chunk_size, **decode_kwargs)
+        for word, prons, latency in results:
+            source = G2P_TAG if prons else None
+            if prons:
+                report.n_g2p += 1
+                pdict.add_pron(word, *prons, tag=G2P_TAG)
+                for pron, score in prons.items():
+                    pdict.set_score(word, pron, score)
+            else:
+                report.n_unresolved += 1
+            if callback is not None:
+                callback(word, source, latency)
+        return pdict, report
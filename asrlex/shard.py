@@ -0,0 +1,365 @@
+"""Hash-sharded pronunciation dictionaries."""
+import heapq
+from pathlib import Path
+import re
+import zlib
+
+from . import utils
+from .parsing import _split_fields
+from .prondict import PronDict
+
+__all__ = ['ShardedPronDict', 'load_merged', 'merge_dict_files',
+           'shard_of', 'split_dict']
+
+
+SHARD_NAME_TEMPLATE = 'shard-{index:05d}-of-{n_shards:05d}.dict'
+SHARD_NAME_RE = re.compile(r'^shard-(\d+)-of-(\d+)\.dict$')
+
+
+def shard_of(word, n_shards):
+    """Return index of shard that owns ``word``.
+
+    Routing uses CRC-32 of the UTF-8 encoded word, so is stable across
+    processes, machines, and Python versions, unlike the builtin ``hash``.
+
+    Parameters
+    ----------
+    word : str or bytes
+        Head word. If bytes, assumed to be UTF-8 encoded.
+
+    n_shards : int
+        Number of shards.
+    """
+    if isinstance(word, str):
+        word = word.encode('utf-8')
+    return zlib.crc32(word) % n_shards
+
+
+def shard_path(dict_dir, index, n_shards):
+    """Return path of shard file ``index`` of ``n_shards`` in directory."""
+    return Path(
+        dict_dir, SHARD_NAME_TEMPLATE.format(index=index, n_shards=n_shards))
+
+
+def _find_shard_paths(dict_dir):
+    """Return paths of all shard files in directory, ordered by index."""
+    paths = {}
+    n_shards_seen = set()
+    for path in Path(dict_dir).iterdir():
+        match = SHARD_NAME_RE.match(path.name)
+        if not match:
+            continue
+        index, n_shards = int(match.group(1)), int(match.group(2))
+        paths[index] = path
+        n_shards_seen.add(n_shards)
+    if len(n_shards_seen) != 1:
+        raise ValueError(
+            f'Expected shard files for exactly one shard count in '
+            f'"{dict_dir}"; found {sorted(n_shards_seen)}.')
+    n_shards = n_shards_seen.pop()
+    missing = sorted(set(range(n_shards)) - set(paths))
+    if missing:
+        raise ValueError(f'Missing shards {missing} in "{dict_dir}".')
+    return [paths[index] for index in range(n_shards)]
+
+
+class ShardedPronDict:
+    """Pronunciation dictionary partitioned into shards by head word.
+
+    Each word is owned by exactly one shard, as determined by ``shard_of``,
+    so shards may be processed independently (e.g., on different machines)
+    and then merged without conflict:
+
+        >>> spdict = ShardedPronDict.from_pron_dict(pdict, 4)
+        >>> spdict.write_shards('shards/')
+
+    Parameters
+    ----------
+    n_shards : int
+        Number of shards.
+
+    oov_pron : iterable of str
+        Pronunciation to assign to out-of-vocabulary words.
+        (Default: ('OOV',))
+
+    Attributes
+    ----------
+    shards : list of PronDict
+        Shards, in order of index.
+    """
+    def __init__(self, n_shards, oov_pron=('OOV',)):
+        utils.validate_integer_arg(n_shards, 'n_shards', min_val=1)
+        self.n_shards = n_shards
+        self.oov_pron = tuple(oov_pron)
+        self.shards = [PronDict(oov_pron=oov_pron) for _ in range(n_shards)]
+
+    @staticmethod
+    def from_pron_dict(pdict, n_shards):
+        """Partition pronunciation dictionary into shards.
+
+        Scores and tags of pronunciations are also copied.
+        """
+        spdict = ShardedPronDict(n_shards, pdict.oov_pron)
+        has_columns = getattr(pdict, 'has_columns', False)
+        for word in pdict:
+            shard = spdict.get_shard(word)
+            prons = pdict[word]
+            shard[word] = prons
+            if not has_columns:
+                continue
+            for pron in prons:
+                score = pdict.get_score(word, pron)
+                if score is not None:
+                    shard.set_score(word, pron, score)
+                tag = pdict.get_tag(word, pron)
+                if tag is not None:
+                    shard.set_tag(word, pron, tag)
+        return spdict
+
+    def shard_of(self, word):
+        """Return index of shard that owns ``word``."""
+        return shard_of(word, self.n_shards)
+
+    def get_shard(self, word):
+        """Return shard that owns ``word``."""
+        return self.shards[self.shard_of(word)]
+
+    def add_pron(self, word, *prons, **kwargs):
+        """Add pronunciation to owning shard.
+
+        See ``PronDict.add_pron``.
+        """
+        self.get_shard(word).add_pron(word, *prons, **kwargs)
+
+    def _check_compatible(self, others):
+        for other in others:
+            if other.n_shards != self.n_shards:
+                raise ValueError('Number of shards must match.')
+            if other.oov_pron != self.oov_pron:
+                raise ValueError('OOV pronunciations must match.')
+
+    def _map_shards(self, func, others):
+        """Return new dictionary with ``func`` applied shard-wise."""
+        self._check_compatible(others)
+        spdict = ShardedPronDict(self.n_shards, self.oov_pron)
+        other_shards = [other.shards for other in others]
+        spdict.shards = [
+            func(*shards) for shards in zip(self.shards, *other_shards)]
+        return spdict
+
+    def union(self, *others, **kwargs):
+        """Return shard-wise union of sharded dictionaries.
+
+        See ``PronDict.union``.
+        """
+        return self._map_shards(
+            lambda *shards: PronDict.union(*shards, **kwargs), others)
+
+    def intersection(self, *others, **kwargs):
+        """Return shard-wise intersection of sharded dictionaries.
+
+        See ``PronDict.intersection``.
+        """
+        return self._map_shards(
+            lambda *shards: PronDict.intersection(*shards, **kwargs), others)
+
+    def difference(self, *others):
+        """Return shard-wise difference of sharded dictionaries.
+
+        See ``PronDict.difference``.
+        """
+        return self._map_shards(PronDict.difference, others)
+
+    def to_pron_dict(self):
+        """Merge shards into single pronunciation dictionary."""
+        pdict = PronDict(oov_pron=self.oov_pron)
+        for shard in self.shards:
+            pdict.update(shard)
+        return pdict
+
+    def write_shards(self, dict_dir, **kwargs):
+        """Write each shard to a file in directory.
+
+        Additional keyword arguments are passed to ``PronDict.write_dict``.
+
+        Returns
+        -------
+        paths : list of Path
+            Paths of shard files, in order of index.
+        """
+        dict_dir = Path(dict_dir)
+        dict_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for index, shard in enumerate(self.shards):
+            path = shard_path(dict_dir, index, self.n_shards)
+            shard.write_dict(path, **kwargs)
+            paths.append(path)
+        return paths
+
+    @staticmethod
+    def load_shards(dict_dir, oov_pron=('OOV',), **kwargs):
+        """Load sharded dictionary from directory of shard files.
+
+        Additional keyword arguments are passed to ``PronDict.load_dict``.
+        """
+        paths = _find_shard_paths(dict_dir)
+        spdict = ShardedPronDict(len(paths), oov_pron)
+        spdict.shards = [PronDict.load_dict(path, oov_pron, **kwargs)
+                         for path in paths]
+        return spdict
+
+    @property
+    def words(self):
+        """Words comprising vocabulary.
+
+        Words are sorted in lexicographic order.
+        """
+        return list(heapq.merge(*[shard.words for shard in self.shards]))
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+    def __getitem__(self, word):
+        return self.get_shard(word)[word]
+
+    def __contains__(self, word):
+        return word in self.get_shard(word)
+
+    def __iter__(self):
+        for word in self.words:
+            yield word
+
+    def __eq__(self, other):
+        return (self.n_shards == other.n_shards and
+                self.shards == other.shards)
+
+    def __or__(self, other):
+        return self.union(other)
+
+    def __and__(self, other):
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        return self.difference(other)
+
+    def __repr__(self):
+        return (f'ShardedPronDict(n_shards={self.n_shards}, '
+                f'oov_pron={self.oov_pron})')
+
+
+def split_dict(dict_path, dict_dir, n_shards, align_lexicon=False):
+    """Split dictionary file into shard files without loading it.
+
+    Lines are routed by head word and copied verbatim, so shard files are in
+    the same format as ``dict_path``, but are not sorted.
+
+    Parameters
+    ----------
+    dict_path : Path
+        Path to pronunciation dictionary.
+
+    dict_dir : Path
+        Output directory for shard files.
+
+    n_shards : int
+        Number of shards.
+
+    align_lexicon : bool, optional
+        If True, treat dictionary as being in Kaldi alignment lexicon format.
+        (Default: False)
+
+    Returns
+    -------
+    paths : list of Path
+        Paths of shard files, in order of index.
+    """
+    utils.validate_integer_arg(n_shards, 'n_shards', min_val=1)
+    dict_dir = Path(dict_dir)
+    dict_dir.mkdir(parents=True, exist_ok=True)
+    paths = [shard_path(dict_dir, index, n_shards)
+             for index in range(n_shards)]
+    word_field = 1 if align_lexicon else 0
+    fs = [open(path, 'wb') for path in paths]
+    try:
+        with open(dict_path, 'rb') as f:
+            for line in f:
+                # Head words are split as by ``DictParser``, so that lines are
+                # routed to the shards that will own them once parsed.
+                fields = _split_fields(line)
+                if len(fields) <= word_field + 1 or line.startswith(b';;;'):
+                    continue
+                if not line.endswith(b'\n'):
+                    line += b'\n'
+                fs[shard_of(fields[word_field], n_shards)].write(line)
+    finally:
+        for f in fs:
+            f.close()
+    return paths
+
+
+def load_merged(paths, oov_pron=('OOV',), **kwargs):
+    """Load shard files into single pronunciation dictionary.
+
+    Shards are loaded one at a time, so at most one shard beyond the merged
+    dictionary is in memory. Additional keyword arguments are passed to
+    ``PronDict.load_dict``.
+    """
+    pdict = PronDict(oov_pron=oov_pron)
+    for path in paths:
+        pdict.update(PronDict.load_dict(path, oov_pron, **kwargs))
+    return pdict
+
+
+def _iter_keyed_lines(path, align_lexicon, lexiconp):
+    """Iterate over ``(key, line)`` pairs of sorted dictionary file.
+
+    Keys are ``(word, pron)`` pairs, which determine the order of entries
+    output by ``PronDict.write_dict``.
+    """
+    word_field = 1 if align_lexicon else 0
+    pron_field = word_field + (2 if lexiconp else 1)
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) <= pron_field or line.startswith(';;;'):
+                continue
+            if not line.endswith('\n'):
+                line += '\n'
+            yield (fields[word_field], tuple(fields[pron_field:])), line
+
+
+def merge_dict_files(paths, dict_path, align_lexicon=False, lexiconp=False):
+    """Merge sorted dictionary files into a single sorted file.
+
+    Input files must each be sorted as by ``PronDict.write_dict``. They are
+    merged in a single streaming pass, so memory usage is independent of
+    their size. Entries with the same word and pronunciation are output
+    once, the first occurrence being retained.
+
+    Parameters
+    ----------
+    paths : iterable of Path
+        Paths to sorted pronunciation dictionaries.
+
+    dict_path : Path
+        Path to output pronunciation dictionary.
+
+    align_lexicon : bool, optional
+        If True, treat dictionaries as being in Kaldi alignment lexicon
+        format.
+        (Default: False)
+
+    lexiconp : bool, optional
+        If True, treat dictionaries as being in Kaldi ``lexiconp.txt``
+        format.
+        (Default: False)
+    """
+    iters = [_iter_keyed_lines(path, align_lexicon, lexiconp)
+             for path in paths]
+    prev_key = None
+    with open(dict_path, 'w', encoding='utf-8') as f:
+        for key, line in heapq.merge(*iters, key=lambda x: x[0]):
+            if key == prev_key:
+                continue
+            f.write(line)
+            prev_key = key
@@ -0,0 +1,113 @@
+"""Lexicon statistics."""
+from array import array
+
+import numpy as np
+
+from . import utils
+
+__all__ = ['lexicon_stats']
+
+
+# Maximum size of phone inventory for which bigrams are counted using a dense
+# bincount over all phone pairs.
+_MAX_DENSE_BIGRAM_PHONES = 4096
+
+
+def _histogram(counts):
+    """Convert bincount output to mapping from values to nonzero counts."""
+    return {int(val) : int(counts[val]) for val in np.flatnonzero(counts)}
+
+
+def lexicon_stats(word_prons):
+    """Compute statistics of pronunciation lexicon.
+
+    All statistics are computed in a single pass over the lexicon, during
+    which phones are mapped to integer codes. Counting is then performed
+    using NumPy.
+
+    Parameters
+    ----------
+    word_prons : iterable of tuple
+        Pairs of head words and their sets of pronunciations; e.g., the
+        ``items()`` of a mapping from words to pronunciations.
+
+    Returns
+    -------
+    stats : dict
+        JSON serializable dictionary with keys:
+
+        - n_words  --  number of words
+        - n_prons  --  number of pronunciations, summed over words
+        - n_unique_prons  --  number of distinct pronunciations
+        - n_phones  --  number of distinct phones
+        - prons_per_word  --  histogram of pronunciations per word
+        - pron_lengths  --  histogram of pronunciation lengths in phones
+        - phone_counts  --  phone unigram counts
+        - phone_bigram_counts  --  phone bigram counts, bigrams being
+          represented as space delimited strings
+        - n_homographs  --  number of words with multiple pronunciations
+        - n_homophones  --  number of distinct pronunciations shared by
+          multiple words
+        - n_homophone_words  --  number of words having a pronunciation
+          shared with another word
+    """
+    phone_to_code = utils.CodeTable()
+    get_code = phone_to_code.__getitem__
+    codes = array('l')
+    pron_lens = array('l')
+    n_word_prons = array('l')
+    pron_to_word = {}
+    set_word = pron_to_word.setdefault
+    homophones = set()
+    homophone_words = set()
+    with utils.gc_disabled():
+        for word, prons in word_prons:
+            n_word_prons.append(len(prons))
+            for pron in prons:
+                pron_lens.append(len(pron))
+                codes.extend(map(get_code, pron))
+                other_word = set_word(pron, word)
+                if other_word != word:
+                    homophones.add(pron)
+                    homophone_words.add(other_word)
+                    homophone_words.add(word)
+    codes = np.frombuffer(codes, dtype=np.dtype(codes.typecode))
+    pron_lens = np.frombuffer(pron_lens, dtype=codes.dtype)
+    n_word_prons = np.frombuffer(n_word_prons, dtype=codes.dtype)
+    phones = list(phone_to_code)
+    n_phones = len(phones)
+
+    # Phone unigrams.
+    unigram_counts = np.bincount(codes, minlength=n_phones)
+
+    # Phone bigrams. Exclude pairs spanning pronunciation boundaries.
+    is_within = np.ones(max(len(codes) - 1, 0), dtype=bool)
+    pron_ends = np.cumsum(pron_lens)[:-1]
+    pron_ends = pron_ends[(pron_ends > 0) & (pron_ends < len(codes))]
+    is_within[pron_ends - 1] = False
+    bigrams = codes[:-1][is_within]*n_phones + codes[1:][is_within]
+    if n_phones <= _MAX_DENSE_BIGRAM_PHONES:
+        bigram_counts = _histogram(
+            np.bincount(bigrams, minlength=n_phones*n_phones))
+    else:
+        vals, counts = np.unique(bigrams, return_counts=True)
+        bigram_counts = dict(zip(vals.tolist(), counts.tolist()))
+    bigram_counts = {
+        f'{phones[bigram // n_phones]} {phones[bigram % n_phones]}' : count
+        for bigram, count in bigram_counts.items()}
+
+    return {
+        'n_words' : len(n_word_prons),
+        'n_prons' : len(pron_lens),
+        'n_unique_prons' : len(pron_to_word),
+        'n_phones' : n_phones,
+        'prons_per_word' : _histogram(np.bincount(n_word_prons)),
+        'pron_lengths' : _histogram(np.bincount(pron_lens)),
+        'phone_counts' : {
+            phone : int(unigram_counts[code])
+            for phone, code in sorted(phone_to_code.items())},
+        'phone_bigram_counts' : dict(sorted(bigram_counts.items())),
+        'n_homographs' : int(np.count_nonzero(n_word_prons > 1)),
+        'n_homophones' : len(homophones),
+        'n_homophone_words' : len(homophone_words),
+        }
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from asrlex.arrays import HAS_PYARROW, LexiconArrays
+from asrlex.prondict import PronDict
+
+
+def _make_pdict():
+    pdict = PronDict({
+        'the' : {('dh', 'iy'), ('dh', 'ah')},
+        'a' : {('ey',), ('ah',)},
+        'watch' : {('w', 'aa', 'ch')},
+        })
+    return pdict
+
+
+def test_to_arrays():
+    pdict = _make_pdict()
+    arrays = pdict.to_arrays()
+    assert arrays.words == ['a', 'the', 'watch']
+    assert arrays.phones == ['aa', 'ah', 'ch', 'dh', 'ey', 'iy', 'w']
+    assert arrays.pron_word.tolist() == [0, 0, 1, 1, 2]
+    assert arrays.offsets.tolist() == [0, 1, 2, 4, 6, 9]
+    assert arrays.phone_codes.tolist() == [1, 4, 3, 1, 3, 5, 6, 0, 2]
+    assert arrays.get_pron(3) == ('dh', 'iy')
+    assert arrays.scores is None
+    assert arrays.tags is None
+    with pytest.raises(ValueError):
+        arrays.phone_codes[0] = 0
+
+    # Cached until modified.
+    assert pdict.to_arrays() is arrays
+    pdict.add_pron('an', ('ae', 'n'))
+    assert pdict.to_arrays() is not arrays
+    arrays = pdict.to_arrays()
+    pdict.set_score('an', ('ae', 'n'), 0.5)
+    assert pdict.to_arrays() is not arrays
+
+
+def test_from_arrays():
+    pdict = _make_pdict()
+    pdict.set_score('the', ('dh', 'iy'), 0.25)
+    pdict.set_tag('a', ('ey',), 'g2p')
+    arrays = pdict.to_arrays()
+    assert np.isnan(arrays.scores).sum() == 4
+    assert arrays.tags.tolist() == [-1, 0, -1, -1, -1]
+    pdict2 = PronDict.from_arrays(arrays)
+    assert pdict2 == pdict
+    assert pdict2.get_score('the', ('dh', 'iy')) == 0.25
+    assert pdict2.get_tag('a', ('ey',)) == 'g2p'
+    assert pdict2.to_arrays() is arrays
+
+
+@pytest.mark.skipif(not HAS_PYARROW, reason='pyarrow not installed')
+def test_parquet(tmp_path):
+    pdict = _make_pdict()
+    pdict.set_score('the', ('dh', 'iy'), 0.25)
+    pdict.set_tag('a', ('ey',), 'g2p')
+    arrays = pdict.to_arrays()
+    table = arrays.to_arrow()
+    assert table.column('word').to_pylist() == [
+        'a', 'a', 'the', 'the', 'watch']
+    assert table.column('phones').to_pylist()[2] == ['dh', 'ah']
+    assert LexiconArrays.from_arrow(table) == arrays
+    parquet_path = Path(tmp_path, 'lexicon.parquet')
+    arrays.write_parquet(parquet_path)
+    assert LexiconArrays.read_parquet(parquet_path) == arrays
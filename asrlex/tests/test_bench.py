@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from asrlex.bench import format_table, measure, run_battery
+
+
+PARENT_DIR = Path(__file__).parent
+REF_DICT_PATH = Path(PARENT_DIR, 'sample.dict')
+
+
+def test_measure():
+    result, usage = measure(sum, [1, 2, 3])
+    assert result == 6
+    assert usage['wall'] >= 0
+    assert usage['cpu'] >= 0
+    assert usage['peak_rss'] is None or usage['peak_rss'] > 0
+
+
+def test_run_battery():
+    results = list(run_battery([REF_DICT_PATH, REF_DICT_PATH]))
+    names = [result['name'] for result in results]
+    assert names == ['load sample.dict', 'load sample.dict', 'union', 'write',
+                     'lookup']
+    assert results[-1]['n_items'] == 3
+    results = list(run_battery([REF_DICT_PATH], words=['a', 'b']))
+    assert results[-1]['n_items'] == 2
+    table = format_table(results)
+    assert len(table.splitlines()) == len(results) + 1
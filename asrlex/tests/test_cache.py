@@ -0,0 +1,93 @@
+from multiprocessing import Pool
+import os
+from pathlib import Path
+
+import pytest
+
+from asrlex.cache import G2PCache
+
+
+PRONS = {
+    'the' : {('dh', 'ah') : 0.6, ('dh', 'iy') : 0.3},
+    'a_b' : {('ey', 'b', 'iy') : 1.0},
+    'xyzzy' : {},
+    }
+
+
+def _touch(path, data):
+    path.write_bytes(data)
+    # Ensure modification is visible even on filesystems with coarse
+    # timestamps.
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_get_put(tmp_path):
+    cache_path = Path(tmp_path, 'cache.db')
+    cache = G2PCache(cache_path, max_memory=2)
+    assert cache.get_many('m', 'p', PRONS) == {}
+    assert cache.stats.misses == 3
+    cache.put_many('m', 'p', PRONS)
+    assert len(cache) == 3
+    assert cache.get_many('m', 'p', PRONS) == PRONS
+    assert cache.stats.disk_hits + cache.stats.memory_hits == 3
+    assert len(cache._lru) == 2
+
+    # Other models and parameters are separate.
+    assert cache.get_many('m', 'q', ['the']) == {}
+    assert cache.get_many('n', 'p', ['the']) == {}
+
+    # Persistent across instances.
+    cache.close()
+    with G2PCache(cache_path) as cache:
+        assert cache.get_many('m', 'p', ['the', 'xyzzy', 'dog']) == {
+            'the' : PRONS['the'], 'xyzzy' : {}}
+        assert cache.stats.disk_hits == 2
+        assert cache.stats.misses == 1
+        assert cache.get_many('m', 'p', ['the']) == {'the' : PRONS['the']}
+        assert cache.stats.memory_hits == 1
+        assert cache.stats.hit_rate == 0.75
+        assert cache.stats.to_dict()['lookups'] == 4
+
+    with pytest.raises(ValueError):
+        G2PCache(cache_path, max_memory=-1)
+
+
+def test_model_digest(tmp_path):
+    model_path = Path(tmp_path, 'g2p.fst')
+    _touch(model_path, b'model 1')
+    cache = G2PCache(Path(tmp_path, 'cache.db'))
+    digest = cache.model_digest(model_path)
+    assert cache.model_digest(model_path) == digest
+    _touch(model_path, b'model 2')
+    new_digest = cache.model_digest(model_path)
+    assert new_digest != digest
+    _touch(model_path, b'model 1')
+    assert cache.model_digest(model_path) == digest
+
+    # Pruning.
+    cache.put_many(digest, 'p', PRONS)
+    cache.put_many(new_digest, 'p', {'the' : PRONS['the']})
+    assert cache.prune([new_digest]) == 3
+    assert cache.get_many(digest, 'p', PRONS) == {}
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
+
+
+def _put_worker(args):
+    cache_path, i = args
+    cache = G2PCache(cache_path, max_memory=0)
+    for j in range(20):
+        cache.put_many('m', 'p', {f'w{i}_{j}' : {('w',) : 1.0}})
+        cache.get_many('m', 'p', [f'w{i}_{k}' for k in range(j+1)])
+    return cache.stats.disk_hits
+
+
+def test_concurrent(tmp_path):
+    cache_path = Path(tmp_path, 'cache.db')
+    cache = G2PCache(cache_path)
+    with Pool(4) as pool:
+        hits = pool.map(_put_worker, [(cache_path, i) for i in range(8)])
+    assert hits == [210]*8
+    assert len(cache) == 160
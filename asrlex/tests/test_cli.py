@@ -0,0 +1,82 @@
+"""Tests for command line interface."""
+from argparse import Namespace
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from asrlex import cli
+from asrlex.prondict import PronDict
+
+
+def test_percentile():
+    assert cli._percentile([], 50) == 0.0
+    vals = list(range(1, 101))
+    assert cli._percentile(vals, 50) == 50
+    assert cli._percentile(vals, 95) == 95
+    assert cli._percentile(vals, 99) == 99
+    assert cli._percentile(vals, 100) == 100
+    assert cli._percentile(vals, 0) == 1
+    assert cli._percentile([3, 7], 50) == 3
+    assert cli._percentile([3, 7], 51) == 7
+
+
+def test_latency_summary():
+    latencies = {'a' : 0.001, 'b' : 0.004, 'c' : 0.002, 'd' : 0.003}
+    summary = cli._latency_summary(latencies, 1, 2.0, n_slowest=2)
+    assert summary['n_words'] == 4
+    assert summary['n_empty'] == 1
+    assert summary['elapsed'] == 2.0
+    assert summary['words_per_sec'] == 2.0
+    latency_ms = summary['latency_ms']
+    assert latency_ms['mean'] == pytest.approx(2.5)
+    assert latency_ms['p50'] == pytest.approx(2.0)
+    assert latency_ms['p95'] == pytest.approx(4.0)
+    assert latency_ms['max'] == pytest.approx(4.0)
+    assert [word for word, _ in summary['slowest']] == ['b', 'd']
+
+    # Empty input.
+    summary = cli._latency_summary({}, 0, 0.0)
+    assert summary['words_per_sec'] == 0.0
+    assert summary['latency_ms'] == {
+        'mean' : 0.0, 'p50' : 0.0, 'p95' : 0.0, 'p99' : 0.0, 'max' : 0.0}
+    assert summary['slowest'] == []
+
+
+def test_progress():
+    f = io.StringIO()
+    progress = cli._Progress(3, interval=0, file=f)
+    progress.update()
+    progress.update(2)
+    progress.close()
+    lines = f.getvalue().split('\r')[1:]
+    assert len(lines) == 2
+    assert lines[0].startswith('1/3 words | ')
+    assert lines[1].startswith('3/3 words | ')
+    assert lines[1].endswith('ETA 0s  \n')
+
+    # Updates within interval are skipped, except the last.
+    f = io.StringIO()
+    progress = cli._Progress(3, interval=3600, file=f)
+    for _ in range(3):
+        progress.update()
+    assert [line.split()[0] for line in f.getvalue().split('\r')[1:]] == [
+        '1/3', '3/3']
+
+
+def test_stats(tmp_path, capsys):
+    dict_path1 = Path(tmp_path, 'a.dict')
+    dict_path1.write_text('an ae n\nthe dh ah\n', encoding='utf-8')
+    dict_path2 = Path(tmp_path, 'b.dict')
+    dict_path2.write_text('the dh ah\nthe dh iy\nun ah n\n', encoding='utf-8')
+    args = Namespace(pdict=[dict_path1, dict_path2], memory=True,
+                     memory_sample=None, indent=None)
+    cli.stats(args)
+    stats = json.loads(capsys.readouterr().out)
+    pdict = PronDict.union(
+        PronDict.load_dict(dict_path1), PronDict.load_dict(dict_path2))
+    expected = pdict.stats()
+    assert stats.pop('memory')['total'] > 0
+    assert stats == json.loads(json.dumps(expected))
+    assert stats['n_prons'] == 4
@@ -0,0 +1,112 @@
+"""Tests for transcript/corpus processing."""
+from collections import Counter
+import json
+from pathlib import Path
+
+import pytest
+
+from asrlex import trace
+from asrlex.corpus import (OOVReport, _make_pool, count_oovs,
+                           lookup_transcript)
+from asrlex.normalize import Normalizer
+from asrlex.prondict import PronDict
+
+
+PDICT = PronDict({
+    'an' : {('ae', 'n'), ('ah', 'n')},
+    'the' : {('dh', 'ah'), ('dh', 'iy')},
+    'watch' : {('w', 'aa', 'ch')},
+    }, normalizer=Normalizer())
+LINES = [
+    'utt1 the watch\n',
+    'utt2 The zebra\n',
+    'utt3\n',
+    ]
+
+
+def test_lookup_transcript():
+    expected = [
+        ('utt1', ('dh', 'ah', 'w', 'aa', 'ch'), []),
+        ('utt2', ('dh', 'ah', 'OOV'), ['zebra']),
+        ('utt3', (), []),
+        ]
+    assert list(lookup_transcript(LINES, PDICT)) == expected
+    assert list(lookup_transcript(LINES, PDICT, chunk_size=2)) == expected
+
+    # Test without normalization.
+    results = list(lookup_transcript(LINES, PDICT, normalize=False))
+    assert results[1] == ('utt2', ('OOV', 'OOV'), ['The', 'zebra'])
+
+    # Test without utterance IDs.
+    results = list(lookup_transcript(['the an\n'], PDICT, has_utt_ids=False))
+    assert results == [(None, ('dh', 'ah', 'ae', 'n'), [])]
+
+    # Test argument checking.
+    with pytest.raises(ValueError):
+        list(lookup_transcript(LINES, PDICT, n_jobs=0))
+
+
+def test_lookup_transcript_parallel():
+    expected = list(lookup_transcript(LINES, PDICT))
+    actual = list(lookup_transcript(LINES, PDICT, n_jobs=2, chunk_size=1))
+    assert actual == expected
+
+
+def _traced_worker(i):
+    trace.incr('worker')
+    return trace.get_sink() is None
+
+
+def test_worker_tracing(tmpdir):
+    # Workers must not write to sinks inherited from the parent.
+    trace_path = Path(tmpdir, 'trace.jsonl')
+    with trace.sink_installed(trace.JSONLinesSink(trace_path)):
+        trace.incr('parent')
+        with _make_pool(2, PDICT) as pool:
+            assert all(pool.map(_traced_worker, range(4)))
+    events = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert [event['name'] for event in events] == ['parent']
+
+
+def test_oov_report():
+    report1 = OOVReport(Counter({'the' : 3}), Counter({'zebra' : 1}))
+    report2 = OOVReport(Counter({'an' : 1}), Counter({'zebra' : 2, 'ox' : 2}))
+    report = report1 + report2
+    assert report.n_tokens == 9
+    assert report.n_oov_tokens == 5
+    assert report.n_types == 4
+    assert report.n_oov_types == 2
+    assert report.token_oov_rate == 5 / 9
+    assert report.type_oov_rate == 0.5
+    assert report.most_common() == [('zebra', 3), ('ox', 2)]
+    assert report.most_common(1) == [('zebra', 3)]
+    assert OOVReport().token_oov_rate == 0.0
+
+
+def test_count_oovs(tmpdir):
+    text_path = Path(tmpdir, 'text.txt')
+    text_path.write_text(
+        'the zebra the\n'
+        'The ZEBRA an\n'
+        'watch ox zebra\n', encoding='utf-8')
+
+    # Test counts with and without normalization.
+    report = count_oovs([text_path], PDICT)
+    assert report.oov_counts == Counter({'zebra' : 2, 'ZEBRA' : 1, 'ox' : 1})
+    assert report.n_tokens == 9
+    report = count_oovs([text_path], PDICT, normalize=False)
+    assert report.oov_counts['The'] == 1
+
+    # Test utterance IDs are skipped.
+    report = count_oovs([text_path], PDICT, has_utt_ids=True)
+    assert report.n_tokens == 6
+
+    # Test sharding and parallel processing do not affect counts.
+    expected_report = count_oovs([text_path], PDICT)
+    for shard_size in [1, 5, 14, 1000]:
+        report = count_oovs(
+            [text_path, text_path], PDICT, n_jobs=2, shard_size=shard_size)
+        assert report.iv_counts == expected_report.iv_counts + \
+            expected_report.iv_counts
+        assert report.oov_counts == expected_report.oov_counts + \
+            expected_report.oov_counts
@@ -0,0 +1,97 @@
+from pathlib import Path
+import random
+
+import pytest
+
+from asrlex.extsort import SortedDictWriter, sort_dict_file
+from asrlex.prondict import PronDict
+
+
+def _make_pdict(n_words, seed=0):
+    rng = random.Random(seed)
+    pdict = PronDict()
+    for i in range(n_words):
+        for _ in range(rng.randint(1, 3)):
+            pron = tuple(rng.choices(['aa', 'b', 'k', 'iy'], k=3))
+            pdict.add_pron(f'w{rng.randint(0, 10*n_words)}', pron)
+    return pdict
+
+
+def test_sorted_dict_writer(tmp_path):
+    pdict = _make_pdict(500)
+    ref_path = Path(tmp_path, 'ref.dict')
+    pdict.write_dict(ref_path)
+    entries = [(word, pron) for word in pdict for pron in pdict[word]]
+    random.Random(1).shuffle(entries)
+    entries += entries[:100] # Duplicates.
+
+    # Fits in memory.
+    dict_path = Path(tmp_path, 'test.dict')
+    with SortedDictWriter(dict_path) as writer:
+        writer.add_entries(entries)
+    assert writer.n_runs == 0
+    assert dict_path.read_text() == ref_path.read_text()
+
+    # Spilled to many runs, merged in multiple passes.
+    with SortedDictWriter(dict_path, memory_budget=5000,
+                          max_fan_in=4) as writer:
+        writer.add_entries(entries)
+        assert writer.n_runs > 4
+    assert dict_path.read_text() == ref_path.read_text()
+    with pytest.raises(ValueError):
+        writer.add('a', ('b',))
+
+    # No output on error.
+    dict_path.unlink()
+    with pytest.raises(KeyError):
+        with SortedDictWriter(dict_path, memory_budget=5000) as writer:
+            writer.add_entries(entries)
+            raise KeyError
+    assert not dict_path.exists()
+
+
+def test_sorted_dict_writer_scores(tmp_path):
+    dict_path = Path(tmp_path, 'test.dict')
+    with SortedDictWriter(dict_path, memory_budget=1,
+                          lexiconp=True) as writer:
+        writer.add('the', ('dh', 'iy'), 0.25)
+        writer.add('the', ('dh', 'ah'))
+        writer.add('the', ('dh', 'iy'), 0.5)
+    assert dict_path.read_text() == (
+        'the\t1\tdh ah\n'
+        'the\t0.5\tdh iy\n')
+
+
+def test_sort_dict_file(tmp_path):
+    pdict = _make_pdict(500)
+    ref_path = Path(tmp_path, 'ref.dict')
+    pdict.write_dict(ref_path)
+    src_path = Path(tmp_path, 'src.dict')
+    lines = ref_path.read_text().splitlines(keepends=True)
+    random.Random(1).shuffle(lines)
+    src_path.write_text(''.join(lines))
+    dict_path = Path(tmp_path, 'test.dict')
+    sort_dict_file(src_path, dict_path, memory_budget=10000)
+    assert dict_path.read_text() == ref_path.read_text()
+
+
+def test_sort_dict_file_duplicate_scores(tmp_path):
+    # Duplicate entries keep their last score, as for ``load_dict``, even
+    # when they are spilled to different runs.
+    src_path = Path(tmp_path, 'src.dict')
+    src_path.write_text(
+        'the\t0.25\tdh iy\n'
+        'an\t1\tae n\n'
+        'the\t0.5\tdh ah\n'
+        'the\t0.125\tdh iy\n'
+        'an\t0.75\tae n\n')
+    ref_path = Path(tmp_path, 'ref.dict')
+    PronDict.load_dict(src_path, lexiconp=True).write_dict(
+        ref_path, lexiconp=True)
+    for memory_budget in [1, 2**28]:
+        dict_path = Path(tmp_path, 'test.dict')
+        sort_dict_file(src_path, dict_path, memory_budget, lexiconp=True)
+        assert dict_path.read_text() == ref_path.read_text()
+        assert 'the\t0.125\tdh iy\n' in dict_path.read_text()
+    sort_dict_file(src_path, dict_path, lexiconp=True, score_merge='max')
+    assert 'the\t0.25\tdh iy\n' in dict_path.read_text()
@@ -1,9 +1,12 @@
 """Tests for G2P training/application."""
 # -*- coding: utf-8 -*-
 from pathlib import Path
+import subprocess
+import sys
 
 import pytest
 
+from asrlex import g2p
 from asrlex.g2p import remap_reserved_symbols, restore_reserved_symbols, G2P
 from asrlex.prondict import PronDict
 
@@ -62,3 +65,74 @@ def test_g2p_get_prons():
     expected_prons = {('dh', 'ah'), ('dh', 'iy')}
     actual_prons = model.get_prons('the')
     assert actual_prons == expected_prons
+
+
+def test_g2p_get_prons_batch():
+    model = G2P(REF_MODEL_PATH)
+    words = ['the', 'a_b', 'cat', 'the']
+    decoded = []
+    word_to_prons = model.get_prons_batch(
+        words, with_scores=True,
+        callback=lambda word, prons, latency: decoded.append(word))
+    assert list(word_to_prons) == ['the', 'a_b', 'cat']
+    assert decoded == ['the', 'a_b', 'cat']
+    for word, prons in word_to_prons.items():
+        assert prons == model.get_prons(word, with_scores=True)
+    word_to_prons = model.get_prons_batch(words)
+    assert word_to_prons['the'] == {('dh', 'ah'), ('dh', 'iy')}
+
+
+def test_g2p_iter_prons():
+    model = G2P(REF_MODEL_PATH)
+    words = ['the', 'a_b', 'cat', 'the', 'abracadabra']
+    expected = model.get_prons_batch(words, with_scores=True)
+    for n_jobs in [1, 2]:
+        word_to_prons = {}
+        for word, prons, latency in model.iter_prons(
+                words, with_scores=True, n_jobs=n_jobs, chunk_size=2):
+            assert word not in word_to_prons
+            assert latency >= 0
+            word_to_prons[word] = prons
+        assert word_to_prons == expected
+    with pytest.raises(ValueError):
+        list(model.iter_prons(words, n_jobs=0))
+
+
+def test_plan_chunks():
+    words = ['b', 'ccc', 'a', 'dd', 'eee']
+    assert g2p._plan_chunks(words, 1, 256) == [
+        ['ccc', 'eee'], ['dd', 'a'], ['b']]
+    assert g2p._plan_chunks(words, 1, 2) == [
+        ['ccc', 'eee'], ['dd', 'a'], ['b']]
+    assert g2p._plan_chunks(words, 4, 256) == [
+        ['ccc'], ['eee'], ['dd'], ['a'], ['b']]
+    assert g2p._plan_chunks([], 4, 256) == []
+
+
+def test_lazy_import():
+    # Importing the package or dictionaries must not load the G2P bindings.
+    code = ('import sys, asrlex.prondict; '
+            'assert "asrlex.g2p" not in sys.modules; '
+            'assert "wurlitzer" not in sys.modules; '
+            'from asrlex import PronDict, G2P; '
+            'assert "asrlex.g2p" in sys.modules')
+    subprocess.run([sys.executable, '-c', code], check=True)
+    assert isinstance(g2p.HAS_PHONETISAURUS_BIN, bool)
+    assert isinstance(g2p.HAS_MITLM_BIN, bool)
+    with pytest.raises(AttributeError):
+        g2p.HAS_NOTHING
+
+
+def test_g2p_cache(tmpdir):
+    cache_path = Path(tmpdir, 'cache.db')
+    model = G2P(REF_MODEL_PATH, cache=cache_path)
+    expected = G2P(REF_MODEL_PATH).get_prons_batch(
+        ['the', 'a_b'], with_scores=True)
+    assert model.get_prons_batch(['the', 'a_b'], with_scores=True) == expected
+    assert model.cache.stats.misses == 2
+    model = G2P(REF_MODEL_PATH, cache=cache_path)
+    assert model.get_prons('the', with_scores=True) == expected['the']
+    assert model.get_prons('the') == set(expected['the'])
+    assert model.cache.stats.hits == 2
+    results = model.iter_prons(['the', 'a_b'], with_scores=True, n_jobs=2)
+    assert {word : prons for word, prons, _ in results} == expected
@@ -0,0 +1,179 @@
+import pickle
+import random
+
+import pytest
+
+from asrlex.indexes import (DerivedIndex, NormalizedKeyIndex, PhoneCountIndex,
+                            ReverseIndex, WordChange)
+from asrlex.prondict import PronDict
+
+
+def _make_pdict():
+    return PronDict({
+        'the' : {('dh', 'iy'), ('dh', 'ah')},
+        'a' : {('ey',), ('ah',)},
+        'cat' : {('k', 'ae', 't')},
+        })
+
+
+def test_word_change():
+    change = WordChange('the', frozenset({('dh', 'iy'), ('dh', 'ah')}),
+                        frozenset({('dh', 'ah'), ('dh', 'ax')}))
+    assert change.added_prons == {('dh', 'ax')}
+    assert change.removed_prons == {('dh', 'iy')}
+    change = WordChange('the', None, frozenset({('dh', 'ah')}))
+    assert change.added_prons == {('dh', 'ah')}
+    assert change.removed_prons == set()
+
+
+def test_subscribe():
+    pdict = _make_pdict()
+    notifications = []
+    callback = lambda pdict, changes: notifications.append(
+        sorted(changes))
+    pdict.subscribe(callback)
+
+    # add_pron
+    pdict.add_pron('the', ('dh', 'ax'))
+    pdict.add_pron('dog', ('d', 'ao', 'g'))
+    assert notifications == [
+        [('the', frozenset({('dh', 'iy'), ('dh', 'ah')}),
+          frozenset({('dh', 'iy'), ('dh', 'ah'), ('dh', 'ax')}))],
+        [('dog', None, frozenset({('d', 'ao', 'g')}))],
+        ]
+
+    # No-op changes are not notified.
+    notifications.clear()
+    pdict.add_pron('dog', ('d', 'ao', 'g'))
+    assert notifications == []
+
+    # Item assignment and deletion.
+    pdict['dog'] = [('d', 'aa', 'g')]
+    del pdict['dog']
+    assert notifications == [
+        [('dog', frozenset({('d', 'ao', 'g')}), {('d', 'aa', 'g')})],
+        [('dog', frozenset({('d', 'aa', 'g')}), None)],
+        ]
+
+    # Bulk operations produce a single notification.
+    notifications.clear()
+    pdict.prune(remove=['a', 'cat', 'zebra'])
+    assert notifications == [[
+        ('a', frozenset({('ey',), ('ah',)}), None),
+        ('cat', frozenset({('k', 'ae', 't')}), None),
+        ]]
+    notifications.clear()
+    pdict.update({'a' : {('ah',)}, 'cat' : {('k', 'ae', 't')}})
+    assert len(notifications) == 1
+    assert len(notifications[0]) == 2
+    notifications.clear()
+    pdict.apply(lambda pron: pron + ('#',), inplace=True)
+    assert len(notifications) == 1
+    assert len(notifications[0]) == 3
+    notifications.clear()
+    pdict.prune_by_counts({'the' : 2, 'cat' : 1}, max_words=1)
+    assert notifications == [[
+        ('a', frozenset({('ah', '#')}), None),
+        ('cat', frozenset({('k', 'ae', 't', '#')}), None),
+        ]]
+
+    # Batches are notified once, on exit of the outermost batch.
+    notifications.clear()
+    with pdict.batch():
+        pdict.add_pron('dog', ('d', 'ao', 'g'))
+        with pdict.batch():
+            pdict.add_pron('dog', ('d', 'aa', 'g'))
+            pdict.add_pron('cat', ('k', 'ae', 't'))
+            del pdict['cat']
+        assert notifications == []
+    assert notifications == [[
+        ('dog', None, frozenset({('d', 'ao', 'g'), ('d', 'aa', 'g')}))]]
+
+    # Copies do not inherit subscribers, nor are they pickled.
+    notifications.clear()
+    pdict.apply(lambda pron: pron)
+    assert notifications == []
+    pdict2 = pickle.loads(pickle.dumps(pdict))
+    pdict2.add_pron('cat', ('k', 'ae', 't'))
+    assert notifications == []
+    pdict.unsubscribe(callback)
+    pdict.add_pron('cat', ('k', 'ae', 't'))
+    assert notifications == []
+
+
+def test_derived_indexes():
+    pdict = _make_pdict()
+    pdict.normalizer = str.lower
+    reverse_index = ReverseIndex()
+    pdict.register_index('reverse', reverse_index)
+    phone_counts = PhoneCountIndex()
+    pdict.register_index('phone_counts', phone_counts)
+    assert pdict.get_index('reverse') is reverse_index
+    with pytest.raises(ValueError):
+        pdict.register_index('reverse', ReverseIndex())
+    assert reverse_index.get_words(('dh', 'ah')) == ('the',)
+    assert phone_counts.counts['dh'] == 2
+    assert phone_counts.phones == pdict.phones
+
+    # Registered indexes are accounted for by name.
+    usage = pdict.memory_usage()
+    assert usage['reverse_index'] == reverse_index.memory_usage() > 0
+    assert usage['phone_counts_index'] == phone_counts.memory_usage() > 0
+    assert usage['normalized_index'] == \
+        pdict.get_index('normalized').memory_usage()
+
+    # Random modifications, checking against indexes built from scratch.
+    rng = random.Random(0)
+    phones = ['aa', 'b', 'k', 'dh', 'ah']
+    words = ['the', 'The', 'THE', 'a', 'A', 'cat', 'dog']
+    def random_pron():
+        return tuple(rng.choices(phones, k=rng.randint(1, 3)))
+    for _ in range(200):
+        word = rng.choice(words)
+        op = rng.randrange(4)
+        if op == 0:
+            pdict.add_pron(word, random_pron())
+        elif op == 1:
+            pdict[word] = [random_pron() for _ in range(rng.randint(1, 2))]
+        elif op == 2 and word in pdict:
+            del pdict[word]
+        else:
+            with pdict.batch():
+                pdict.add_pron(word, random_pron())
+                pdict.prune(remove=[rng.choice(words)])
+        expected = ReverseIndex()
+        expected.build(pdict)
+        assert reverse_index.pron_to_words == expected.pron_to_words
+        expected = PhoneCountIndex()
+        expected.build(pdict)
+        assert phone_counts.counts == expected.counts
+        expected = NormalizedKeyIndex(str.lower)
+        expected.build(pdict)
+        assert pdict.get_index('normalized').key_to_words == \
+            expected.key_to_words
+
+    # Indexes are pickled.
+    pdict2 = pickle.loads(pickle.dumps(pdict))
+    pdict2.add_pron('zebra', ('z', 'iy', 'b', 'r', 'ah'))
+    assert pdict2.get_index('phone_counts').counts['z'] == 1
+    assert pdict2.lookup('ZEBRA') == {('z', 'iy', 'b', 'r', 'ah')}
+
+    # Unregistered indexes are no longer updated.
+    assert pdict.unregister_index('reverse') is reverse_index
+    pdict.add_pron('zebra', ('z', 'iy', 'b', 'r', 'ah'))
+    assert reverse_index.get_words(('z', 'iy', 'b', 'r', 'ah')) == ()
+    assert phone_counts.counts['z'] == 1
+
+
+def test_derived_index_default_update():
+    class WordCount(DerivedIndex):
+        def build(self, pdict):
+            self.n_words = len(pdict)
+    pdict = _make_pdict()
+    index = WordCount()
+    pdict.register_index('word_count', index)
+    assert index.n_words == 3
+    pdict.add_pron('dog', ('d', 'ao', 'g'))
+    assert index.n_words == 4
+    assert pdict.memory_usage()['word_count_index'] == \
+        index.memory_usage() > 0
@@ -0,0 +1,123 @@
+"""Tests for lazily loaded pronunciation dictionaries."""
+import os
+from pathlib import Path
+import pickle
+import shutil
+
+import pytest
+
+from asrlex.lazy import LazyPronDict
+from asrlex.prondict import PronDict
+
+
+TEST_DIR = Path(__file__).parent
+SAMPLE_DICT_PATH = Path(TEST_DIR, 'sample.dict')
+
+
+@pytest.fixture
+def dict_path(tmpdir):
+    dict_path = Path(tmpdir, 'sample.dict')
+    shutil.copy(SAMPLE_DICT_PATH, dict_path)
+    return dict_path
+
+
+def test_lazy_getitem(dict_path):
+    pdict = LazyPronDict(dict_path)
+    assert pdict._word_to_prons == {}
+    assert pdict['the'] == {('dh', 'ah'), ('dh', 'iy')}
+    assert list(pdict._word_to_prons) == ['the']
+    assert 'watch' in pdict
+    assert 'zebra' not in pdict
+    assert pdict['zebra'] == {pdict.oov_pron}
+
+    # Test full vocabulary is loaded on demand.
+    assert pdict.words == ['an', 'the', 'watch']
+    assert pdict == PronDict.load_dict(SAMPLE_DICT_PATH)
+
+
+def test_lazy_mutation(dict_path):
+    pdict = LazyPronDict(dict_path)
+    pdict['the'] = {('dh', 'ax')}
+    pdict.add_pron('an', ('ax', 'n'))
+    del pdict['watch']
+    assert pdict['the'] == {('dh', 'ax')}
+    assert pdict['an'] == {('ae', 'n'), ('ah', 'n'), ('ax', 'n')}
+    assert pdict.words == ['an', 'the']
+    with pytest.raises(KeyError):
+        del pdict['watch']
+
+
+def test_lazy_subscribe(dict_path):
+    # Pronunciations parsed from file are not notified as changes.
+    pdict = LazyPronDict(dict_path)
+    notifications = []
+    pdict.subscribe(lambda pdict, changes: notifications.append(changes))
+    assert pdict._all_loaded
+    assert pdict['the'] == {('dh', 'ah'), ('dh', 'iy')}
+    assert notifications == []
+    pdict.add_pron('the', ('dh', 'ax'))
+    assert [change.word for change in notifications[0]] == ['the']
+
+
+def test_lazy_sidecar(dict_path):
+    index_path = Path(f'{dict_path}.idx')
+    LazyPronDict(dict_path)
+    assert index_path.exists()
+
+    # Test index is reused.
+    mtime_ns = index_path.stat().st_mtime_ns
+    assert LazyPronDict(dict_path)['an'] == {('ae', 'n'), ('ah', 'n')}
+    assert index_path.stat().st_mtime_ns == mtime_ns
+
+    # Test stale index is rebuilt.
+    with open(dict_path, 'a', encoding='utf-8') as f:
+        f.write('zebra\tz iy b r ah\n')
+    assert LazyPronDict(dict_path)['zebra'] == {('z', 'iy', 'b', 'r', 'ah')}
+
+    # Test corrupt index is rebuilt, whether empty, truncated within the
+    # header, offset tables, or keys, or extended.
+    data = index_path.read_bytes()
+    for corrupt in [b'', data[:20], data[:48], data[:60], data[:70],
+                    data[:-1], data + b'x']:
+        index_path.write_bytes(corrupt)
+        pdict = LazyPronDict(dict_path)
+        assert pdict['an'] == {('ae', 'n'), ('ah', 'n')}
+        assert pdict['zebra'] == {('z', 'iy', 'b', 'r', 'ah')}
+        assert index_path.read_bytes() == data
+
+    # Test no sidecar is written when caching disabled.
+    os.remove(index_path)
+    LazyPronDict(dict_path, cache_index=False)
+    assert not index_path.exists()
+
+
+def test_lazy_formats(tmpdir):
+    dict_path = Path(tmpdir, 'lexiconp.txt')
+    dict_path.write_text(
+        ';;; comment\n'
+        'the the 0.5 dh ah\n'
+        'an an 1.0 ae n\n'
+        'the the 1.0 dh iy\n', encoding='utf-8')
+    pdict = PronDict.load_dict(
+        dict_path, align_lexicon=True, lexiconp=True, lazy=True)
+    assert isinstance(pdict, LazyPronDict)
+    assert pdict['the'] == {('dh', 'ah'), ('dh', 'iy')}
+    assert pdict.get_score('the', ('dh', 'ah')) == 0.5
+    assert pdict == PronDict.load_dict(
+        dict_path, align_lexicon=True, lexiconp=True)
+
+
+def test_lazy_unicode_whitespace(tmpdir):
+    dict_path = Path(tmpdir, 'unicode.dict')
+    dict_path.write_text('été\u00a0e t e\nthe dh ah\n', encoding='utf-8')
+    pdict = LazyPronDict(dict_path)
+    assert pdict['été'] == {('e', 't', 'e')}
+    assert pdict.words == ['the', 'été']
+
+
+def test_lazy_pickle(dict_path):
+    pdict = LazyPronDict(dict_path)
+    pdict['the'] = {('dh', 'ax')}
+    pdict2 = pickle.loads(pickle.dumps(pdict))
+    assert pdict2['the'] == {('dh', 'ax')}
+    assert pdict2['an'] == {('ae', 'n'), ('ah', 'n')}
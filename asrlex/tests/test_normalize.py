@@ -0,0 +1,32 @@
+"""Tests for head word normalization."""
+import pickle
+
+import pytest
+
+from asrlex.normalize import Normalizer
+
+
+def test_normalizer():
+    # Test default normalization.
+    normalizer = Normalizer()
+    assert normalizer('The') == 'the'
+    assert normalizer('don’t') == 'dont'
+    assert normalizer('Ｔhe') == 'the' # Fullwidth "T".
+    assert normalizer('café') == normalizer('café')
+
+    # Test individual steps may be disabled.
+    assert Normalizer(case_fold=False)('The') == 'The'
+    assert Normalizer(strip_punct=False)("don't") == "don't"
+    assert Normalizer(form=None)('Ｔhe') == 'ｔhe'
+
+    # Test invalid normalization form.
+    with pytest.raises(ValueError):
+        Normalizer(form='NFX')
+
+
+def test_normalizer_pickle():
+    normalizer = Normalizer(strip_punct=False)
+    normalizer('The')
+    normalizer2 = pickle.loads(pickle.dumps(normalizer))
+    assert normalizer2 == normalizer
+    assert normalizer2._cache == {}
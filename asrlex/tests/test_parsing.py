@@ -0,0 +1,79 @@
+"""Tests for pronunciation dictionary parsing."""
+import io
+from pathlib import Path
+
+from asrlex.parsing import DictParser, _split_fields, iter_line_blocks
+
+
+TEST_DIR = Path(__file__).parent
+SAMPLE_DICT_PATH = Path(TEST_DIR, 'sample.dict')
+
+
+def test_iter_line_blocks():
+    data = b'a 1\nbb 2 3\n\nccc 4\nd'
+    for block_size in [1, 3, 7, 100]:
+        lines = []
+        for block in iter_line_blocks(io.BytesIO(data), block_size):
+            lines.extend(block)
+        assert lines == [b'a 1', b'bb 2 3', b'', b'ccc 4', b'd']
+
+
+def test_dict_parser():
+    parser = DictParser()
+    parser.parse_lines([
+        b';;; comment line',
+        b'the dh ah',
+        b'the  dh iy\r',
+        b'',
+        b'headword-only',
+        'été e t e'.encode('utf-8'),
+        ])
+    assert parser.word_to_prons == {
+        'the' : {('dh', 'ah'), ('dh', 'iy')},
+        'été' : {('e', 't', 'e')},
+        }
+
+    # Test phones are shared between pronunciations.
+    prons = sorted(parser.word_to_prons['the'])
+    assert prons[0][0] is prons[1][0]
+
+
+def test_dict_parser_unicode_whitespace():
+    # Fields are split on Unicode whitespace, as by ``str.split``.
+    lines = ['the\u00a0dh ah', 'été\u2003e t\u00a0e', 'naïve n aa iy v']
+    parser = DictParser()
+    parser.parse_lines([line.encode('utf-8') for line in lines])
+    assert parser.word_to_prons == {
+        'the' : {('dh', 'ah')},
+        'été' : {('e', 't', 'e')},
+        'naïve' : {('n', 'aa', 'iy', 'v')},
+        }
+    parser = DictParser(lexiconp=True, keep=['été'])
+    parser.parse_lines([b'\xc3\xa9t\xc3\xa9\xc2\xa00.5 e t e'])
+    assert parser.scores == {('été', ('e', 't', 'e')) : 0.5}
+
+    # Test all non-ASCII whitespace is recognized, but not other characters
+    # sharing encoded prefixes with it.
+    for char in map(chr, range(128, 0x3001)):
+        line = f'w{char}x p'.encode('utf-8')
+        assert _split_fields(line) == [
+            field.encode('utf-8') for field in f'w{char}x p'.split()]
+
+
+def test_dict_parser_formats():
+    parser = DictParser(align_lexicon=True, lexiconp=True)
+    parser.parse_lines([b'the the 0.5 dh ah', b'an an 1.0', b'an an 1.0 ae n'])
+    assert parser.word_to_prons == {
+        'the' : {('dh', 'ah')},
+        'an' : {('ae', 'n')},
+        }
+    assert parser.scores == {
+        ('the', ('dh', 'ah')) : 0.5,
+        ('an', ('ae', 'n')) : 1.0,
+        }
+
+
+def test_dict_parser_parse_file():
+    parser = DictParser(phones=['dh', 'ah', 'iy'], remove=['an'])
+    parser.parse_file(SAMPLE_DICT_PATH)
+    assert parser.word_to_prons == {'the' : {('dh', 'ah'), ('dh', 'iy')}}
@@ -1,10 +1,12 @@
 """Tests for pronunciation dictionaries."""
+import io
 from pathlib import Path
 import shutil
 import tempfile
 
 import pytest
 
+from asrlex.normalize import Normalizer
 from asrlex.prondict import PronDict
 
 
@@ -131,6 +133,138 @@ def test_apply():
     assert pdict == expected_pdict
 
 
+def test_lookup():
+    pdict = PronDict({
+        'the' : {('dh', 'ah')},
+        'US' : {('y', 'uw', 'eh', 's')},
+        'us' : {('ah', 's')},
+        })
+
+    # Test exact lookup without normalizer.
+    assert pdict.lookup('the') == {('dh', 'ah')}
+    assert pdict.lookup('The') == {pdict.oov_pron}
+    assert pdict.find_words('The') == ()
+
+    # Test lookup through normalized keys.
+    pdict.normalizer = Normalizer()
+    assert pdict.find_words('The') == ('the',)
+    assert pdict.lookup('The') == {('dh', 'ah')}
+    assert pdict.lookup('us') == {('ah', 's')}
+    assert pdict.lookup('Us') == {('ah', 's'), ('y', 'uw', 'eh', 's')}
+    assert pdict.lookup('"the"') == {('dh', 'ah')}
+
+    # Test index is maintained incrementally.
+    pdict.add_pron('Watch', ('w', 'aa', 'ch'))
+    assert pdict.lookup('WATCH') == {('w', 'aa', 'ch')}
+    del pdict['the']
+    assert pdict.lookup('The') == {pdict.oov_pron}
+    pdict.prune(remove=['US'])
+    assert pdict.find_words('Us') == ('us',)
+
+    # Test normalizer is preserved by copies.
+    assert pdict.copy().lookup('WATCH') == {('w', 'aa', 'ch')}
+    assert (pdict | PronDict()).lookup('WATCH') == {('w', 'aa', 'ch')}
+
+
+def test_lookup_many():
+    pdict = PronDict({
+        'an' : {('ae', 'n'), ('ah', 'n')},
+        'the' : {('dh', 'ah'), ('dh', 'iy')},
+        }, normalizer=Normalizer())
+    assert pdict.prons == (
+        ('ae', 'n'), ('ah', 'n'), ('dh', 'ah'), ('dh', 'iy'))
+    pron_ids, offsets, oov_mask = pdict.lookup_many(
+        ['the', 'The', 'cat', 'an', 'the'])
+    assert pron_ids.tolist() == [2, 3, 2, 3, 0, 1, 2, 3]
+    assert offsets.tolist() == [0, 2, 4, 4, 6, 8]
+    assert oov_mask.tolist() == [False, False, True, False, False]
+
+    # Test without normalization.
+    pron_ids, offsets, oov_mask = pdict.lookup_many(
+        ['the', 'The'], normalize=False)
+    assert pron_ids.tolist() == [2, 3]
+    assert offsets.tolist() == [0, 2, 2]
+    assert oov_mask.tolist() == [False, True]
+
+    # Test empty and entirely out-of-vocabulary input.
+    for tokens in [[], ['cat', 'cat']]:
+        pron_ids, offsets, oov_mask = pdict.lookup_many(tokens)
+        assert len(pron_ids) == 0
+        assert offsets.tolist() == [0]*(len(tokens) + 1)
+        assert oov_mask.all()
+
+    # Test pronunciation IDs are updated after modification.
+    pdict.add_pron('a', ('ah',))
+    pron_ids, offsets, _ = pdict.lookup_many(['a', 'the'])
+    assert pron_ids.tolist() == [1, 3, 4]
+    assert offsets.tolist() == [0, 1, 3]
+
+
+def test_scores():
+    pdict = PronDict({'w1' : {('p1', 'p2'), ('p2', 'p3')}})
+    assert not pdict.has_columns
+    assert pdict.get_score('w1', ('p1', 'p2')) is None
+
+    # Test setting scores and tags.
+    pdict.set_score('w1', ('p1', 'p2'), 0.8)
+    pdict.set_tag('w1', ('p1', 'p2'), 'g2p')
+    pdict.add_pron('w2', ('p3',), score=0.5, tag='ref')
+    assert pdict.has_columns
+    assert pdict.get_score('w1', ('p1', 'p2')) == 0.8
+    assert pdict.get_score('w1', ('p2', 'p3'), 0.0) == 0.0
+    assert pdict.get_scores('w1') == {('p1', 'p2') : 0.8}
+    assert pdict.get_tag('w1', ('p1', 'p2')) == 'g2p'
+    assert pdict.get_tag('w2', ('p3',)) == 'ref'
+    with pytest.raises(KeyError):
+        pdict.set_score('w1', ('p9',), 1.0)
+
+    # Test columns follow removal of pronunciations.
+    pdict['w1'] = {('p2', 'p3')}
+    pdict['w1'] = {('p1', 'p2'), ('p2', 'p3')}
+    assert pdict.get_score('w1', ('p1', 'p2')) is None
+    del pdict['w2']
+    pdict.add_pron('w2', ('p3',))
+    assert pdict.get_tag('w2', ('p3',)) is None
+
+    # Test columns are preserved by copy and apply.
+    pdict.set_score('w1', ('p1', 'p2'), 0.8)
+    assert pdict.copy().get_score('w1', ('p1', 'p2')) == 0.8
+    to_upper = lambda x: (p.upper() for p in x)
+    assert pdict.apply(to_upper).get_score('w1', ('P1', 'P2')) == 0.8
+
+
+def test_score_merge():
+    pdict1 = PronDict({'w1' : {('p1',), ('p2',)}})
+    pdict1.set_score('w1', ('p1',), 0.2)
+    pdict1.set_tag('w1', ('p1',), 'a')
+    pdict2 = PronDict({'w1' : {('p1',)}})
+    pdict2.set_score('w1', ('p1',), 0.6)
+    pdict2.set_tag('w1', ('p1',), 'b')
+    pdict2.add_pron('w2', ('p3',), score=0.1)
+
+    # Test union.
+    pdict = pdict1 | pdict2
+    assert pdict.get_score('w1', ('p1',)) == 0.6
+    assert pdict.get_tag('w1', ('p1',)) == 'a'
+    assert pdict.get_score('w2', ('p3',)) == 0.1
+    pdict = pdict1.union(pdict2, score_merge='sum')
+    assert pdict.get_score('w1', ('p1',)) == pytest.approx(0.8)
+    pdict = pdict1.union(pdict2, score_merge='first')
+    assert pdict.get_score('w1', ('p1',)) == 0.2
+    with pytest.raises(ValueError):
+        pdict1.union(pdict2, score_merge='median')
+
+    # Test intersection.
+    pdict = pdict1 & pdict2
+    assert pdict.get_score('w1', ('p1',)) == 0.2
+    pdict = pdict1.intersection(pdict2, score_merge='max')
+    assert pdict.get_score('w1', ('p1',)) == 0.6
+
+    # Test difference.
+    pdict = pdict1 - PronDict({'w1' : {('p2',)}})
+    assert pdict.get_score('w1', ('p1',)) == 0.2
+
+
 def test_phones():
     pdict = PronDict({'w1' : {('p1', 'p2'), ('p2', 'p3')}})
     assert pdict.phones == ['p1', 'p2', 'p3']
@@ -147,6 +281,36 @@ def test_load_dict():
     assert PronDict.load_dict(SAMPLE_DICT_PATH) == pdict_expected
 
 
+def test_load_dict_filters():
+    # Test keep/remove.
+    pdict = PronDict.load_dict(SAMPLE_DICT_PATH, keep=['the', 'zebra'])
+    assert pdict.words == ['the']
+    pdict = PronDict.load_dict(SAMPLE_DICT_PATH, remove=['the'])
+    assert pdict.words == ['an', 'watch']
+    pdict = PronDict.load_dict(
+        SAMPLE_DICT_PATH, keep=['the', 'an'], remove=['an'])
+    assert pdict.words == ['the']
+
+    # Test phone whitelist.
+    pdict = PronDict.load_dict(
+        SAMPLE_DICT_PATH, phones=['ae', 'ah', 'n', 'dh'])
+    assert pdict == PronDict({
+        'an' : {('ae', 'n'), ('ah', 'n')},
+        'the' : {('dh', 'ah')},
+        })
+
+    # Test predicate.
+    pdict = PronDict.load_dict(
+        SAMPLE_DICT_PATH, predicate=lambda word, pron: len(pron) > 2)
+    assert pdict == PronDict({
+        'watch' : {('w', 'aa', 'ch'), ('w', 'ao', 'ch')},
+        })
+
+    # Test filters not supported for lazy loading.
+    with pytest.raises(ValueError):
+        PronDict.load_dict(SAMPLE_DICT_PATH, lazy=True, keep=['the'])
+
+
 def test_write_dict(tmpdir):
     tmp_dict_path = Path(tmpdir, 'test_write.dict')
     pdict = PronDict({
@@ -158,6 +322,108 @@ def test_write_dict(tmpdir):
     assert SAMPLE_DICT_PATH.read_text() == tmp_dict_path.read_text()
 
 
+def test_lexiconp(tmpdir):
+    tmp_dict_path = Path(tmpdir, 'lexiconp.txt')
+    pdict = PronDict({
+        'the' : {('dh', 'ah'), ('dh', 'iy')},
+        'watch' : {('w', 'aa', 'ch')},
+        })
+    pdict.set_score('the', ('dh', 'ah'), 1.0)
+    pdict.set_score('the', ('dh', 'iy'), 0.25)
+    pdict.write_dict(tmp_dict_path, lexiconp=True)
+    assert tmp_dict_path.read_text() == (
+        'the\t1\tdh ah\n'
+        'the\t0.25\tdh iy\n'
+        'watch\t1\tw aa ch\n')
+    pdict2 = PronDict.load_dict(tmp_dict_path, lexiconp=True)
+    assert pdict2 == pdict
+    assert pdict2.get_score('the', ('dh', 'iy')) == 0.25
+    assert pdict2.get_score('watch', ('w', 'aa', 'ch')) == 1.0
+
+
+def test_lexiconp_precision(tmpdir):
+    tmp_dict_path = Path(tmpdir, 'lexiconp.txt')
+    scores = [0.123456789, 1/3, 1e-300, 2.5e16, 1.0]
+    pdict = PronDict({f'w{i}' : {('p',)} for i in range(len(scores))})
+    for i, score in enumerate(scores):
+        pdict.set_score(f'w{i}', ('p',), score)
+    pdict.write_dict(tmp_dict_path, lexiconp=True)
+    pdict2 = PronDict.load_dict(tmp_dict_path, lexiconp=True)
+    for i, score in enumerate(scores):
+        assert pdict2.get_score(f'w{i}', ('p',)) == score
+
+
+def test_print_dict_tags():
+    pdict = PronDict({'the' : {('dh', 'ah'), ('dh', 'iy')}})
+    pdict.set_tag('the', ('dh', 'iy'), 'g2p')
+    f = io.StringIO()
+    pdict.print_dict(file=f, tags=True)
+    assert f.getvalue() == 'the\tdh ah\t-\nthe\tdh iy\tg2p\n'
+
+
+def test_memory_usage():
+    pdict = PronDict({
+        'the' : {('dh', 'ah'), ('dh', 'iy')},
+        'a' : {('ah',), ('ey',)},
+        })
+    usage = pdict.memory_usage()
+    assert usage['total'] == sum(
+        size for component, size in usage.items() if component != 'total')
+    assert usage['words'] > 0
+    assert usage['phones'] > 0
+    assert usage['pron_table'] == 0
+    assert usage['columns'] == 0
+    assert not any(component.endswith('_index') for component in usage)
+
+    # Shallow accounting excludes strings.
+    shallow_usage = pdict.memory_usage(deep=False)
+    assert shallow_usage['words'] == shallow_usage['phones'] == 0
+    assert shallow_usage['prons'] == usage['prons']
+
+    # Indexes are accounted for once built.
+    pdict.prons
+    pdict.set_score('the', ('dh', 'ah'), 0.5)
+    usage = pdict.memory_usage()
+    assert usage['pron_table'] > 0
+    assert usage['columns'] > 0
+
+    # Sampling-based estimate is exact for dictionaries of uniform words.
+    pdict = PronDict({f'w{i}' : {('p1', f'p{i}')} for i in range(100)})
+    usage = pdict.memory_usage(deep=False)
+    assert pdict.memory_usage(deep=False, sample=10) == usage
+    with pytest.raises(ValueError):
+        pdict.memory_usage(sample=0)
+
+
+def test_prune_by_counts():
+    pdict = PronDict({
+        'a' : {('ah',), ('ey',), ('aa',)},
+        'the' : {('dh', 'ah'), ('dh', 'iy')},
+        'cat' : {('k', 'ae', 't')},
+        'dog' : {('d', 'ao', 'g')},
+        })
+    counts = {'the' : 10, 'a' : 5, 'cat' : 2, 'dog' : 2}
+
+    # Top-k with ties broken lexicographically.
+    pdict1 = pdict.copy()
+    pdict1.prune_by_counts(counts, max_words=3)
+    assert pdict1.words == ['a', 'cat', 'the']
+    pdict1 = pdict.copy()
+    pdict1.prune_by_counts(counts, min_count=3, max_prons_per_word=1)
+    assert pdict1 == PronDict({'a' : {('aa',)}, 'the' : {('dh', 'ah')}})
+
+    # Scores take precedence when selecting pronunciations.
+    pdict1 = pdict.copy()
+    pdict1.set_score('a', ('ey',), 0.5)
+    pdict1.set_score('a', ('ah',), 0.25)
+    pdict1.prune_by_counts(counts, max_prons_per_word=2)
+    assert pdict1['a'] == {('ey',), ('ah',)}
+    assert pdict1.get_score('a', ('aa',)) is None
+    assert pdict1['the'] == pdict['the']
+    with pytest.raises(ValueError):
+        pdict1.prune_by_counts(counts, max_prons_per_word=0)
+
+
 def test_or():
     expected_pdict = PronDict({
         'w1' : {('p1', 'p2')},
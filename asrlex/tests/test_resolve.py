@@ -0,0 +1,64 @@
+"""Tests for hybrid lexicon/G2P resolution."""
+from pathlib import Path
+
+from asrlex.g2p import G2P
+from asrlex.normalize import Normalizer
+from asrlex.prondict import PronDict
+from asrlex.resolve import HybridResolver
+
+
+TEST_DIR = Path(__file__).parent
+REF_MODEL_PATH = Path(TEST_DIR, 'g2p.fst')
+
+
+def _make_lexicon():
+    lexicon = PronDict({
+        'the' : {('dh', 'ah'), ('dh', 'iy')},
+        'The' : {('dh', 'iy')},
+        'cat' : {('k', 'ae', 't')},
+        }, normalizer=Normalizer())
+    lexicon.set_score('the', ('dh', 'iy'), 0.25)
+    lexicon.set_score('The', ('dh', 'iy'), 0.5)
+    return lexicon
+
+
+def test_resolve_lexicon():
+    resolver = HybridResolver(_make_lexicon())
+    resolved = []
+    pdict, report = resolver.resolve(
+        ['CAT', 'the', 'dog', 'the'],
+        callback=lambda word, source, latency: resolved.append(
+            (word, source)))
+    assert resolved == [('CAT', 'lexicon'), ('the', 'lexicon'), ('dog', None)]
+    assert pdict.words == ['CAT', 'the']
+    assert pdict['CAT'] == {('k', 'ae', 't')}
+    assert pdict['the'] == {('dh', 'ah'), ('dh', 'iy')}
+    assert pdict.get_tag('CAT', ('k', 'ae', 't')) == 'lexicon'
+    assert pdict.get_score('the', ('dh', 'iy')) == 0.25
+    assert report.to_dict() == {
+        'n_words' : 3, 'n_lexicon' : 2, 'n_normalized' : 1, 'n_g2p' : 0,
+        'n_unresolved' : 1}
+
+    # Normalized keys take union over matching head words, with maximum
+    # score.
+    pdict, report = resolver.resolve(['THE'])
+    assert pdict['THE'] == {('dh', 'ah'), ('dh', 'iy')}
+    assert pdict.get_score('THE', ('dh', 'iy')) == 0.5
+
+    resolver = HybridResolver(_make_lexicon(), normalize=False)
+    pdict, report = resolver.resolve(['CAT', 'the'])
+    assert pdict.words == ['the']
+    assert report.n_unresolved == 1
+
+
+def test_resolve_g2p():
+    model = G2P(REF_MODEL_PATH)
+    resolver = HybridResolver(_make_lexicon(), model)
+    pdict, report = resolver.resolve(['the', 'cat', 'watch', 'watch'])
+    assert report.n_lexicon == 2
+    assert report.n_g2p == 1
+    expected = model.get_prons('watch', with_scores=True)
+    assert pdict['watch'] == set(expected)
+    for pron, score in expected.items():
+        assert pdict.get_tag('watch', pron) == 'g2p'
+        assert pdict.get_score('watch', pron) == score
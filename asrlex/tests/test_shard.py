@@ -0,0 +1,116 @@
+"""Tests for sharded pronunciation dictionaries."""
+from pathlib import Path
+
+import pytest
+
+from asrlex.prondict import PronDict
+from asrlex.shard import (ShardedPronDict, load_merged, merge_dict_files,
+                          shard_of, split_dict)
+
+
+TEST_DIR = Path(__file__).parent
+SAMPLE_DICT_PATH = Path(TEST_DIR, 'sample.dict')
+PDICT = PronDict({
+    'an' : {('ae', 'n'), ('ah', 'n')},
+    'the' : {('dh', 'ah'), ('dh', 'iy')},
+    'watch' : {('w', 'aa', 'ch'), ('w', 'ao', 'ch')},
+    'zebra' : {('z', 'iy', 'b', 'r', 'ah')},
+    'a' : {('ah',), ('ey',)},
+    })
+
+
+def test_shard_of():
+    # Routing must be stable across processes and Python versions.
+    assert shard_of('the', 4) == 2
+    assert shard_of('the'.encode('utf-8'), 4) == 2
+    assert all(0 <= shard_of(word, 3) < 3 for word in PDICT)
+
+
+def test_sharded_pron_dict():
+    with pytest.raises(ValueError):
+        ShardedPronDict(0)
+    spdict = ShardedPronDict.from_pron_dict(PDICT, 3)
+    assert len(spdict) == len(PDICT)
+    assert spdict.words == PDICT.words
+    assert spdict['the'] == PDICT['the']
+    assert 'the' in spdict.shards[spdict.shard_of('the')]
+    assert sum('the' in shard for shard in spdict.shards) == 1
+    assert spdict.to_pron_dict() == PDICT
+
+    # Test routing of new pronunciations.
+    spdict.add_pron('ox', ('aa', 'k', 's'))
+    assert spdict['ox'] == {('aa', 'k', 's')}
+
+
+def test_sharded_set_operations():
+    spdict1 = ShardedPronDict.from_pron_dict(PDICT, 3)
+    pdict2 = PronDict({'the' : {('dh', 'ah')}, 'ox' : {('aa', 'k', 's')}})
+    spdict2 = ShardedPronDict.from_pron_dict(pdict2, 3)
+    assert (spdict1 | spdict2).to_pron_dict() == PDICT | pdict2
+    assert (spdict1 & spdict2).to_pron_dict() == PDICT & pdict2
+    assert (spdict1 - spdict2).to_pron_dict() == PDICT - pdict2
+    with pytest.raises(ValueError):
+        spdict1 | ShardedPronDict.from_pron_dict(pdict2, 2)
+
+
+def test_write_load_shards(tmpdir):
+    spdict = ShardedPronDict.from_pron_dict(PDICT, 3)
+    paths = spdict.write_shards(tmpdir)
+    assert [path.name for path in paths] == [
+        'shard-00000-of-00003.dict',
+        'shard-00001-of-00003.dict',
+        'shard-00002-of-00003.dict',
+        ]
+    assert ShardedPronDict.load_shards(tmpdir) == spdict
+    assert load_merged(paths) == PDICT
+
+    # Test missing shards are detected.
+    paths[1].unlink()
+    with pytest.raises(ValueError):
+        ShardedPronDict.load_shards(tmpdir)
+
+
+def test_split_merge(tmpdir):
+    dict_path = Path(tmpdir, 'lexicon.dict')
+    PDICT.write_dict(dict_path)
+    paths = split_dict(dict_path, Path(tmpdir, 'split'), 3)
+    assert load_merged(paths) == PDICT
+
+    # Test merging of sorted shard files, with a duplicate entry.
+    sorted_paths = ShardedPronDict.load_shards(
+        Path(tmpdir, 'split')).write_shards(Path(tmpdir, 'sorted'))
+    sorted_paths.append(SAMPLE_DICT_PATH)
+    merged_path = Path(tmpdir, 'merged.dict')
+    merge_dict_files(sorted_paths, merged_path)
+    assert merged_path.read_text() == dict_path.read_text()
+
+
+def test_split_unicode_whitespace(tmpdir):
+    # Lines are routed by head words split as by the parser.
+    dict_path = Path(tmpdir, 'lexicon.dict')
+    dict_path.write_text(
+        ''.join(f'w{i}\u00a0p{i} x\n' for i in range(20)), encoding='utf-8')
+    paths = split_dict(dict_path, Path(tmpdir, 'split'), 3)
+    spdict = ShardedPronDict.load_shards(Path(tmpdir, 'split'))
+    for index, shard in enumerate(spdict.shards):
+        assert all(shard_of(word, 3) == index for word in shard)
+    assert load_merged(paths) == PronDict.load_dict(dict_path)
+
+
+def test_split_merge_lexiconp(tmpdir):
+    # Scores survive sharding, writing, and merging.
+    pdict = PDICT.copy()
+    for i, word in enumerate(pdict.words):
+        for j, pron in enumerate(sorted(pdict[word])):
+            pdict.set_score(word, pron, 0.5 / (i + j + 1))
+    pdict.set_tag('the', ('dh', 'iy'), 'g2p')
+    spdict = ShardedPronDict.from_pron_dict(pdict, 3)
+    assert spdict.get_shard('the').get_score('the', ('dh', 'ah')) == \
+        pdict.get_score('the', ('dh', 'ah'))
+    assert spdict.get_shard('the').get_tag('the', ('dh', 'iy')) == 'g2p'
+    paths = spdict.write_shards(Path(tmpdir, 'shards'), lexiconp=True)
+    merged_path = Path(tmpdir, 'merged.dict')
+    merge_dict_files(paths, merged_path, lexiconp=True)
+    dict_path = Path(tmpdir, 'lexiconp.dict')
+    pdict.write_dict(dict_path, lexiconp=True)
+    assert merged_path.read_text() == dict_path.read_text()
@@ -0,0 +1,38 @@
+"""Tests for lexicon statistics."""
+import json
+
+from asrlex.prondict import PronDict
+from asrlex.stats import lexicon_stats
+
+
+def test_lexicon_stats():
+    pdict = PronDict({
+        'an' : {('ae', 'n'), ('ah', 'n')},
+        'un' : {('ah', 'n')},
+        'the' : {('dh', 'ah'), ('dh', 'iy')},
+        'watch' : {('w', 'aa', 'ch')},
+        })
+    stats = pdict.stats()
+    assert stats['n_words'] == 4
+    assert stats['n_prons'] == 6
+    assert stats['n_unique_prons'] == 5
+    assert stats['n_phones'] == 8
+    assert stats['prons_per_word'] == {1 : 2, 2 : 2}
+    assert stats['pron_lengths'] == {2 : 5, 3 : 1}
+    assert stats['phone_counts'] == {
+        'aa' : 1, 'ae' : 1, 'ah' : 3, 'ch' : 1, 'dh' : 2, 'iy' : 1, 'n' : 3,
+        'w' : 1}
+    assert stats['phone_bigram_counts'] == {
+        'aa ch' : 1, 'ae n' : 1, 'ah n' : 2, 'dh ah' : 1, 'dh iy' : 1,
+        'w aa' : 1}
+    assert stats['n_homographs'] == 2
+    assert stats['n_homophones'] == 1
+    assert stats['n_homophone_words'] == 2
+    json.dumps(stats)
+
+
+def test_lexicon_stats_empty():
+    stats = lexicon_stats({}.items())
+    assert stats['n_words'] == 0
+    assert stats['phone_counts'] == {}
+    assert stats['phone_bigram_counts'] == {}
@@ -0,0 +1,84 @@
+import io
+import json
+
+import pytest
+
+from asrlex import trace
+from asrlex.prondict import PronDict
+
+
+class ListSink(trace.Sink):
+    def __init__(self):
+        self.events = []
+
+    def record(self, event):
+        self.events.append(event)
+
+
+def test_disabled():
+    assert trace.get_sink() is None
+    with trace.span('a') as sp:
+        assert sp is None
+    trace.incr('b')
+
+
+def test_span():
+    sink = ListSink()
+    with trace.sink_installed(sink):
+        with trace.span('outer', x=1):
+            with trace.span('inner'):
+                pass
+            trace.incr('n', 2)
+        with pytest.raises(KeyError):
+            with trace.span('failed'):
+                raise KeyError
+    assert trace.get_sink() is None
+    inner, counter, outer, failed = sink.events
+    assert inner['name'] == 'inner'
+    assert inner['parent'] == 'outer'
+    assert outer['parent'] is None
+    assert outer['attrs'] == {'x' : 1}
+    assert outer['duration'] >= inner['duration'] >= 0
+    assert counter['type'] == 'counter'
+    assert counter['value'] == 2
+    assert failed['error'] == 'KeyError'
+
+
+def test_traced():
+    @trace.traced('f')
+    def f(x):
+        return 2*x
+    assert f(1) == 2
+    sink = ListSink()
+    with trace.sink_installed(sink):
+        assert f(2) == 4
+    assert [event['name'] for event in sink.events] == ['f']
+
+
+def test_prondict_spans():
+    sink = ListSink()
+    pdict1 = PronDict({'w1' : {('p1', 'p2')}})
+    pdict2 = PronDict({'w2' : {('p2', 'p3')}})
+    with trace.sink_installed(sink):
+        PronDict.union(pdict1, pdict2)
+    names = {event['name'] for event in sink.events}
+    assert 'PronDict.union' in names
+    assert 'PronDict.update' in names
+
+
+def test_sinks():
+    f = io.StringIO()
+    summary = trace.SummarySink()
+    with trace.sink_installed(
+            trace.MultiSink(trace.JSONLinesSink(f), summary)):
+        for _ in range(3):
+            with trace.span('a'):
+                trace.incr('n')
+    events = [json.loads(line) for line in f.getvalue().splitlines()]
+    assert len(events) == 6
+    assert summary.spans['a'][0] == 3
+    assert summary.counters == {'n' : 3}
+    table = summary.format_table()
+    assert table.splitlines()[0].split() == [
+        'span', 'count', 'total(s)', 'mean(s)', 'max(s)']
+    assert 'counter' in table
@@ -0,0 +1,151 @@
+import os
+from pathlib import Path
+import random
+import time
+
+import pytest
+
+from asrlex.prondict import PronDict
+from asrlex.watch import DictWatcher
+
+
+def _write(dict_path, lines):
+    dict_path.write_text(''.join(line + '\n' for line in lines))
+    # Ensure modification is visible even on filesystems with coarse
+    # timestamps.
+    stat = os.stat(dict_path)
+    os.utime(dict_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def _check(watcher, dict_path, **kwargs):
+    expected = PronDict.load_dict(dict_path, **kwargs)
+    assert watcher.pdict == expected
+    for word in expected:
+        for pron in expected[word]:
+            assert (watcher.pdict.get_score(word, pron) ==
+                    expected.get_score(word, pron))
+
+
+def _make_lines(n, seed):
+    rng = random.Random(seed)
+    return [f'w{rng.randrange(1000)}\t{rng.randrange(100)} '
+            f'p{rng.randrange(10)} p{rng.randrange(10)}'
+            for _ in range(n)]
+
+
+@pytest.mark.parametrize('lexiconp', [False, True])
+def test_dict_watcher(tmp_path, lexiconp):
+    dict_path = Path(tmp_path, 'test.dict')
+    lines = _make_lines(2000, seed=0)
+    if not lexiconp:
+        lines = [line.replace('\t', ' ') for line in lines]
+    _write(dict_path, lines)
+    reloads = []
+    watcher = DictWatcher(
+        dict_path, block_size=256, lexiconp=lexiconp,
+        on_reload=lambda pdict, info: reloads.append(info))
+    assert reloads[-1]['full']
+    _check(watcher, dict_path, lexiconp=lexiconp)
+
+    # Unchanged contents.
+    old_pdict = watcher.pdict
+    _write(dict_path, lines)
+    assert not watcher.check()
+    assert watcher.pdict is old_pdict
+
+    # Append.
+    lines += lines[:10]
+    _write(dict_path, lines)
+    assert watcher.check()
+    assert not reloads[-1]['full']
+    assert reloads[-1]['n_bytes_parsed'] < 512
+    _check(watcher, dict_path, lexiconp=lexiconp)
+    assert watcher.pdict is not old_pdict
+
+    # Edits.
+    rng = random.Random(1)
+    for _ in range(20):
+        bi = rng.randrange(len(lines))
+        ei = bi + rng.randrange(5)
+        lines[bi:ei] = _make_lines(rng.randrange(5), seed=rng.random())
+        _write(dict_path, lines)
+        assert watcher.check()
+        assert not reloads[-1]['full']
+        _check(watcher, dict_path, lexiconp=lexiconp)
+
+    # Rewrite.
+    lines = _make_lines(1000, seed=2)
+    _write(dict_path, lines)
+    assert watcher.check()
+    assert reloads[-1]['full']
+    _check(watcher, dict_path, lexiconp=lexiconp)
+
+
+def test_dict_watcher_normalizer(tmp_path):
+    dict_path = Path(tmp_path, 'test.dict')
+    lines = _make_lines(100, seed=0)
+    _write(dict_path, ['The dh ah', 'cat k ae t'] + lines)
+    watcher = DictWatcher(
+        dict_path, block_size=1, normalizer=str.lower)
+    old_pdict = watcher.pdict
+    _write(dict_path, ['The dh ah', 'dog d ao g', 'THE dh iy'] + lines)
+    assert watcher.check()
+    assert not watcher.last_reload['full']
+    assert watcher.pdict.lookup('the') == {('dh', 'ah'), ('dh', 'iy')}
+    assert watcher.pdict.lookup('cat') == {('OOV',)}
+    assert old_pdict.lookup('the') == {('dh', 'ah')}
+    assert old_pdict.lookup('cat') == {('k', 'ae', 't')}
+
+
+
+def test_dict_watcher_malformed(tmp_path):
+    dict_path = Path(tmp_path, 'test.dict')
+    lines = _make_lines(200, seed=0)
+    _write(dict_path, lines)
+    watcher = DictWatcher(dict_path, block_size=256, lexiconp=True)
+    old_pdict = watcher.pdict
+    old_scores = {(word, pron) : old_pdict.get_score(word, pron)
+                  for word in old_pdict for pron in old_pdict[word]}
+
+    # Invalid UTF-8 and invalid scores keep the current dictionary, and
+    # are retried at every poll until fixed.
+    for bad_line in [b'caf\xe9\t1 k ae f', b'cat\tNOPE k ae t']:
+        data = ''.join(line + '\n' for line in lines).encode('utf-8')
+        dict_path.write_bytes(data + bad_line + b'\n')
+        stat = os.stat(dict_path)
+        os.utime(dict_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        for _ in range(2):
+            assert not watcher.check()
+            assert isinstance(watcher.last_error, ValueError)
+            assert watcher.pdict is old_pdict
+    lines.append('cat\t0.5 k ae t')
+    _write(dict_path, lines)
+    assert watcher.check()
+    assert watcher.last_error is None
+    assert not watcher.last_reload['full']
+    _check(watcher, dict_path, lexiconp=True)
+
+    # Incremental reloads do not modify the scores of the old dictionary.
+    assert old_scores == {(word, pron) : old_pdict.get_score(word, pron)
+                          for word in old_pdict for pron in old_pdict[word]}
+
+def test_dict_watcher_thread(tmp_path):
+    dict_path = Path(tmp_path, 'test.dict')
+    _write(dict_path, ['the dh ah'])
+    with DictWatcher(dict_path, interval=0.01) as watcher:
+        _write(dict_path, ['the dh ah', 'cat k ae t'])
+        for _ in range(500):
+            if 'cat' in watcher.pdict:
+                break
+            time.sleep(0.01)
+        assert 'cat' in watcher.pdict
+
+        # Missing file keeps current dictionary.
+        dict_path.unlink()
+        time.sleep(0.05)
+        assert 'cat' in watcher.pdict
+        assert isinstance(watcher.last_error, OSError)
+    assert watcher._thread is None
+
+    with pytest.raises(OSError):
+        DictWatcher(dict_path)
@@ -0,0 +1,281 @@
+"""Lightweight tracing of timing spans and counters.
+
+Instrumented code opens spans around operations and increments counters:
+
+    >>> with trace.span('load_dict', path=str(dict_path)):
+    ...     ...
+    >>> trace.incr('g2p.words')
+
+Events are delivered to a sink installed by ``set_sink``. No sink is
+installed by default, in which case ``span`` returns a shared no-op context
+manager and ``incr`` returns immediately, so instrumentation costs a global
+lookup and a function call.
+
+    >>> summary = SummarySink()
+    >>> with sink_installed(MultiSink(JSONLinesSink('trace.jsonl'), summary)):
+    ...     pdict = PronDict.load_dict('cmu.dict')
+    >>> print(summary.format_table())
+"""
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+import functools
+import threading
+import time
+
+__all__ = ['JSONLinesSink', 'MultiSink', 'Sink', 'SummarySink', 'get_sink',
+           'incr', 'set_sink', 'sink_installed', 'span', 'traced']
+
+
+# Currently installed sink. None if tracing is disabled.
+_SINK = None
+
+# Shared no-op span returned when tracing is disabled.
+_NULL_SPAN = nullcontext()
+
+# Per-thread stack of names of open spans.
+_STACK = threading.local()
+
+
+class Sink:
+    """Base class for trace sinks.
+
+    Subclasses implement ``record``, which is called once per event. Events
+    are dicts with keys:
+
+    - type  --  either "span" or "counter"
+    - name  --  name of span or counter
+    - ts  --  wall-clock time of event in seconds since the epoch; for spans,
+      the time the span was opened
+    - duration  --  duration of span in seconds; spans only
+    - parent  --  name of enclosing span, if any; spans only
+    - value  --  increment of counter; counters only
+    - attrs  --  attributes passed when opening span or incrementing counter
+    """
+    def record(self, event):
+        """Record event."""
+        raise NotImplementedError
+
+    def close(self):
+        """Flush and release any resources held by sink."""
+        pass
+
+
+class JSONLinesSink(Sink):
+    """Sink writing events to a file as JSON lines.
+
+    Parameters
+    ----------
+    f : Path or file object
+        Output path or text file object. If a path, the file is opened on
+        construction and closed by ``close``.
+    """
+    def __init__(self, f):
+        self._owns_file = not hasattr(f, 'write')
+        if self._owns_file:
+            f = open(f, 'w', encoding='utf-8')
+        self.f = f
+        self._lock = threading.Lock()
+
+    def record(self, event):
+        # Imported here, as tracing is usually disabled.
+        import json
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            self.f.write(line + '\n')
+
+    def close(self):
+        if self._owns_file:
+            self.f.close()
+        else:
+            self.f.flush()
+
+
+class SummarySink(Sink):
+    """Sink aggregating events into per-name totals.
+
+    Attributes
+    ----------
+    spans : dict
+        Mapping from span names to lists ``[count, total, max]`` of the
+        number of times each span was closed and their total and maximum
+        durations in seconds.
+
+    counters : dict
+        Mapping from counter names to totals.
+    """
+    def __init__(self):
+        self.spans = defaultdict(lambda: [0, 0.0, 0.0])
+        self.counters = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, event):
+        with self._lock:
+            if event['type'] == 'span':
+                totals = self.spans[event['name']]
+                totals[0] += 1
+                totals[1] += event['duration']
+                totals[2] = max(totals[2], event['duration'])
+            else:
+                self.counters[event['name']] += event['value']
+
+    def format_table(self):
+        """Return summary as a plain text table.
+
+        Spans are listed in descending order of total duration, followed by
+        counters in lexicographic order.
+        """
+        lines = []
+        if self.spans:
+            width = max(len(name) for name in self.spans)
+            width = max(width, len('span'))
+            lines.append(f'{"span":<{width}}  {"count":>8}  {"total(s)":>10}  '
+                         f'{"mean(s)":>10}  {"max(s)":>10}')
+            for name, (count, total, max_) in sorted(
+                    self.spans.items(), key=lambda x: (-x[1][1], x[0])):
+                lines.append(f'{name:<{width}}  {count:>8d}  {total:>10.4f}  '
+                             f'{total/count:>10.4f}  {max_:>10.4f}')
+        if self.counters:
+            if lines:
+                lines.append('')
+            width = max(len(name) for name in self.counters)
+            width = max(width, len('counter'))
+            lines.append(f'{"counter":<{width}}  {"value":>12}')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{name:<{width}}  {value:>12}')
+        return '\n'.join(lines)
+
+
+class MultiSink(Sink):
+    """Sink forwarding events to several sinks."""
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def record(self, event):
+        for sink in self.sinks:
+            sink.record(event)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def get_sink():
+    """Return installed sink, or None if tracing is disabled."""
+    return _SINK
+
+
+def set_sink(sink):
+    """Install sink, returning previously installed sink.
+
+    Pass None to disable tracing. The sink is global to the process. Worker
+    processes forked by ``asrlex`` would inherit it, together with any file
+    it holds and its unflushed buffer, so they disable tracing on startup;
+    their events are not recorded.
+    """
+    global _SINK
+    prev_sink = _SINK
+    _SINK = sink
+    return prev_sink
+
+
+@contextmanager
+def sink_installed(sink):
+    """Context manager installing ``sink`` for its duration.
+
+    On exit, the previous sink is restored and ``sink`` is closed.
+    """
+    prev_sink = set_sink(sink)
+    try:
+        yield sink
+    finally:
+        set_sink(prev_sink)
+        sink.close()
+
+
+class _Span:
+    """Context manager timing a span and recording it on exit."""
+    __slots__ = ['sink', 'name', 'attrs', 'ts', 'start', 'parent']
+
+    def __init__(self, sink, name, attrs):
+        self.sink = sink
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        stack = _get_stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self.name)
+        self.ts = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        duration = time.perf_counter() - self.start
+        _get_stack().pop()
+        event = {'type' : 'span', 'name' : self.name, 'ts' : self.ts,
+                 'duration' : duration, 'parent' : self.parent,
+                 'attrs' : self.attrs}
+        if exc_type is not None:
+            event['error'] = exc_type.__name__
+        self.sink.record(event)
+        return False
+
+
+def _get_stack():
+    try:
+        return _STACK.stack
+    except AttributeError:
+        stack = _STACK.stack = []
+        return stack
+
+
+def span(name, **attrs):
+    """Return context manager timing a span.
+
+    Parameters
+    ----------
+    name : str
+        Name of span.
+
+    attrs : dict
+        JSON serializable attributes of span.
+    """
+    sink = _SINK
+    if sink is None:
+        return _NULL_SPAN
+    return _Span(sink, name, attrs)
+
+
+def incr(name, value=1, **attrs):
+    """Increment counter.
+
+    Parameters
+    ----------
+    name : str
+        Name of counter.
+
+    value : int, optional
+        Increment.
+        (Default: 1)
+
+    attrs : dict
+        JSON serializable attributes of increment.
+    """
+    sink = _SINK
+    if sink is None:
+        return
+    sink.record({'type' : 'counter', 'name' : name, 'ts' : time.time(),
+                 'value' : value, 'attrs' : attrs})
+
+
+def traced(name):
+    """Decorator wrapping each call of a function in a span ``name``."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _SINK is None:
+                return func(*args, **kwargs)
+            with _Span(_SINK, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,9 +1,39 @@
 """Utility functions."""
+from contextlib import contextmanager
+import gc
 from numbers import Integral
 import os
 from pathlib import Path
 
-__all__ = ['validate_integer_arg', 'validate_ranged_arg', 'which', 'xor']
+__all__ = ['CodeTable', 'gc_disabled', 'validate_integer_arg',
+           'validate_ranged_arg', 'which', 'xor']
+
+
+class CodeTable(dict):
+    """Mapping from symbols to integer codes, assigned on first lookup.
+
+    Codes are assigned consecutively from 0 in order of first lookup, so
+    ``map(table.__getitem__, symbols)`` encodes a sequence without a Python
+    level branch per symbol.
+    """
+    def __missing__(self, key):
+        code = self[key] = len(self)
+        return code
+
+
+@contextmanager
+def gc_disabled():
+    """Context manager disabling cyclic garbage collection.
+
+    On exit, garbage collection is restored to its previous state.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
 
 
 def validate_integer_arg(x, name, min_val=None, max_val=None):
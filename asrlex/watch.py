@@ -0,0 +1,449 @@
+"""Reloading of pronunciation dictionaries as their files change."""
+from array import array
+from collections import defaultdict
+import hashlib
+import os
+from pathlib import Path
+import threading
+import time
+
+from . import trace
+from . import utils
+from .indexes import WordChange
+from .parsing import DictParser
+from .prondict import PronDict
+
+__all__ = ['DictWatcher']
+
+
+# Default size in bytes of blocks into which files are divided.
+BLOCK_SIZE = 2**20
+
+
+class _Block:
+    """Line-aligned region of dictionary file and the entries parsed from it.
+
+    ``start`` and ``end`` are byte offsets. ``word_to_prons`` and ``scores``
+    are as for ``DictParser``.
+    """
+    __slots__ = ['start', 'end', 'digest', 'word_to_prons', 'scores']
+
+    def __init__(self, start, end, digest, word_to_prons, scores):
+        self.start = start
+        self.end = end
+        self.digest = digest
+        self.word_to_prons = word_to_prons
+        self.scores = scores
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _copy_columns(src, dst):
+    """Copy score and tag columns of one dictionary to another."""
+    dst._entry_rows = dict(src._entry_rows)
+    dst._scores = array('d', src._scores)
+    dst._tags = array('l', src._tags)
+    dst._tag_names = list(src._tag_names)
+    dst._tag_codes = dict(src._tag_codes)
+    dst._free_rows = list(src._free_rows)
+
+
+class DictWatcher:
+    """Pronunciation dictionary that is reloaded when its file changes.
+
+    The dictionary is loaded on construction and available as ``pdict``.
+    Once ``start`` is called, a background thread polls the size and
+    modification time of the file every ``interval`` seconds and reloads it
+    when either changes. Alternately, call ``check`` to poll from your own
+    loop:
+
+        >>> with DictWatcher('cmu.dict', interval=5) as watcher:
+        ...     for word in words:
+        ...         prons = watcher.pdict[word]
+
+    Reloads are incremental where possible. The file is divided into
+    line-aligned blocks of approximately ``block_size`` bytes, each of which
+    is checksummed and parsed separately. On change, blocks at the beginning
+    and end of the file whose contents are unchanged are kept, and only the
+    region between them is re-parsed; only words occurring in that region
+    are updated. Thus, appending to the file or editing a single region of
+    it costs parsing time proportional to the size of the edit rather than
+    of the file. The new dictionary still starts from shallow copies of the
+    mappings of the current one (and of its score columns and normalized-key
+    index), which are linear in the size of the dictionary but made without
+    visiting entries in Python, and so cost a small fraction of a full
+    reload. If more than ``max_changed_fraction`` of the file changed, it is
+    reloaded in full.
+
+    Either way, a new ``PronDict`` is built alongside the current one and
+    swapped in by a single attribute assignment, so lookups already in
+    progress on the previous dictionary are unaffected. Callers should
+    therefore fetch ``pdict`` once per unit of work, rather than holding on
+    to it. Dictionaries share pronunciation sets with each other and with
+    the watcher, and so must not be modified.
+
+    If the file is missing, unreadable, or changes while being read, the
+    current dictionary is kept, the error is stored in ``last_error``, and
+    the reload is retried at the next poll.
+
+    Parameters
+    ----------
+    dict_path : Path
+        Path to pronunciation dictionary.
+
+    interval : float, optional
+        Seconds between polls of the file by the background thread.
+        (Default: 1.0)
+
+    block_size : int, optional
+        Approximate size in bytes of blocks into which the file is divided.
+        (Default: BLOCK_SIZE)
+
+    max_changed_fraction : float, optional
+        Maximum fraction of the file that may change for a reload to be
+        incremental.
+        (Default: 0.5)
+
+    on_reload : callable, optional
+        If not None, called as ``on_reload(pdict, info)`` after each reload,
+        where ``info`` is as for ``last_reload``.
+        (Default: None)
+
+    oov_pron : iterable of str, optional
+        Pronunciation to assign to out-of-vocabulary words.
+        (Default: ('OOV',))
+
+    normalizer : callable, optional
+        Function mapping words to normalized keys for ``lookup``.
+        (Default: None)
+
+    kwargs
+        Additional keyword arguments controlling parsing: ``align_lexicon``,
+        ``lexiconp``, ``keep``, ``remove``, ``phones``, and ``predicate``.
+        See ``PronDict.load_dict``.
+
+    Attributes
+    ----------
+    pdict : PronDict
+        Current dictionary.
+
+    last_reload : dict
+        Mapping describing the most recent reload, with keys:
+
+        - full  --  True if the file was reloaded in full
+        - n_bytes_parsed  --  number of bytes re-parsed
+        - n_words_changed  --  number of head words whose entries were
+          updated
+        - elapsed  --  duration of reload in seconds
+
+    last_error : Exception
+        Error raised by the most recent reload, if it failed; otherwise
+        None.
+    """
+    def __init__(self, dict_path, interval=1.0, block_size=BLOCK_SIZE,
+                 max_changed_fraction=0.5, on_reload=None, oov_pron=('OOV',),
+                 normalizer=None, **kwargs):
+        utils.validate_integer_arg(block_size, 'block_size', min_val=1)
+        utils.validate_ranged_arg(
+            max_changed_fraction, 'max_changed_fraction', 0, 1)
+        self.dict_path = Path(dict_path)
+        self.interval = interval
+        self.block_size = block_size
+        self.max_changed_fraction = max_changed_fraction
+        self.on_reload = on_reload
+        self.oov_pron = tuple(oov_pron)
+        self.normalizer = normalizer
+        self._parser = DictParser(**kwargs)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._stat = None
+        self._blocks = []
+        self._shared_words = set()
+        self.pdict = None
+        self.last_reload = None
+        self.last_error = None
+        self.reload(full=True)
+        if self.last_error is not None:
+            raise self.last_error
+
+    def _get_stat(self):
+        stat = os.stat(self.dict_path)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _read(self):
+        """Return file contents and stat, checking that it was not modified
+        while being read.
+        """
+        stat = self._get_stat()
+        data = self.dict_path.read_bytes()
+        if self._get_stat() != stat or len(data) != stat[0]:
+            raise OSError(f'File changed while being read: {self.dict_path}')
+        return data, stat
+
+    def _parse_blocks(self, data, start, end):
+        """Divide region of file into blocks and parse them."""
+        parser = self._parser
+        blocks = []
+        with utils.gc_disabled():
+            while start < end:
+                block_end = data.find(
+                    b'\n', start + self.block_size - 1, end)
+                block_end = end if block_end < 0 else block_end + 1
+                block_data = data[start:block_end]
+                parser.word_to_prons = defaultdict(set)
+                parser.scores = {}
+                parser.parse_lines(block_data.split(b'\n'))
+                blocks.append(_Block(
+                    start, block_end, _digest(block_data),
+                    dict(parser.word_to_prons), parser.scores))
+                start = block_end
+        return blocks
+
+    def _match_blocks(self, data):
+        """Find unchanged blocks at beginning and end of new file contents.
+
+        Returns
+        -------
+        n_prefix : int
+            Number of unchanged blocks at beginning of file.
+
+        n_suffix : int
+            Number of unchanged blocks at end of file.
+        """
+        blocks = self._blocks
+        size = len(data)
+        n_prefix = 0
+        for block in blocks:
+            # Appending to a final line lacking a newline changes it.
+            if block.end > size or (data[block.end-1:block.end] != b'\n' and
+                                    block.end != size):
+                break
+            if _digest(data[block.start:block.end]) != block.digest:
+                break
+            n_prefix += 1
+        prefix_end = blocks[n_prefix-1].end if n_prefix else 0
+        delta = size - (blocks[-1].end if blocks else 0)
+        n_suffix = 0
+        for block in reversed(blocks[n_prefix:]):
+            start = block.start + delta
+            end = block.end + delta
+            if start < prefix_end or (start > 0 and
+                                      data[start-1:start] != b'\n'):
+                break
+            if _digest(data[start:end]) != block.digest:
+                break
+            n_suffix += 1
+        return n_prefix, n_suffix
+
+    def reload(self, full=False):
+        """Reload dictionary from file if it changed.
+
+        Parameters
+        ----------
+        full : bool, optional
+            If True, reload the entire file, even if unchanged.
+            (Default: False)
+
+        Returns
+        -------
+        reloaded : bool
+            True if a new dictionary was swapped in.
+        """
+        with self._lock:
+            try:
+                with trace.span('DictWatcher.reload',
+                                path=str(self.dict_path)):
+                    reloaded = self._reload(full)
+                self.last_error = None
+            except (OSError, ValueError) as e:
+                # ValueError includes UnicodeDecodeError, raised for
+                # malformed edits, which may be fixed by the next one.
+                self.last_error = e
+                reloaded = False
+        if reloaded and self.on_reload is not None:
+            self.on_reload(self.pdict, self.last_reload)
+        return reloaded
+
+    def _reload(self, full):
+        start_time = time.perf_counter()
+        data, stat = self._read()
+        size = len(data)
+        blocks = self._blocks
+        if not full:
+            n_prefix, n_suffix = self._match_blocks(data)
+            # Changed region of new file is [bi, ei).
+            bi = blocks[n_prefix-1].end if n_prefix else 0
+            ei = size
+            if n_suffix:
+                ei += blocks[-n_suffix].start - blocks[-1].end
+            if n_prefix + n_suffix == len(blocks) and bi == ei:
+                self._stat = stat
+                return False
+            full = ei - bi > self.max_changed_fraction*size
+        if full:
+            bi, ei = 0, size
+            n_prefix, n_suffix = 0, 0
+
+        # Re-parse changed region. State is only updated once parsing has
+        # succeeded, so that a failed reload is retried at the next poll.
+        old_blocks = blocks[n_prefix:len(blocks)-n_suffix]
+        new_blocks = self._parse_blocks(data, bi, ei)
+        suffix_blocks = blocks[len(blocks)-n_suffix:]
+        delta = ei - (old_blocks[-1].end if old_blocks else bi)
+        for block in suffix_blocks:
+            block.start += delta
+            block.end += delta
+        self._blocks = blocks[:n_prefix] + new_blocks + suffix_blocks
+
+        if full:
+            pdict = self._build_full()
+            n_words_changed = len(pdict)
+        else:
+            pdict, n_words_changed = self._build_incremental(
+                old_blocks, new_blocks)
+        self.pdict = pdict
+        self._stat = stat
+        self.last_reload = {
+            'full' : full,
+            'n_bytes_parsed' : ei - bi,
+            'n_words_changed' : n_words_changed,
+            'elapsed' : time.perf_counter() - start_time,
+            }
+        trace.incr('DictWatcher.reload.words_changed', n_words_changed)
+        return True
+
+    def _build_full(self):
+        """Build dictionary from all blocks."""
+        word_to_prons = defaultdict(set)
+        shared_words = set()
+        scores = {}
+        with utils.gc_disabled():
+            for block in self._blocks:
+                for word, prons in block.word_to_prons.items():
+                    if word in word_to_prons:
+                        word_to_prons[word] = word_to_prons[word] | prons
+                        shared_words.add(word)
+                    else:
+                        word_to_prons[word] = prons
+                scores.update(block.scores)
+        self._shared_words = shared_words
+        pdict = PronDict(oov_pron=self.oov_pron)
+        pdict._word_to_prons = word_to_prons
+        for (word, pron), score in scores.items():
+            pdict.set_score(word, pron, score)
+        pdict.normalizer = self.normalizer
+        return pdict
+
+    def _build_incremental(self, old_blocks, new_blocks):
+        """Build dictionary by updating words of changed blocks."""
+        old_pdict = self.pdict
+        old_word_to_prons = old_pdict._word_to_prons
+        shared_words = self._shared_words
+        old_words = set()
+        for block in old_blocks:
+            old_words.update(block.word_to_prons)
+        words = set(old_words)
+        for block in new_blocks:
+            words.update(block.word_to_prons)
+
+        # Entries of a word may be split between changed and unchanged
+        # blocks only if it occurs in multiple blocks. The mappings of the
+        # current dictionary are copied, rather than rebuilt entry by entry,
+        # so only the changed words are visited in Python.
+        word_to_prons = defaultdict(set, old_word_to_prons)
+        pdict = PronDict(oov_pron=self.oov_pron)
+        pdict._word_to_prons = word_to_prons
+        has_columns = old_pdict.has_columns
+        if has_columns:
+            _copy_columns(old_pdict, pdict)
+        for word in words:
+            if word in shared_words or (word in old_word_to_prons and
+                                        word not in old_words):
+                sources = self._blocks
+            else:
+                sources = new_blocks
+            sources = [block for block in sources
+                       if word in block.word_to_prons]
+            if len(sources) > 1:
+                shared_words.add(word)
+            else:
+                shared_words.discard(word)
+            if not sources:
+                word_to_prons.pop(word, None)
+            elif len(sources) == 1:
+                word_to_prons[word] = sources[0].word_to_prons[word]
+            else:
+                word_to_prons[word] = set().union(
+                    *[block.word_to_prons[word] for block in sources])
+            if has_columns and word in old_word_to_prons:
+                pdict._drop_rows(word, old_word_to_prons[word])
+            for block in sources:
+                if not block.scores:
+                    continue
+                for pron in block.word_to_prons[word]:
+                    score = block.scores.get((word, pron))
+                    if score is not None:
+                        pdict.set_score(word, pron, score)
+
+        if self.normalizer is not None:
+            # Update a copy of the normalized-key index, which shares
+            # unchanged sets of head words with that of the current
+            # dictionary without modifying them.
+            index = old_pdict.get_index('normalized').copy()
+            index.update(pdict, [
+                WordChange(word, old_word_to_prons.get(word),
+                           word_to_prons.get(word))
+                for word in words])
+            pdict._normalizer = self.normalizer
+            pdict.register_index('normalized', index, build=False)
+        return pdict, len(words)
+
+    def check(self):
+        """Poll file, reloading dictionary if it changed.
+
+        Returns
+        -------
+        reloaded : bool
+            True if a new dictionary was swapped in.
+        """
+        try:
+            stat = self._get_stat()
+        except OSError as e:
+            self.last_error = e
+            return False
+        if stat == self._stat:
+            return False
+        return self.reload()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.check()
+
+    def start(self):
+        """Start polling file in a background thread."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f'DictWatcher({self.dict_path})',
+            daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling file, waiting for any reload in progress."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+        return False
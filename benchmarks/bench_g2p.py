@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""Benchmark G2P decoding throughput and latency.
+
+Decodes seeded random word lists with the model bundled with the tests,
+``asrlex/tests/g2p.fst``, under a grid of decoding configurations, and
+reports words/sec and per-word latency percentiles for each, as well as
+words/sec when decoding the whole list with ``G2P.get_prons_batch``. Fixed
+per-call overhead (silencing of Phonetisaurus output with
+``wurlitzer.pipes``, and decoding a single character) is measured
+separately, so that it can be distinguished from decoding cost. Run from the
+repository root:
+
+    python benchmarks/bench_g2p.py --json results.json
+
+Exits without running if the Phonetisaurus Python interface is not
+installed.
+"""
+from argparse import ArgumentParser
+import json
+import math
+from pathlib import Path
+import statistics
+import sys
+import time
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from asrlex import g2p
+from synth import generate_words
+
+
+MODEL_PATH = Path(REPO_DIR, 'asrlex', 'tests', 'g2p.fst')
+
+# Decoding configurations: keyword arguments to ``G2P.get_prons``. Each
+# varies one parameter from the defaults.
+CONFIGS = [
+    {},
+    {'n_best' : 1},
+    {'n_best' : 10},
+    {'beam' : 100},
+    {'beam' : 1000},
+    {'thresh' : 1},
+    {'thresh' : 99},
+    {'cum_prob' : 0.9},
+    ]
+
+# Ranges of word lengths in characters.
+WORD_LENS = [(2, 4), (5, 8), (9, 12), (13, 20)]
+
+
+def percentile(sorted_vals, p):
+    """Return ``p``-th percentile of sorted values by nearest rank."""
+    rank = max(math.ceil(p/100*len(sorted_vals)), 1)
+    return sorted_vals[rank - 1]
+
+
+def decode(model, words, **kwargs):
+    """Decode words, returning sorted per-word latencies in seconds."""
+    latencies = []
+    for word in words:
+        start = time.perf_counter()
+        model.get_prons(word, **kwargs)
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def decode_batch(model, words, **kwargs):
+    """Decode words in a single batch, returning elapsed time in seconds."""
+    start = time.perf_counter()
+    model.get_prons_batch(words, **kwargs)
+    return time.perf_counter() - start
+
+
+def summarize(latencies):
+    return {
+        'words_per_sec' : len(latencies) / sum(latencies),
+        'p50_ms' : 1000*percentile(latencies, 50),
+        'p95_ms' : 1000*percentile(latencies, 95),
+        'p99_ms' : 1000*percentile(latencies, 99),
+        }
+
+
+def measure_overhead(model, n_calls):
+    """Measure fixed per-call costs in seconds."""
+    from wurlitzer import pipes
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        with pipes():
+            pass
+    pipes_overhead = (time.perf_counter() - start) / n_calls
+    latencies = decode(model, ['a']*n_calls)
+    return {'pipes_ms' : 1000*pipes_overhead,
+            'min_call_ms' : 1000*statistics.median(latencies)}
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--n-words', metavar='N', default=1000, type=int,
+        help='number of words per word list (Default: %(default)s)')
+    parser.add_argument(
+        '--seed', metavar='SEED', default=0, type=int,
+        help='random seed for word lists (Default: %(default)s)')
+    parser.add_argument(
+        '--model', metavar='MODEL', default=MODEL_PATH, type=Path,
+        help='path to G2P model (Default: bundled test model)')
+    parser.add_argument(
+        '--json', metavar='FILE', default=None, type=Path,
+        help='write results to FILE as JSON')
+    args = parser.parse_args()
+    if not g2p.HAS_PHONETISAURUS_PY:
+        print('Phonetisaurus Python interface not installed; skipping.',
+              file=sys.stderr)
+        return
+
+    model = g2p.G2P(args.model)
+    words = generate_words(args.n_words, seed=args.seed)
+    decode(model, words[:100]) # Warm up.
+    results = {'model' : str(args.model), 'n_words' : args.n_words,
+               'seed' : args.seed}
+
+    # Fixed per-call overhead.
+    results['overhead'] = overhead = measure_overhead(model, args.n_words)
+    print(f'wurlitzer.pipes overhead: {overhead["pipes_ms"]:.3f} ms/call')
+    print(f'minimum call latency: {overhead["min_call_ms"]:.3f} ms/call\n')
+
+    # Decoding configurations.
+    header = (f'{{:<20}}  {"words/s":>9}  {"p50(ms)":>8}  '
+              f'{"p95(ms)":>8}  {"p99(ms)":>8}')
+    print((header + f'  {"batch words/s":>13}').format('config'))
+    results['configs'] = []
+    for config in CONFIGS:
+        result = summarize(decode(model, words, **config))
+        result['config'] = config
+        result['batch_words_per_sec'] = (
+            len(words) / decode_batch(model, words, **config))
+        results['configs'].append(result)
+        name = ','.join(f'{k}={v}' for k, v in config.items()) or 'default'
+        print(f'{name:<20}  {result["words_per_sec"]:>9.1f}  '
+              f'{result["p50_ms"]:>8.3f}  {result["p95_ms"]:>8.3f}  '
+              f'{result["p99_ms"]:>8.3f}  '
+              f'{result["batch_words_per_sec"]:>13.1f}')
+
+    # Per-word overhead remaining after batching.
+    default = results['configs'][0]
+    overhead['batch_saving_ms'] = 1000*(
+        1/default['words_per_sec'] - 1/default['batch_words_per_sec'])
+    print(f'\nper-word time saved by batching: '
+          f'{overhead["batch_saving_ms"]:.3f} ms/word')
+
+    # Word length.
+    print('\n' + header.format('word length'))
+    results['word_lengths'] = []
+    for word_len in WORD_LENS:
+        len_words = generate_words(
+            args.n_words, word_len=word_len, seed=args.seed)
+        result = summarize(decode(model, len_words))
+        result['word_len'] = word_len
+        results['word_lengths'].append(result)
+        name = f'{word_len[0]}-{word_len[1]}'
+        print(f'{name:<20}  {result["words_per_sec"]:>9.1f}  '
+              f'{result["p50_ms"]:>8.3f}  {result["p95_ms"]:>8.3f}  '
+              f'{result["p99_ms"]:>8.3f}')
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+    main()
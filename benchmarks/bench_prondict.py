@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""Benchmark PronDict operations on synthetic lexicons.
+
+For each vocabulary size, a seeded synthetic lexicon is generated (see
+``synth.py``) and each operation timed (best of ``--repeat`` runs) and its
+peak memory allocation measured (a separate run under ``tracemalloc``, which
+slows execution). Run from the repository root:
+
+    python benchmarks/bench_prondict.py --json results.json
+    python benchmarks/bench_prondict.py --compare results.json
+
+Results are written as JSON, which ``--compare`` reads to report ratios of
+the current run to a previous one, e.g., on another commit.
+"""
+from argparse import ArgumentParser
+import gc
+import json
+import os
+from pathlib import Path
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from asrlex.prondict import PronDict
+from synth import generate_lexicon, write_lexicon
+
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+
+def _strip_last(pron):
+    return pron[:-1] or pron
+
+
+def make_benchmarks(dict_path, tmp_dir):
+    """Return mapping from operation names to ``(setup, func)`` pairs.
+
+    ``setup`` is called untimed and returns the arguments of ``func``.
+    """
+    pdict = PronDict.load_dict(dict_path)
+    words = pdict.words
+    # Two halves of the lexicon, overlapping in half their words.
+    n = len(words)
+    pdict1 = PronDict({word : pdict[word] for word in words[:3*n//4]})
+    pdict2 = PronDict({word : pdict[word] for word in words[n//4:]})
+    tokens = words[::2] + [word + '_oov' for word in words[1::2]]
+    out_path = Path(tmp_dir, 'out.dict')
+
+    def iterate(pdict):
+        for word in pdict:
+            for pron in pdict[word]:
+                pass
+
+    return {
+        'load_dict' : (lambda: (dict_path,), PronDict.load_dict),
+        'iterate' : (lambda: (pdict,), iterate),
+        'union' : (lambda: (pdict1, pdict2), PronDict.union),
+        'difference' : (lambda: (pdict1, pdict2), PronDict.difference),
+        'apply' : (lambda: (pdict, _strip_last), PronDict.apply),
+        'write_dict' : (lambda: (pdict, out_path), PronDict.write_dict),
+        'lookup_many' : (
+            lambda: (pdict, tokens),
+            lambda pdict, tokens: pdict.lookup_many(tokens, normalize=False)),
+        }
+
+
+def time_func(func, args, repeat):
+    """Return minimum wall-clock time in seconds of ``repeat`` calls."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_memory(func, args):
+    """Return peak memory in bytes allocated during call."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def get_metadata():
+    """Return description of environment in which benchmarks were run."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit' : commit,
+        'python' : platform.python_version(),
+        'platform' : platform.platform(),
+        'processor' : platform.processor(),
+        'cpu_count' : os.cpu_count(),
+        'time' : time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+
+
+def compare(results, baseline):
+    """Print ratios of current results to baseline results."""
+    baseline = {(r['op'], r['n_words']) : r for r in baseline['results']}
+    print(f'\n{"op":<12}  {"n_words":>8}  {"time":>7}  {"memory":>7}')
+    for result in results['results']:
+        key = (result['op'], result['n_words'])
+        if key not in baseline:
+            continue
+        time_ratio = f'{result["time"] / baseline[key]["time"]:.2f}x'
+        mem_ratio = '-'
+        if result['peak_bytes'] and baseline[key]['peak_bytes']:
+            mem_ratio = (
+                f'{result["peak_bytes"] / baseline[key]["peak_bytes"]:.2f}x')
+        print(f'{key[0]:<12}  {key[1]:>8}  {time_ratio:>7}  {mem_ratio:>7}')
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--sizes', metavar='N', nargs='+', default=DEFAULT_SIZES, type=int,
+        help='vocabulary sizes (Default: %(default)s)')
+    parser.add_argument(
+        '--ops', metavar='OP', nargs='+', default=None,
+        help='operations to benchmark (Default: all)')
+    parser.add_argument(
+        '--repeat', metavar='N', default=3, type=int,
+        help='number of timed runs per operation (Default: %(default)s)')
+    parser.add_argument(
+        '--no-memory', dest='memory', default=True, action='store_false',
+        help='skip peak memory measurement')
+    parser.add_argument(
+        '--seed', metavar='SEED', default=0, type=int,
+        help='random seed for synthetic lexicons (Default: %(default)s)')
+    parser.add_argument(
+        '--json', metavar='FILE', default=None, type=Path,
+        help='write results to FILE as JSON')
+    parser.add_argument(
+        '--compare', metavar='FILE', default=None, type=Path,
+        help='report ratios to previous results in FILE')
+    args = parser.parse_args()
+
+    results = {'metadata' : get_metadata(), 'seed' : args.seed,
+               'results' : []}
+    print(f'{"op":<12}  {"n_words":>8}  {"time(s)":>9}  {"peak(MiB)":>10}')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_words in args.sizes:
+            dict_path = Path(tmp_dir, f'synth-{n_words}.dict')
+            write_lexicon(generate_lexicon(n_words, seed=args.seed), dict_path)
+            benchmarks = make_benchmarks(dict_path, tmp_dir)
+            for op, (setup, func) in benchmarks.items():
+                if args.ops is not None and op not in args.ops:
+                    continue
+                elapsed = time_func(func, setup(), args.repeat)
+                peak = peak_memory(func, setup()) if args.memory else 0
+                results['results'].append(
+                    {'op' : op, 'n_words' : n_words, 'time' : elapsed,
+                     'peak_bytes' : peak})
+                print(f'{op:<12}  {n_words:>8}  {elapsed:>9.4f}  '
+                      f'{peak/2**20:>10.1f}')
+            del benchmarks
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2) + '\n')
+    if args.compare is not None:
+        compare(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""Benchmark import and CLI startup time.
+
+Each command is run repeatedly in a fresh interpreter, and the minimum and
+median wall-clock times reported, both in absolute terms and in excess of
+the time taken to start a bare interpreter. Run from the repository root:
+
+    python benchmarks/bench_startup.py --repeat 20
+"""
+from argparse import ArgumentParser
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import time
+
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+COMMANDS = {
+    'python' : ['-c', 'pass'],
+    'import asrlex' : ['-c', 'import asrlex'],
+    'import asrlex.prondict' : ['-c', 'import asrlex.prondict'],
+    'import asrlex.g2p' : ['-c', 'import asrlex.g2p'],
+    'asrlex.__version__' : ['-c', 'import asrlex; asrlex.__version__'],
+    'asrlex --help' : ['-m', 'asrlex.cli', '--help'],
+    }
+
+
+def time_command(args, repeat):
+    """Return wall-clock times in seconds of ``repeat`` runs of command."""
+    env = dict(os.environ, PYTHONPATH=str(REPO_DIR))
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--repeat', metavar='N', default=10, type=int,
+        help='number of runs per command (Default: %(default)s)')
+    parser.add_argument(
+        '--json', metavar='FILE', default=None, type=Path,
+        help='also write results to FILE as JSON')
+    args = parser.parse_args()
+
+    # Warm up, which also compiles bytecode if it is being written.
+    for cmd_args in COMMANDS.values():
+        time_command(cmd_args, 1)
+
+    results = {}
+    for name, cmd_args in COMMANDS.items():
+        times = time_command(cmd_args, args.repeat)
+        results[name] = {'min' : min(times),
+                         'median' : statistics.median(times)}
+    baseline = results['python']['min']
+    print(f'{"command":<24}  {"min(ms)":>8}  {"median(ms)":>10}  '
+          f'{"excess(ms)":>10}')
+    for name, result in results.items():
+        result['excess'] = result['min'] - baseline
+        print(f'{name:<24}  {1000*result["min"]:>8.1f}  '
+              f'{1000*result["median"]:>10.1f}  '
+              f'{1000*result["excess"]:>10.1f}')
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""Seeded generator of synthetic pronunciation lexicons.
+
+Lexicons are generated deterministically from a seed, so benchmarks run on
+different commits or machines see identical inputs:
+
+    python benchmarks/synth.py --n-words 100000 --seed 0 synth.dict
+"""
+from argparse import ArgumentParser
+import random
+import string
+
+
+def make_phones(n_phones):
+    """Return inventory of ``n_phones`` ARPAbet-like phone symbols."""
+    phones = []
+    for first in string.ascii_uppercase:
+        for second in [''] + list(string.ascii_uppercase):
+            phones.append(first + second)
+            if len(phones) == n_phones:
+                return phones
+    raise ValueError(f'n_phones must be <= {len(phones)}')
+
+
+def generate_lexicon(n_words, prons_per_word=(1, 3), n_phones=40,
+                     pron_len=(2, 10), word_len=(3, 12), seed=0):
+    """Generate synthetic lexicon.
+
+    Parameters
+    ----------
+    n_words : int
+        Number of words.
+
+    prons_per_word : tuple of int, optional
+        Minimum and maximum number of pronunciations per word.
+        (Default: (1, 3))
+
+    n_phones : int, optional
+        Size of phone inventory.
+        (Default: 40)
+
+    pron_len : tuple of int, optional
+        Minimum and maximum pronunciation length in phones.
+        (Default: (2, 10))
+
+    word_len : tuple of int, optional
+        Minimum and maximum word length in characters.
+        (Default: (3, 12))
+
+    seed : int, optional
+        Random seed.
+        (Default: 0)
+
+    Returns
+    -------
+    lexicon : dict
+        Mapping from words to sets of pronunciations.
+    """
+    rng = random.Random(seed)
+    phones = make_phones(n_phones)
+    letters = string.ascii_lowercase + "'"
+    lexicon = {}
+    while len(lexicon) < n_words:
+        word = ''.join(rng.choices(letters, k=rng.randint(*word_len)))
+        if word in lexicon:
+            continue
+        n_prons = rng.randint(*prons_per_word)
+        lexicon[word] = {
+            tuple(rng.choices(phones, k=rng.randint(*pron_len)))
+            for _ in range(n_prons)}
+    return lexicon
+
+
+def generate_words(n_words, word_len=(3, 12), seed=0):
+    """Generate list of ``n_words`` distinct random lowercase words.
+
+    Word lengths are uniformly distributed over the closed range
+    ``word_len``.
+    """
+    rng = random.Random(seed)
+    words = {}
+    while len(words) < n_words:
+        word = ''.join(
+            rng.choices(string.ascii_lowercase, k=rng.randint(*word_len)))
+        words[word] = None
+    return list(words)
+
+
+def write_lexicon(lexicon, dict_path):
+    """Write lexicon to file in the format read by ``PronDict.load_dict``.
+
+    Entries are written in generation order, not sorted, as is typical of
+    lexicons assembled from several sources.
+    """
+    with open(dict_path, 'w', encoding='utf-8') as f:
+        for word, prons in lexicon.items():
+            for pron in sorted(prons):
+                f.write(f'{word}\t{" ".join(pron)}\n')
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('dict_path', help='output path for lexicon')
+    parser.add_argument(
+        '--n-words', metavar='N', default=100000, type=int,
+        help='number of words (Default: %(default)s)')
+    parser.add_argument(
+        '--prons-per-word', metavar=('MIN', 'MAX'), nargs=2, default=(1, 3),
+        type=int, help='range of pronunciations per word '
+                       '(Default: %(default)s)')
+    parser.add_argument(
+        '--n-phones', metavar='N', default=40, type=int,
+        help='size of phone inventory (Default: %(default)s)')
+    parser.add_argument(
+        '--pron-len', metavar=('MIN', 'MAX'), nargs=2, default=(2, 10),
+        type=int, help='range of pronunciation lengths '
+                       '(Default: %(default)s)')
+    parser.add_argument(
+        '--seed', metavar='SEED', default=0, type=int,
+        help='random seed (Default: %(default)s)')
+    args = parser.parse_args()
+    lexicon = generate_lexicon(
+        args.n_words, prons_per_word=tuple(args.prons_per_word),
+        n_phones=args.n_phones, pron_len=tuple(args.pron_len),
+        seed=args.seed)
+    write_lexicon(lexicon, args.dict_path)
+
+
+if __name__ == '__main__':
+    main()
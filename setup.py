@@ -13,7 +13,8 @@ setup(
     packages=['asrlex'],
     entry_points={'console_scripts' : ['asrlex=asrlex.cli:main',],},
     # TODO: Determine required versions.
-    install_requires=['pybindgen',
+    install_requires=['numpy',
+                      'pybindgen',
                       'wurlitzer'],
     # Versioning.
     version=versioneer.get_version(),